@@ -17,6 +17,11 @@ from backend.models.database import db, init_db
 from backend.models.business import Business
 from backend.models.review import Review
 from backend.models.user import User
+from backend.models.job import Job
+from backend.models.nlp_cache import NlpCacheEntry
+from backend.models.review_topic import ReviewTopic
+from backend.models.business_daily_stats import BusinessDailyStats
+from backend.services.suggestion_model import require_model_artifact
 
 # Import routes
 from backend.routes.auth import auth_bp
@@ -24,6 +29,7 @@ from backend.routes.businesses import business_bp
 from backend.routes.reviews import reviews_bp
 from backend.routes.analytics import analytics_bp
 from backend.routes.ping import ping_bp
+from backend.routes.jobs import jobs_bp
 
 
 def create_app(config_name="development"):
@@ -68,8 +74,11 @@ def create_app(config_name="development"):
         },
     )
 
-    # Initialize database
-    init_db(app)
+    # ingest tags every review with the suggestion model, refuse to start without it
+    require_model_artifact()
+
+    # Initialize database, workers and command line tools set DB_UPGRADE_ON_START=0
+    init_db(app, upgrade=os.environ.get("DB_UPGRADE_ON_START", "1") == "1")
 
     migrate = Migrate(app, db)
 
@@ -84,6 +93,7 @@ def create_app(config_name="development"):
     app.register_blueprint(ping_bp, url_prefix="/api")
     app.register_blueprint(user_bp, url_prefix="/api/user")
     app.register_blueprint(dashboard_bp, url_prefix="/api/dashboard")
+    app.register_blueprint(jobs_bp, url_prefix="/api/jobs")
 
     # Error handlers
     @app.errorhandler(404)
@@ -105,9 +115,5 @@ def create_app(config_name="development"):
 
 app = create_app()
 
-
-with app.app_context():
-    db.create_all()
-
 if __name__ == "__main__":
     app.run(debug=True, port=8000)
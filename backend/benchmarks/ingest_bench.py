@@ -0,0 +1,108 @@
+# Run this file to compare writing ingested reviews one ORM object at a time
+# (session.add per review, how ingest used to do it) with the bulk upsert of
+# services/review_store.py, on a SQLite file:
+#   python -m backend.benchmarks.ingest_bench --reviews 10000 100000
+#   python -m backend.benchmarks.ingest_bench --reviews 10000 --default-pragmas
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+
+from backend.benchmarks.fixtures import load_fixture_reviews
+from backend.models import database
+from backend.models.database import db
+from backend.models.business import Business
+from backend.models.review import Review
+from backend.models.review_topic import ReviewTopic
+from backend.models.user import User
+from backend.models.business_daily_stats import BusinessDailyStats
+from backend.services.daily_stats import record_reviews
+from backend.services.local_sentiment import ASPECTS
+from backend.services.review_store import store_reviews
+
+BUSINESS_ID = 1
+
+
+def review_rows(count):
+    """Analyzed review rows as process_reviews hands them to the database, with their topics"""
+    captions = [review['caption'] for review in load_fixture_reviews() if review.get('caption')]
+    rng = random.Random(0)
+    aspects = list(ASPECTS)
+    start = datetime(2020, 1, 1)
+    rows, topics = [], []
+    for i in range(count):
+        rating = rng.randint(1, 5)
+        review_topics = [(name, round(rng.random(), 3)) for name in rng.sample(aspects, rng.randint(0, 3))]
+        topics.append(review_topics)
+        rows.append({
+            'source': 'Google', 'content': captions[i % len(captions)], 'rating': float(rating),
+            'retrieved_at': datetime(2025, 1, 1), 'review_date': 0, 'username': f'user {i}',
+            'user_review_count': rng.randint(1, 500), 'user_profile_url': f'https://maps.google.com/contrib/{i}',
+            'review_date_estimate': start + timedelta(minutes=rng.randrange(60 * 24 * 365 * 5)),
+            'business_id': BUSINESS_ID, 'external_id': f'review-{i}',
+            'senti_score': (rating - 3) / 2, 'sentiment_magnitude': 1.0, 'sentiment_description': 'Neutral',
+            'is_suggestion': rng.random() < 0.1, 'topics': ', '.join(name for name, _ in review_topics),
+        })
+    return rows, topics
+
+
+def insert_orm(rows, topics):
+    for row, review_topics in zip(rows, topics):
+        review = Review(**row)
+        review.set_topics(review_topics)
+        db.session.add(review)
+    record_reviews(rows)
+    db.session.commit()
+
+
+def insert_bulk(rows, topics):
+    store_reviews(rows, topics)
+    db.session.commit()
+
+
+def measure(insert, rows, topics):
+    """Rows per second of an insert function, into a new database file"""
+    with tempfile.TemporaryDirectory() as directory:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            db.session.add(User(id=1, first_name='bench', last_name='bench', email='bench@example.com'))
+            db.session.add(Business(id=BUSINESS_ID, name='bench', url='', user_id=1))
+            db.session.commit()
+
+            start = time.perf_counter()
+            insert(rows, topics)
+            elapsed = time.perf_counter() - start
+
+            assert Review.query.count() == len(rows)
+            assert ReviewTopic.query.count() == sum(len(review_topics) for review_topics in topics)
+            assert db.session.query(db.func.sum(BusinessDailyStats.review_count)).scalar() == len(rows)
+            db.session.remove()
+            db.engine.dispose()
+    return len(rows) / elapsed
+
+
+def run(counts=(10000, 100000), default_pragmas=False):
+    if default_pragmas:
+        database.SQLITE_PRAGMAS.clear()
+
+    print(f"{'reviews':>8} {'orm rows/s':>11} {'bulk rows/s':>12} {'speedup':>8}")
+    for count in counts:
+        rows, topics = review_rows(count)
+        orm = measure(insert_orm, rows, topics)
+        bulk = measure(insert_bulk, rows, topics)
+        print(f"{count:>8} {orm:>11.0f} {bulk:>12.0f} {bulk / orm:>7.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark bulk review ingest')
+    parser.add_argument('--reviews', type=int, nargs='+', default=[10000, 100000], help='batch sizes to insert')
+    parser.add_argument('--default-pragmas', action='store_true', help="don't apply the WAL and tuning pragmas")
+    args = parser.parse_args()
+    run(args.reviews, args.default_pragmas)
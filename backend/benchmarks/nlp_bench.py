@@ -0,0 +1,34 @@
+# Run this file to time batched Google NLP analysis of the recorded reviews
+# against a local stand-in API, sequentially and with the bounded thread pool:
+#   python -m backend.benchmarks.nlp_bench --reviews 2000 --latency-ms 150 --workers 1 8 16
+import argparse
+import time
+
+from backend.benchmarks.fixtures import load_fixture_reviews
+from backend.benchmarks.nlp_server import NlpServer
+from backend.services.nlp import analyze_texts, get_language_client
+
+
+def run(count=2000, latency_ms=150, workers=(1, 8)):
+    fixtures = [review['caption'] for review in load_fixture_reviews() if review.get('caption')]
+    texts = [fixtures[i % len(fixtures)] for i in range(count)]
+
+    with NlpServer(latency=latency_ms / 1000) as server:
+        client = get_language_client(api_key='stand-in', api_endpoint=server.url)
+        print(f"{'workers':>7} {'reviews':>8} {'seconds':>8} {'reviews/s':>10}")
+        for max_workers in workers:
+            start = time.perf_counter()
+            results = analyze_texts(texts, client=client, max_workers=max_workers)
+            elapsed = time.perf_counter() - start
+
+            assert all(result is not None for result in results)
+            print(f"{max_workers:>7} {len(results):>8} {elapsed:>8.2f} {len(results) / elapsed:>10.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time batched NLP analysis against a stand-in API')
+    parser.add_argument('--reviews', type=int, default=2000)
+    parser.add_argument('--latency-ms', type=int, default=150, help='time the stand-in API takes per request')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8], help='pool sizes to compare')
+    args = parser.parse_args()
+    run(args.reviews, args.latency_ms, args.workers)
@@ -0,0 +1,81 @@
+# Local stand-in for the Google Cloud Natural Language REST API, answering
+# documents:annotateText with a made up but deterministic analysis after a
+# configurable delay. Point the client at it with GOOGLE_NLP_ENDPOINT or
+# get_language_client(api_endpoint=server.url).
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ENTITY_WORDS = ['service', 'food', 'staff', 'price', 'location', 'room', 'coffee', 'wait']
+
+
+def fake_annotation(text):
+    """Deterministic annotateText response body for a text"""
+    digest = hashlib.sha1(text.encode('utf-8')).digest()
+    words = text.lower().split()
+    entities = [word for word in ENTITY_WORDS if word in words] or [ENTITY_WORDS[digest[2] % len(ENTITY_WORDS)]]
+    return {
+        'sentences': [],
+        'tokens': [],
+        'entities': [
+            {'name': name, 'type': 'OTHER', 'salience': round(1 / (i + 1), 3)}
+            for i, name in enumerate(entities)
+        ],
+        'documentSentiment': {'score': round(digest[0] / 127.5 - 1, 3), 'magnitude': round(digest[1] / 127.5, 3)},
+        'language': 'en',
+    }
+
+
+class NlpServer:
+    """Serves the stand-in API on localhost in a background thread.
+
+    Use as a context manager; the endpoint is in self.url once started.
+    """
+
+    def __init__(self, latency=0.0):
+        # seconds each request takes, to mimic the network and the API
+        self.latency = latency
+        self.requests = 0
+        self._server = None
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                with server._lock:
+                    server.requests += 1
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                if not self.path.startswith('/v1/documents:annotateText'):
+                    self.send_error(404)
+                    return
+
+                time.sleep(server.latency)
+                data = json.dumps(fake_annotation(body['document'].get('content', ''))).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self._server.shutdown()
+        self._server.server_close()
+        return False
@@ -0,0 +1,120 @@
+# Local stand-in for a Google Maps place page, serving recorded reviews.
+#
+#   /place           review pane that loads more reviews as it is scrolled
+#                    (sort menu, spinner and all), for the selenium scraper
+#   /place/static    every review already rendered, for the http fetcher
+#   /reviews?offset= the next batch of review blocks, used by /place
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from backend.benchmarks.fixtures import render_page
+
+PLACE_PAGE = '''<html><head><style>
+.jftiEf { min-height: 120px; }
+.m6QErb { height: 600px; overflow-y: scroll; }
+</style></head><body>
+<h1 class="DUwDvf fontHeadlineLarge">Stand-in place</h1>
+<button data-value="Sort" onclick="document.getElementById('menu').style.display = 'block'">Sort</button>
+<div id="menu" style="display: none">
+  <div role="menuitemradio" onclick="sortBy()">Most relevant</div>
+  <div role="menuitemradio" onclick="sortBy()">Newest</div>
+</div>
+<div class="m6QErb DxyBCb kA9KIf dS8AEf" id="pane"></div>
+<script>
+var pane = document.getElementById('pane');
+var loading = false;
+var done = false;
+
+function load() {
+  if (loading || done) return;
+  loading = true;
+  var spinner = document.createElement('div');
+  spinner.className = 'qjESne';
+  pane.appendChild(spinner);
+  var offset = pane.querySelectorAll('div.jftiEf').length;
+  fetch('/reviews?offset=' + offset).then(function (r) { return r.text(); }).then(function (html) {
+    spinner.remove();
+    if (html.trim()) {
+      pane.insertAdjacentHTML('beforeend', html);
+    } else {
+      done = true;
+    }
+    loading = false;
+  });
+}
+
+function sortBy() {
+  document.getElementById('menu').style.display = 'none';
+  pane.innerHTML = '';
+  done = false;
+  load();
+}
+
+pane.addEventListener('scroll', function () {
+  if (pane.scrollTop + pane.clientHeight >= pane.scrollHeight - 10) load();
+});
+load();
+</script>
+</body></html>'''
+
+
+class PageServer:
+    """Serves the given review blocks on localhost in a background thread.
+
+    Use as a context manager; the base url is in self.url once started.
+    """
+
+    def __init__(self, blocks, batch_size=10, latency=0.0):
+        self.blocks = blocks
+        self.batch_size = batch_size
+        # seconds added to every batch request, to mimic the network
+        self.latency = latency
+        self.requests = 0
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                parsed = urlparse(self.path)
+                if parsed.path == '/place':
+                    body = PLACE_PAGE
+                elif parsed.path == '/place/static':
+                    body = render_page(server.blocks)
+                elif parsed.path == '/reviews':
+                    offset = int(parse_qs(parsed.query).get('offset', ['0'])[0])
+                    time.sleep(server.latency)
+                    body = '\n'.join(server.blocks[offset:offset + server.batch_size])
+                else:
+                    self.send_error(404)
+                    return
+
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self._server.shutdown()
+        self._server.server_close()
+        return False
@@ -0,0 +1,46 @@
+# Run this file to compare per-scroll parse time of the full page parse against
+# parsing only the newly loaded review blocks:
+#   python -m backend.benchmarks.parse_bench --iterations 15 --batch 10
+import argparse
+import time
+
+from bs4 import BeautifulSoup
+
+from backend.benchmarks.fixtures import render_page, render_review_blocks
+from backend.services.googlemaps import parse_review_blocks
+
+
+def full_page_parse(page, offset):
+    """What get_reviews used to do: parse the whole page and skip `offset` blocks"""
+    response = BeautifulSoup(page, 'html.parser')
+    return response.find_all('div', class_='jftiEf fontBodyMedium')[offset:]
+
+
+def run(iterations=15, batch=10, overhead_kb=200):
+    blocks = render_review_blocks(iterations * batch)
+
+    print(f"{'iteration':>9} {'offset':>7} {'full page ms':>13} {'new only ms':>12}")
+    for iteration in range(iterations):
+        offset = iteration * batch
+        loaded = blocks[:offset + batch]
+        page = render_page(loaded, overhead_kb=overhead_kb)
+
+        start = time.perf_counter()
+        full = full_page_parse(page, offset)
+        full_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        new = parse_review_blocks(loaded[offset:])
+        new_ms = (time.perf_counter() - start) * 1000
+
+        assert len(full) == len(new) == batch
+        print(f"{iteration + 1:>9} {offset:>7} {full_ms:>13.1f} {new_ms:>12.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare full page and incremental review parsing')
+    parser.add_argument('--iterations', type=int, default=15)
+    parser.add_argument('--batch', type=int, default=10, help='reviews loaded per scroll')
+    parser.add_argument('--overhead-kb', type=int, default=200, help='size of the non review markup on the page')
+    args = parser.parse_args()
+    run(args.iterations, args.batch, args.overhead_kb)
@@ -0,0 +1,126 @@
+# Run this file to check that the dashboard's queries are served by an index
+# (EXPLAIN QUERY PLAN on SQLite) and to time them on seeded tables:
+#   python -m backend.benchmarks.query_plan --reviews 1000000 --businesses 50
+# Exits with status 1 if a query scans a table or sorts it in a temp b-tree.
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, select, text
+
+from backend.models.database import db
+from backend.models.business import Business
+from backend.models.business_daily_stats import BusinessDailyStats
+from backend.models.review import Review
+from backend.models.review_topic import ReviewTopic
+from backend.models.user import User
+from backend.services.daily_stats import COUNTERS, STARS, counter_columns, daily_stats_select
+
+BUSINESS_ID = 1
+SINCE = datetime(2024, 1, 1)
+TOPICS = ['food', 'service', 'ambiance', 'price', 'location', 'cleanliness', 'wait time']
+
+
+def dashboard_queries():
+    """The queries of routes/dashboard.py and services/daily_stats.py, by name"""
+    by_business = Review.business_id == BUSINESS_ID
+    stats_by_business = BusinessDailyStats.business_id == BUSINESS_ID
+    return {
+        'summary': select(func.count(Review.id), func.avg(Review.rating), func.avg(Review.senti_score))
+            .where(by_business),
+        # the first day of a period comes from the reviews, from the period's start time on
+        'first day': select(*counter_columns()).where(
+            by_business, Review.review_date_estimate >= SINCE, Review.review_date_estimate < SINCE + timedelta(days=1)),
+        'sentiment analysis': select(BusinessDailyStats)
+            .where(stats_by_business, BusinessDailyStats.date >= SINCE.date()).order_by(BusinessDailyStats.date),
+        'recent reviews': select(Review).where(by_business).order_by(Review.review_date_estimate.desc()).limit(5),
+        'rating distribution': select(*[func.sum(getattr(BusinessDailyStats, f'rating_{star}')) for star in STARS])
+            .where(stats_by_business, BusinessDailyStats.date >= SINCE.date()),
+        'rating counts': select(Review.rating, func.count()).where(by_business).group_by(Review.rating),
+        'suggestion count': select(func.count()).where(by_business, Review.is_suggestion.is_(True)),
+        'insight reviews': select(Review).where(by_business, Review.review_date_estimate >= SINCE),
+        'topic counts': select(ReviewTopic.topic, func.count()).where(ReviewTopic.business_id == BUSINESS_ID)
+            .group_by(ReviewTopic.topic),
+    }
+
+
+def query_plan(conn, statement):
+    """The detail lines of SQLite's EXPLAIN QUERY PLAN for a statement"""
+    compiled = statement.compile(conn, compile_kwargs={'literal_binds': True})
+    return [row[-1] for row in conn.execute(text(f'EXPLAIN QUERY PLAN {compiled}'))]
+
+
+def uses_index(plan):
+    for detail in plan:
+        if detail.startswith('SCAN ') and 'INDEX' not in detail:
+            return False
+        if 'TEMP B-TREE' in detail:
+            return False
+    return True
+
+
+def seed(conn, reviews, businesses):
+    conn.execute(User.__table__.insert(), [{'id': 1, 'first_name': 'bench', 'last_name': 'bench',
+                                             'email': 'bench@example.com'}])
+    conn.execute(Business.__table__.insert(), [{'id': i, 'name': f'business {i}', 'url': '', 'user_id': 1}
+                                               for i in range(1, businesses + 1)])
+    rng = random.Random(0)
+    start = datetime(2020, 1, 1)
+    rows, topic_rows = [], []
+    for i in range(reviews):
+        rating = rng.randint(1, 5)
+        business_id = rng.randint(1, businesses)
+        topic_rows.extend({'review_id': i + 1, 'business_id': business_id, 'topic': topic}
+                          for topic in rng.sample(TOPICS, rng.randint(0, 3)))
+        rows.append({
+            'id': i + 1, 'source': 'Google', 'content': 'bench review', 'rating': float(rating),
+            'review_date_estimate': start + timedelta(minutes=rng.randrange(60 * 24 * 365 * 5)),
+            'business_id': business_id, 'senti_score': (rating - 3) / 2,
+            'sentiment_magnitude': 1.0, 'sentiment_description': 'Neutral',
+            'is_suggestion': rng.random() < 0.1,
+        })
+        if len(rows) == 10000:
+            conn.execute(Review.__table__.insert(), rows)
+            conn.execute(ReviewTopic.__table__.insert(), topic_rows)
+            rows, topic_rows = [], []
+    if rows:
+        conn.execute(Review.__table__.insert(), rows)
+        conn.execute(ReviewTopic.__table__.insert(), topic_rows)
+    conn.execute(BusinessDailyStats.__table__.insert().from_select(
+        ['business_id', 'date'] + COUNTERS, daily_stats_select()
+    ))
+    conn.execute(text('ANALYZE'))
+
+
+def run(reviews=100000, businesses=50):
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine)
+    failed = []
+    with engine.begin() as conn:
+        if reviews:
+            seed(conn, reviews, businesses)
+
+        print(f"{'query':<20} {'ms':>8}  plan")
+        for name, statement in dashboard_queries().items():
+            plan = query_plan(conn, statement)
+            start = time.perf_counter()
+            conn.execute(statement).fetchall()
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{name:<20} {elapsed:>8.1f}  {' | '.join(plan)}")
+            if not uses_index(plan):
+                failed.append(name)
+
+    if failed:
+        print(f"Not served by an index: {', '.join(failed)}")
+        sys.exit(1)
+    print("All dashboard queries use an index")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check and time the query plans of the dashboard queries')
+    parser.add_argument('--reviews', type=int, default=100000, help='reviews seeded before planning, 0 for none')
+    parser.add_argument('--businesses', type=int, default=50)
+    args = parser.parse_args()
+    run(args.reviews, args.businesses)
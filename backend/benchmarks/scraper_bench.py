@@ -0,0 +1,113 @@
+# Run this file to benchmark the whole scrape path (fetch, parse, process) against
+# the recorded reviews served by a local stand-in page, no Google involved:
+#   python -m backend.benchmarks.scraper_bench --reviews 200 --backend http
+#   python -m backend.benchmarks.scraper_bench --reviews 200 --backend selenium --latency-ms 150
+import argparse
+import contextlib
+import io
+import json
+import math
+import time
+import tracemalloc
+
+from backend.benchmarks.fixtures import render_review_blocks
+from backend.benchmarks.page_server import PageServer
+from backend.services import fetchers, googlemaps
+from backend.services.rate_limit import AdaptiveRateLimiter
+from backend.services.scraper import process_review_data
+
+
+@contextlib.contextmanager
+def timed_parse_review(timings):
+    """Time every parse_review call made by the scraper and the fetchers"""
+    original = googlemaps.parse_review
+
+    def parse_review(review):
+        start = time.perf_counter()
+        try:
+            return original(review)
+        finally:
+            timings.append(time.perf_counter() - start)
+
+    googlemaps.parse_review = fetchers.parse_review = parse_review
+    try:
+        yield
+    finally:
+        googlemaps.parse_review = fetchers.parse_review = original
+
+
+def iter_http(server):
+    yield from fetchers.HttpReviewFetcher(batch_size=server.batch_size).iter_reviews(server.url + '/place/static')
+
+
+def iter_selenium(server, count):
+    from backend.services.driver_pool import create_driver, quit_driver
+
+    try:
+        driver = create_driver(start_url='about:blank')
+    except Exception as e:
+        raise SystemExit(f"Couldn't start Chrome for the selenium backend: {e}")
+
+    try:
+        # the stand-in server doesn't throttle, measure the scraper and not the limiter
+        unlimited = AdaptiveRateLimiter(rate=1e6, burst=1e6, max_rate=1e6)
+        with googlemaps.GoogleMapsScraper(driver=driver, rate_limiter=unlimited) as scraper:
+            # a couple of extra scrolls so the empty batch at the end is reached
+            max_iterations = math.ceil(count / server.batch_size) + 2
+            yield from scraper.iter_reviews(server.url + '/place', max_iterations=max_iterations)
+    finally:
+        quit_driver(driver)
+
+
+def run(count=200, backend='http', batch=10, latency_ms=0):
+    blocks = render_review_blocks(count)
+    parse_times = []
+    process_time = 0.0
+    scraped = 0
+    iterations = 0
+
+    with PageServer(blocks, batch_size=batch, latency=latency_ms / 1000) as server:
+        batches = iter_http(server) if backend == 'http' else iter_selenium(server, count)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        # get_reviews prints every review it parses, keep that out of the report
+        with timed_parse_review(parse_times), contextlib.redirect_stdout(io.StringIO()):
+            for reviews in batches:
+                process_start = time.perf_counter()
+                process_review_data(reviews)
+                process_time += time.perf_counter() - process_start
+                scraped += len(reviews)
+                iterations += 1
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'backend': backend,
+        'reviews': scraped,
+        'iterations': iterations,
+        'seconds': round(elapsed, 3),
+        'reviews_per_second': round(scraped / elapsed, 1) if elapsed else None,
+        'parse_ms_per_review': round(sum(parse_times) * 1000 / len(parse_times), 3) if parse_times else None,
+        'process_ms_per_review': round(process_time * 1000 / scraped, 3) if scraped else None,
+        'peak_memory_mb': round(peak / 1024 / 1024, 2),
+        'requests': server.requests,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the review scrape path against a local stand-in page')
+    parser.add_argument('--reviews', type=int, default=200, help='number of recorded reviews to serve')
+    parser.add_argument('--backend', choices=('http', 'selenium'), default='http')
+    parser.add_argument('--batch', type=int, default=10, help='reviews loaded per scroll')
+    parser.add_argument('--latency-ms', type=int, default=0, help='delay added to every review batch request')
+    parser.add_argument('--json', action='store_true', help='print the results as json')
+    args = parser.parse_args()
+
+    results = run(args.reviews, args.backend, args.batch, args.latency_ms)
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for name, value in results.items():
+            print(f"{name:>22}: {value}")
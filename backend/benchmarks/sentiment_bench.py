@@ -0,0 +1,49 @@
+# Run this file to measure the offline sentiment engine: throughput on the
+# recorded reviews and agreement with the Google NLP results saved in research/:
+#   python -m backend.benchmarks.sentiment_bench --reviews 50000
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from backend.benchmarks.fixtures import load_fixture_reviews
+from backend.services.local_sentiment import analyze_texts_local
+
+GOOGLE_RESULTS = os.path.join(os.path.dirname(__file__), '..', '..', 'research',
+                              'real_data_sentiment_analysis_results.json')
+
+
+def agreement(path=GOOGLE_RESULTS):
+    """Correlation of the scores and share of matching labels with Google NLP"""
+    with open(path, encoding='utf-8') as f:
+        recorded = json.load(f)
+
+    results = analyze_texts_local([review['review'] for review in recorded])
+    google = np.array([review['sentiment_score'] for review in recorded])
+    local = np.array([result['sentiment_score'] if result else 0.0 for result in results])
+    labels = [result['sentiment_description'] if result else 'Neutral' for result in results]
+    matching = sum(label == review['sentiment_description'] for label, review in zip(labels, recorded))
+    return len(recorded), float(np.corrcoef(google, local)[0, 1]), matching / len(recorded)
+
+
+def run(count=50000):
+    captions = [review['caption'] for review in load_fixture_reviews() if review.get('caption')]
+    texts = [captions[i % len(captions)] for i in range(count)]
+
+    analyze_texts_local(texts[:10])  # build the vectorizers outside the timing
+    start = time.perf_counter()
+    analyze_texts_local(texts)
+    elapsed = time.perf_counter() - start
+    print(f"{count} reviews in {elapsed:.2f}s, {count / elapsed:.0f} reviews/s")
+
+    total, correlation, matching = agreement()
+    print(f"vs Google NLP on {total} reviews: score correlation {correlation:.2f}, same label {matching:.0%}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the offline sentiment engine')
+    parser.add_argument('--reviews', type=int, default=50000)
+    args = parser.parse_args()
+    run(args.reviews)
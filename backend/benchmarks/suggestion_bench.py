@@ -0,0 +1,69 @@
+# Run this file to compare suggestion detection of the recorded reviews one at
+# a time (what ingest used to do) against the batch API (needs spaCy and
+# en_core_web_sm installed):
+#   python -m backend.benchmarks.suggestion_bench --reviews 2000 --batch-size 256 --n-process 1
+import argparse
+import os
+import time
+
+import numpy as np
+
+from backend.benchmarks.fixtures import load_fixture_reviews
+
+SERVICES_DIR = os.path.join(os.path.dirname(__file__), '..', 'services')
+
+
+def train_classifier():
+    """A classifier trained like export_classifier.py does, on the bundled training texts"""
+    from backend.services.SuggestionClassifier_ import SuggestionClassifier
+
+    texts = []
+    for name in ('sugg_train.txt', 'non_sugg_train.txt'):
+        with open(os.path.join(SERVICES_DIR, name), encoding='utf-8') as f:
+            texts.extend(line.strip() for line in f if line.strip())
+
+    classifier = SuggestionClassifier()
+    classifier.fit_unsupervised(texts)
+    return classifier
+
+
+def run(count=2000, batch_size=256, n_process=1):
+    captions = [review['caption'] for review in load_fixture_reviews() if review.get('caption')]
+    texts = [captions[i % len(captions)].lower().strip() for i in range(count)]
+
+    try:
+        from backend.services import lemmatizer
+        classifier = train_classifier()
+    except (ImportError, OSError) as e:
+        raise SystemExit(f"Suggestion classifier unavailable, install spaCy and en_core_web_sm: {e}")
+
+    classifier.predict_batch(['warm up'])  # load spaCy outside the timing
+
+    def timed(predict):
+        start = time.perf_counter()
+        predictions = np.asarray(predict())
+        return predictions, time.perf_counter() - start
+
+    # the first two runs without the lemma cache, the fixtures repeat
+    cache_size, lemmatizer.CACHE_SIZE = lemmatizer.CACHE_SIZE, 0
+    lemmatizer._cache.clear()
+    single, single_elapsed = timed(lambda: [classifier.predict(text) for text in texts])
+    batch, batch_elapsed = timed(lambda: classifier.predict_batch(texts, batch_size=batch_size, n_process=n_process))
+    lemmatizer.CACHE_SIZE = cache_size
+    classifier.predict_batch(texts)
+    cached, cached_elapsed = timed(lambda: classifier.predict_batch(texts))
+
+    print(f"{'mode':>7} {'reviews':>8} {'seconds':>8} {'reviews/s':>10}")
+    for mode, elapsed in (('single', single_elapsed), ('batch', batch_elapsed), ('cached', cached_elapsed)):
+        print(f"{mode:>7} {count:>8} {elapsed:>8.2f} {count / elapsed:>10.1f}")
+    print(f"batch speedup {single_elapsed / batch_elapsed:.1f}x, "
+          f"same predictions: {np.mean((single == batch) & (batch == cached)):.1%}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark batched suggestion detection')
+    parser.add_argument('--reviews', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=256, help='texts per spaCy pipe batch')
+    parser.add_argument('--n-process', type=int, default=1, help='processes spaCy preprocesses with')
+    args = parser.parse_args()
+    run(args.reviews, args.batch_size, args.n_process)
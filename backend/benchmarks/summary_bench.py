@@ -0,0 +1,111 @@
+# Run this file to compare the dashboard summary computed in Python over every
+# Review (how the route used to do it) with the SQL aggregates it uses now:
+#   python -m backend.benchmarks.summary_bench --reviews 100000
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from flask import Flask
+
+from backend.benchmarks.fixtures import load_fixture_reviews
+from backend.models.database import db
+from backend.models.business import Business
+from backend.models.review import Review
+from backend.models.review_topic import ReviewTopic
+from backend.models.user import User
+from backend.routes.dashboard import get_review_summary
+from backend.services.local_sentiment import ASPECTS
+
+BUSINESS_ID = 1
+
+
+def summary_in_python(business_id):
+    """The summary as the route computed it before, from the loaded reviews"""
+    reviews = Review.query.filter_by(business_id=business_id).all()
+    review_count = len(reviews)
+    ratings = [review.rating for review in reviews if review.rating is not None]
+    avg_rating = sum(ratings) / len(ratings) if ratings else 0
+    sentiment_scores = [review.senti_score for review in reviews]
+    avg_sentiment = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
+
+    topic_counts = {}
+    for review in reviews:
+        if review.topics:
+            for topic in review.topics.split(','):
+                topic = topic.strip()
+                if topic:
+                    topic_counts[topic] = topic_counts.get(topic, 0) + 1
+    return review_count, avg_rating, avg_sentiment, topic_counts
+
+
+def seed(count):
+    captions = [review['caption'] for review in load_fixture_reviews() if review.get('caption')]
+    rng = random.Random(0)
+    aspects = list(ASPECTS)
+    start = datetime(2020, 1, 1)
+
+    db.session.add(User(id=1, first_name='bench', last_name='bench', email='bench@example.com'))
+    db.session.add(Business(id=BUSINESS_ID, name='bench', url='', user_id=1))
+    db.session.commit()
+
+    rows, topic_rows = [], []
+    for i in range(count):
+        rating = rng.randint(1, 5)
+        topics = rng.sample(aspects, rng.randint(0, 3))
+        topic_rows.extend({'review_id': i + 1, 'business_id': BUSINESS_ID, 'topic': topic} for topic in topics)
+        rows.append({
+            'id': i + 1, 'source': 'Google', 'content': captions[i % len(captions)], 'rating': float(rating),
+            'review_date_estimate': start + timedelta(minutes=rng.randrange(60 * 24 * 365 * 5)),
+            'business_id': BUSINESS_ID, 'senti_score': (rating - 3) / 2, 'sentiment_magnitude': 1.0,
+            'sentiment_description': 'Neutral', 'is_suggestion': rng.random() < 0.1,
+            'topics': ', '.join(topics),
+        })
+        if len(rows) == 10000:
+            db.session.execute(Review.__table__.insert(), rows)
+            db.session.execute(ReviewTopic.__table__.insert(), topic_rows)
+            rows, topic_rows = [], []
+    if rows:
+        db.session.execute(Review.__table__.insert(), rows)
+        db.session.execute(ReviewTopic.__table__.insert(), topic_rows)
+    db.session.commit()
+
+
+def measure(summarize):
+    db.session.expunge_all()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = summarize(BUSINESS_ID)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run(count=100000):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        seed(count)
+
+        before, before_elapsed, before_peak = measure(summary_in_python)
+        after, after_elapsed, after_peak = measure(get_review_summary)
+
+        print(f"{'summary':>7} {'reviews':>8} {'ms':>8} {'peak MiB':>9}")
+        for name, elapsed, peak in (('python', before_elapsed, before_peak), ('sql', after_elapsed, after_peak)):
+            print(f"{name:>7} {count:>8} {elapsed * 1000:>8.1f} {peak / 2 ** 20:>9.1f}")
+
+        same = (before[0] == after[0] and abs(before[1] - after[1]) < 1e-9 and abs(before[2] - after[2]) < 1e-9
+                and before[3] == after[3])
+        print(f"speedup {before_elapsed / after_elapsed:.0f}x, same summary: {same}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the dashboard summary aggregation')
+    parser.add_argument('--reviews', type=int, default=100000)
+    args = parser.parse_args()
+    run(args.reviews)
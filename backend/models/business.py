@@ -10,6 +10,7 @@ class Business(db.Model):
     business_type = db.Column(db.String(50), nullable=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     reviews = db.relationship('Review', back_populates='business_ref', lazy=True)
+    daily_stats = db.relationship('BusinessDailyStats', lazy=True, cascade='all, delete-orphan')
     user = db.relationship('User', back_populates='businesses')
 
     def to_dict(self):
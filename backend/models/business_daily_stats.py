@@ -0,0 +1,32 @@
+from backend.models.database import db
+
+
+class BusinessDailyStats(db.Model):
+    __tablename__ = 'business_daily_stats'
+    """Review counts and sums of a business for one day, kept up to date on ingest"""
+    id = db.Column(db.Integer, primary_key=True)
+    business_id = db.Column(db.Integer, db.ForeignKey('business.id'), nullable=False)
+    # day of review_date_estimate
+    date = db.Column(db.Date, nullable=False)
+
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # reviews with a rating, their sum and how many rounded to each star
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Float, nullable=False, default=0)
+    rating_1 = db.Column(db.Integer, nullable=False, default=0)
+    rating_2 = db.Column(db.Integer, nullable=False, default=0)
+    rating_3 = db.Column(db.Integer, nullable=False, default=0)
+    rating_4 = db.Column(db.Integer, nullable=False, default=0)
+    rating_5 = db.Column(db.Integer, nullable=False, default=0)
+
+    sentiment_sum = db.Column(db.Float, nullable=False, default=0)
+    positive_count = db.Column(db.Integer, nullable=False, default=0)
+    neutral_count = db.Column(db.Integer, nullable=False, default=0)
+    negative_count = db.Column(db.Integer, nullable=False, default=0)
+
+    suggestion_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_business_daily_stats_business_date', 'business_id', 'date', unique=True),
+    )
@@ -1,15 +1,144 @@
+import sqlite3
+
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Engine
 
 db = SQLAlchemy()
 migrate = Migrate()
 
-def init_db(app):
-    """Initialize database connection and create tables if needed"""
-    db.init_app(app)  
-    migrate.init_app(app, db)  
-    
+# set on every new SQLite connection
+SQLITE_PRAGMAS = {
+    # readers (the dashboard) and the ingest writer no longer block each other
+    'journal_mode': 'WAL',
+    # with WAL only a power loss can lose the last commits, never corrupt the file
+    'synchronous': 'NORMAL',
+    # 64 MB page cache, temp tables and indexes in memory, reads through mmap
+    'cache_size': -64000,
+    'temp_store': 'MEMORY',
+    'mmap_size': 256 * 2 ** 20,
+    # wait for a concurrent writer instead of failing with "database is locked"
+    'busy_timeout': 5000,
+}
+
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f'PRAGMA {name}={value}')
+    cursor.close()
+
+
+def init_db(app, upgrade=True):
+    """Initialize database connection, and create or upgrade the tables if asked to.
+
+    Only one process should upgrade: the job workers and the command line tools
+    turn it off and leave it to the web app or backend/models/upgrade.py.
+    """
+    db.init_app(app)
+    migrate.init_app(app, db)
+
+    if upgrade:
+        with app.app_context():
+            upgrade_db()
+            print("Database tables created successfully")
+
+
+def upgrade_db():
+    """
+    Bring the database up to date with the models: create missing tables, add new
+    columns and indexes, and fill the tables derived from the reviews when they
+    are still empty. Safe to run again, see backend/models/upgrade.py.
+    """
+    db.create_all()
+    upgrade_schema()
+    backfill_review_topics(only_if_empty=True)
+    from backend.services.daily_stats import rebuild_daily_stats
+    rebuild_daily_stats(only_if_empty=True)
+
+
+def upgrade_schema():
+    """Add new nullable columns and indexes to tables that already exist.
+
+    db.create_all() only creates missing tables, so databases created before a
+    column or index was added to a model would never get it.
+    """
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+                print(f"Added column {table.name}.{column.name}")
+
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+def backfill_review_topics(batch_size=1000, only_if_empty=False):
+    """Create the review_topic rows of reviews that only have a topics string.
+
+    Reviews stored before the review_topic table existed keep their topics as
+    one comma separated string. Salience isn't known for those.
+
+    Args:
+        batch_size (int): Reviews converted per transaction
+        only_if_empty (bool): Do nothing if the table already has rows, the
+            cheap check run at startup
+
+    Returns:
+        int: The number of reviews backfilled
+    """
+    from backend.models.review import Review
+    from backend.models.review_topic import ReviewTopic
+
+    if only_if_empty and db.session.query(ReviewTopic.id).first() is not None:
+        return 0
+
+    without_rows = ~db.session.query(ReviewTopic.id).filter(ReviewTopic.review_id == Review.id).exists()
+    backfilled, last_id = 0, 0
+    while True:
+        reviews = db.session.query(Review.id, Review.business_id, Review.topics).filter(
+            Review.id > last_id, Review.topics.isnot(None), Review.topics != '', without_rows
+        ).order_by(Review.id).limit(batch_size).all()
+        if not reviews:
+            break
+
+        rows = []
+        for review_id, business_id, topics in reviews:
+            for topic in dict.fromkeys(topic.strip() for topic in topics.split(',')):
+                if topic:
+                    rows.append({'review_id': review_id, 'business_id': business_id, 'topic': topic})
+        # stay under SQLite's bound parameter limit
+        for start in range(0, len(rows), 200):
+            db.session.execute(
+                dialect_insert(ReviewTopic.__table__)
+                .values(rows[start:start + 200])
+                .on_conflict_do_nothing(index_elements=['review_id', 'topic'])
+            )
+        db.session.commit()
+        backfilled += len(reviews)
+        last_id = reviews[-1][0]
+
+    if backfilled:
+        print(f"Backfilled the topics of {backfilled} reviews")
+    return backfilled
+
 
-    with app.app_context():
-        db.create_all()
-        print("Database tables created successfully")
\ No newline at end of file
+def dialect_insert(table):
+    """INSERT construct of the engine's dialect, which supports on_conflict_do_nothing/do_update"""
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
@@ -0,0 +1,44 @@
+from backend.models.database import db
+from datetime import datetime, timezone
+
+
+class Job(db.Model):
+    __tablename__ = 'job'
+    """A unit of background work (e.g. scraping a business) picked up by a worker"""
+    id = db.Column(db.Integer, primary_key=True)
+    # what the worker should do, see JOB_HANDLERS in services/jobs.py
+    kind = db.Column(db.String(50), nullable=False)
+    # queued, running, done, failed
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    business_id = db.Column(db.Integer, db.ForeignKey('business.id'), nullable=True)
+
+    # percentage and a human readable description of the current step
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    message = db.Column(db.String(255), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    started_at = db.Column(db.DateTime, nullable=True)
+    # bumped by every progress update, a running job that stops beating lost its worker
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_job_status_created_at', 'status', 'created_at'),
+        db.Index('ix_job_business_id', 'business_id'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'business_id': self.business_id,
+            'progress': self.progress,
+            'message': self.message,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'heartbeat_at': self.heartbeat_at,
+            'finished_at': self.finished_at,
+        }
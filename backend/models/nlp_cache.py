@@ -0,0 +1,26 @@
+from backend.models.database import db
+from datetime import datetime, timezone
+
+
+class NlpCacheEntry(db.Model):
+    __tablename__ = 'nlp_cache'
+    """A Google NLP analysis result, keyed by a hash of the normalized text and the model used"""
+    id = db.Column(db.Integer, primary_key=True)
+    # sha256 of the model version and the normalized text, see services/nlp_cache.py
+    content_hash = db.Column(db.String(64), nullable=False, unique=True)
+    model = db.Column(db.String(100), nullable=False)
+
+    sentiment_score = db.Column(db.Float, nullable=True)
+    sentiment_magnitude = db.Column(db.Float, nullable=True)
+    sentiment_description = db.Column(db.String(50), nullable=True)
+    # json list of [name, type, salience] ranked by salience
+    entities = db.Column(db.Text, nullable=True)
+
+    hits = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    # least recently used entries are evicted first
+    last_used_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        db.Index('ix_nlp_cache_last_used_at', 'last_used_at'),
+    )
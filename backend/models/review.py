@@ -1,4 +1,5 @@
 from backend.models.database import db
+from backend.models.review_topic import ReviewTopic, unique_topics
 from datetime import datetime, timezone
 
 
@@ -37,8 +38,31 @@ class Review(db.Model):
     sentiment_description = db.Column(db.String(50), nullable=False)
     # check
     is_suggestion = db.Column(db.Boolean, nullable=False)
-    # topics that the review focuses on, maximum 3 topics
+    # topics that the review focuses on, maximum 3 topics, comma separated for display;
+    # analytics use the review_topic rows, see set_topics
     topics = db.Column(db.String, nullable=True)
+    topic_links = db.relationship('ReviewTopic', back_populates='review', cascade='all, delete-orphan',
+                                  order_by='ReviewTopic.id')
+
+    # id of the review on the source platform (google maps data-review-id),
+    # used to skip reviews that were already ingested on a re-scrape
+    external_id = db.Column(db.String(255), nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_review_business_external_id', 'business_id', 'external_id', unique=True),
+        # the dashboard filters every query by business, then by date, rating or suggestion,
+        # see tests/test_query_plan.py and benchmarks/query_plan.py
+        db.Index('ix_review_business_date', 'business_id', 'review_date_estimate'),
+        db.Index('ix_review_business_rating', 'business_id', 'rating'),
+        db.Index('ix_review_business_suggestion', 'business_id', 'is_suggestion'),
+    )
+
+    def set_topics(self, topics):
+        """Set the review's topics from (name, salience) pairs, most salient first"""
+        topics = unique_topics(topics)
+        self.topics = ', '.join(name for name, _ in topics)
+        self.topic_links = [ReviewTopic(topic=name, salience=salience, business_id=self.business_id)
+                            for name, salience in topics]
 
     def to_dict(self):
         return {
@@ -57,5 +81,6 @@ class Review(db.Model):
             'sentiment_magnitude': self.sentiment_magnitude,  # Add this 
             'sentiment_description': self.sentiment_description,
             'is_suggestion': self.is_suggestion,
-            'topics': self.topics
+            'topics': self.topics,
+            'external_id': self.external_id
         }
\ No newline at end of file
@@ -0,0 +1,30 @@
+from backend.models.database import db
+
+
+class ReviewTopic(db.Model):
+    __tablename__ = 'review_topic'
+    """A topic a review mentions, one row per review and topic"""
+    id = db.Column(db.Integer, primary_key=True)
+    review_id = db.Column(db.Integer, db.ForeignKey('review.id'), nullable=False)
+    review = db.relationship('Review', back_populates='topic_links')
+    # copied from the review so topic analytics of a business don't need to join
+    business_id = db.Column(db.Integer, db.ForeignKey('business.id'), nullable=False)
+
+    topic = db.Column(db.String(100), nullable=False)
+    # how central the topic is to the review (0-1), unknown for backfilled topics
+    salience = db.Column(db.Float, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_review_topic_business_topic', 'business_id', 'topic'),
+        db.Index('ix_review_topic_review_topic', 'review_id', 'topic', unique=True),
+    )
+
+
+def unique_topics(topics):
+    """(name, salience) pairs with names trimmed, empty and repeated names dropped"""
+    unique = {}
+    for name, salience in topics:
+        name = name.strip()
+        if name and name not in unique:
+            unique[name] = salience
+    return list(unique.items())
@@ -0,0 +1,18 @@
+# Brings an existing database up to date with the models in one step: new
+# tables, the columns and indexes upgrade_schema adds, and the review_topic and
+# business_daily_stats backfills. Run it from the repo root after pulling, before
+# starting the job workers, which never upgrade the database themselves:
+#   python -m backend.models.upgrade
+import os
+
+from backend.models.database import db, upgrade_db
+
+
+if __name__ == '__main__':
+    # upgrade exactly once, below, and not again while the app is imported
+    os.environ['DB_UPGRADE_ON_START'] = '0'
+    from backend.app import app
+
+    with app.app_context():
+        upgrade_db()
+        print(f"Upgraded {db.engine.url}")
@@ -2,11 +2,9 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
 from backend.models.database import db
 from backend.models.user import User
-from backend.models.review import Review
 from datetime import datetime, timezone
 from backend.models.business import Business
-from backend.services.scraper import scrape_reviews_for_business
-from backend.services.review import process_reviews
+from backend.services.jobs import enqueue_job
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -102,19 +100,10 @@ def register():
         # adding and flush new_business to generate its id
         db.session.add(new_business)
         db.session.flush()
-        
-      
-        try:
-            print("scraping reviews")
-            scraped_data = scrape_reviews_for_business(business_data['url'])
-            reviews_data = scraped_data.get('reviews', [])
-        except Exception as scrape_error:
-            print(f"Error scraping reviews: {scrape_error}")
-            reviews_data = []  # Empty list if scraping fails
-        
-        # process the reviews
-        print("processing the reviews")
-        process_reviews(reviews_data, new_business.id)
+
+        # scraping and analyzing the reviews takes minutes, a job worker does it
+        # in the background and the dashboard polls the job for progress
+        scrape_job = enqueue_job('scrape_business', business_id=new_business.id)
         db.session.commit()
 
         
@@ -126,7 +115,8 @@ def register():
             'access_token': access_token,
             'refresh_token': refresh_token,
             'user': new_user.to_dict(),
-            'business': new_business.to_dict()
+            'business': new_business.to_dict(),
+            'job': scrape_job.to_dict()
         }), 201
 
     except Exception as e:
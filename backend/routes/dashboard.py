@@ -2,15 +2,39 @@ from flask import Blueprint, request, jsonify, current_app
 from backend.models.database import db
 from backend.models.business import Business
 from backend.models.review import Review
+from backend.models.review_topic import ReviewTopic
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy import func, desc
 from datetime import datetime, timedelta, timezone
 import json
 from openai import OpenAI
 from backend.models.insight import Insight
+from backend.services.daily_stats import PERIOD_DAYS, get_rating_counts, get_sentiment_trends
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
+
+def get_review_summary(business_id):
+    """
+    Count and average the reviews of a business with SQL aggregates
+    
+    Returns:
+        tuple: (review count, average rating, average sentiment score, mentions per topic)
+    """
+    review_count, avg_rating, avg_sentiment = db.session.query(
+        func.count(Review.id),
+        func.avg(Review.rating),
+        func.avg(Review.senti_score)
+    ).filter(Review.business_id == business_id).one()
+    
+    # oldest first so ties keep the order topics appeared in
+    topic_counts = dict(db.session.query(ReviewTopic.topic, func.count(ReviewTopic.id)).filter(
+        ReviewTopic.business_id == business_id
+    ).group_by(ReviewTopic.topic).order_by(func.min(ReviewTopic.review_id)).all())
+    
+    return review_count, avg_rating or 0, avg_sentiment or 0, topic_counts
+
+
 # Main Dashboard Data Route
 @dashboard_bp.route('/business/<int:business_id>/summary', methods=['GET'])
 @jwt_required()
@@ -33,33 +57,8 @@ def get_business_summary(business_id):
     if not business:
         return jsonify({"error": "Business not found or access denied"}), 404
     
-    # Get reviews for this business
-    reviews = Review.query.filter_by(business_id=business_id).all()
-    
-    # Calculate metrics
-    review_count = len(reviews)
-    
-    # Calculate average rating
-    ratings = [review.rating for review in reviews if review.rating is not None]
-    avg_rating = sum(ratings) / len(ratings) if ratings else 0
-    
-    # Calculate overall sentiment score
-    sentiment_scores = [review.senti_score for review in reviews]
-    avg_sentiment = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
-    
-    # Find most mentioned topics
-    topic_counts = {}
-    for review in reviews:
-        if review.topics:
-            if isinstance(review.topics, str):
-                review_topics = review.topics.split(',')
-            else:
-                review_topics = [review.topics]
-                
-            for topic in review_topics:
-                topic = topic.strip()
-                if topic:
-                    topic_counts[topic] = topic_counts.get(topic, 0) + 1
+    # Aggregate the reviews in the database, only the results are loaded
+    review_count, avg_rating, avg_sentiment, topic_counts = get_review_summary(business_id)
     
     most_mentioned_topic = None
     max_count = 0
@@ -109,110 +108,17 @@ def get_sentiment_analysis(business_id):
     # Get period from query params (default to month)
     period = request.args.get('period', 'month')
     
-    # Set date range based on period
-    now = datetime.now()
-    if period == 'week':
-        start_date = now - timedelta(days=7)
-    elif period == 'month':
-        start_date = now - timedelta(days=30)
-    elif period == 'quarter':
-        start_date = now - timedelta(days=90)
-    elif period == 'year':
-        start_date = now - timedelta(days=365)
-    else:
+    if period not in PERIOD_DAYS:
         return jsonify({"error": "Invalid period specified"}), 400
     
-    # Get reviews within the date range
-    reviews = Review.query.filter(
-        Review.business_id == business_id,
-        Review.review_date_estimate >= start_date
-    ).order_by(Review.review_date_estimate).all()
-    
-    # Sentiment over time data
-    sentiment_trends = []
-    time_buckets = {}
-    
-    # Generate time buckets based on period
-    if period == 'week':
-        # Daily buckets for week
-        for i in range(7):
-            bucket_date = now - timedelta(days=6-i)
-            time_buckets[bucket_date.strftime('%Y-%m-%d')] = {
-                'date': bucket_date.strftime('%Y-%m-%d'),
-                'avg_sentiment': 0,
-                'review_count': 0
-            }
-    elif period == 'month':
-        # Weekly buckets for month
-        for i in range(4):
-            bucket_date = now - timedelta(days=28-i*7)
-            time_buckets[bucket_date.strftime('%Y-%m-%d')] = {
-                'date': bucket_date.strftime('%Y-%m-%d'),
-                'avg_sentiment': 0,
-                'review_count': 0
-            }
-    elif period == 'quarter':
-
-        for i in range(3):
-            bucket_date = now - timedelta(days=90-i*30)
-            time_buckets[bucket_date.strftime('%Y-%m')] = {
-                'date': bucket_date.strftime('%Y-%m'),
-                'avg_sentiment': 0,
-                'review_count': 0
-            }
-    else:  # year
-        for i in range(4):
-            bucket_date = now - timedelta(days=365-i*90)
-            time_buckets[bucket_date.strftime('%Y-Q%d' % ((bucket_date.month-1)//3+1))] = {
-                'date': bucket_date.strftime('%Y-Q%d' % ((bucket_date.month-1)//3+1)),
-                'avg_sentiment': 0,
-                'review_count': 0
-            }
-    
-    # Aggregate sentiment data into buckets
-    for review in reviews:
-        bucket_key = None
-        review_date = review.review_date_estimate
-        
-        if period == 'week':
-            bucket_key = review_date.strftime('%Y-%m-%d')
-        elif period == 'month':
-            # Find the closest weekly bucket
-            for key in time_buckets:
-                if abs((datetime.strptime(key, '%Y-%m-%d') - review_date).days) < 7:
-                    bucket_key = key
-                    break
-        elif period == 'quarter':
-            bucket_key = review_date.strftime('%Y-%m')
-        else:  # year
-            quarter = (review_date.month-1)//3+1
-            bucket_key = review_date.strftime('%Y-Q%d' % quarter)
-        
-        if bucket_key in time_buckets:
-            bucket = time_buckets[bucket_key]
-            bucket['avg_sentiment'] = (bucket['avg_sentiment'] * bucket['review_count'] + review.senti_score) / (bucket['review_count'] + 1)
-            bucket['review_count'] += 1
-    
-    # Convert buckets to list for response
-    sentiment_trends = list(time_buckets.values())
-    
-    # Sentiment distribution data
-    sentiment_distribution = {
-        'positive': 0,
-        'neutral': 0,
-        'negative': 0
-    }
-    
-    for review in reviews:
-        sentiment = review.sentiment_description.lower()
-        if sentiment in sentiment_distribution:
-            sentiment_distribution[sentiment] += 1
+    # Sentiment over time and distribution, from the per day stats of the period
+    sentiment_trends, sentiment_distribution, total_reviews = get_sentiment_trends(business_id, period)
     
     # Prepare response
     analysis = {
         "sentiment_trends": sentiment_trends,
         "sentiment_distribution": sentiment_distribution,
-        "total_reviews": len(reviews),
+        "total_reviews": total_reviews,
         "period": period
     }
     
@@ -307,28 +213,8 @@ def get_rating_distribution(business_id):
     else:
         return jsonify({"error": "Invalid period specified"}), 400
     
-    # Get reviews within the date range
-    reviews = Review.query.filter(
-        Review.business_id == business_id,
-        Review.review_date_estimate >= start_date
-    ).all()
-    
-    # Initialize rating distribution
-    distribution = {
-        "1": 0,
-        "2": 0,
-        "3": 0,
-        "4": 0,
-        "5": 0
-    }
-    
-    # Count reviews by rating
-    for review in reviews:
-        if review.rating is not None:
-            # Round to nearest integer and convert to string
-            rating_key = str(round(review.rating))
-            if rating_key in distribution:
-                distribution[rating_key] += 1
+    # Count reviews by rating, from the per day stats
+    distribution = get_rating_counts(business_id, start_date)
     
     # Calculate total reviews
     total_reviews = sum(distribution.values())
@@ -528,66 +414,33 @@ def get_topic_ratings(business_id):
     if not business:
         return jsonify({"error": "Business not found or access denied"}), 404
     
-    # Get all reviews for this business
-    reviews = Review.query.filter_by(business_id=business_id).all()
-    
-    # Count topic mentions and track ratings
-    topic_counts = {}
-    topic_ratings = {}
-    topic_sentiment = {}
+    # Top 5 topics by mention count, with the ratings and sentiment of their reviews
+    top_topics = db.session.query(
+        ReviewTopic.topic,
+        func.count(ReviewTopic.id),
+        func.avg(Review.rating),
+        func.avg(Review.senti_score),
+        func.count(Review.rating)
+    ).join(Review, Review.id == ReviewTopic.review_id).filter(
+        ReviewTopic.business_id == business_id
+    ).group_by(ReviewTopic.topic).order_by(
+        func.count(ReviewTopic.id).desc(), func.min(ReviewTopic.review_id)
+    ).limit(5).all()
     
-    for review in reviews:
-        if not review.topics:
-            continue
-            
-        # Parse topics
-        if isinstance(review.topics, str):
-            topics = [topic.strip() for topic in review.topics.split(',')]
-        else:
-            topics = [review.topics]
-        
-        for topic in topics:
-            if not topic:
-                continue
-                
-            # Update topic counts
-            topic_counts[topic] = topic_counts.get(topic, 0) + 1
-            
-            # Update topic ratings
-            if review.rating is not None:
-                if topic not in topic_ratings:
-                    topic_ratings[topic] = []
-                topic_ratings[topic].append(review.rating)
-            
-            # Update topic sentiment
-            if topic not in topic_sentiment:
-                topic_sentiment[topic] = []
-            topic_sentiment[topic].append(review.senti_score)
-    
-    # Get top 5 topics by mention count
-    top_topics = sorted(topic_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-    
-    # Calculate average ratings and sentiment for top topics
     topic_analysis = []
-    for topic, count in top_topics:
-        ratings = topic_ratings.get(topic, [])
-        avg_rating = sum(ratings) / len(ratings) if ratings else None
-        
-        sentiments = topic_sentiment.get(topic, [])
-        avg_sentiment = sum(sentiments) / len(sentiments) if sentiments else None
-        
+    for topic, count, avg_rating, avg_sentiment, rating_count in top_topics:
         topic_analysis.append({
             "topic": topic,
             "mention_count": count,
             "average_rating": round(avg_rating, 1) if avg_rating is not None else None,
             "average_sentiment": round(avg_sentiment, 2) if avg_sentiment is not None else None,
-            "review_count": len(ratings)
+            "review_count": rating_count
         })
     
     # Prepare response
     response = {
         "top_topics": topic_analysis,
-        "total_reviews": len(reviews)
+        "total_reviews": Review.query.filter_by(business_id=business_id).count()
     }
     
     return jsonify(response), 200
@@ -657,8 +510,20 @@ def generate_ai_insight(business_id):
         "Use a friendly, professional tone. Do not include any lists or bullet points—write in paragraphs for the owner to read.",
         "\n\nHere are the reviews:"
     ]
+    # topics of all these reviews in one query, most salient first; backfilled topics
+    # have no salience and keep the order they were stored in
+    review_topics = {}
+    for review_id, topic in db.session.query(ReviewTopic.review_id, ReviewTopic.topic).join(
+        Review, Review.id == ReviewTopic.review_id
+    ).filter(
+        ReviewTopic.business_id == business_id,
+        Review.review_date_estimate >= since_date
+    ).order_by(ReviewTopic.salience.desc().nulls_last(), ReviewTopic.id):
+        review_topics.setdefault(review_id, []).append(topic)
+
     for review in sorted(reviews, key=lambda r: r.review_date_estimate, reverse=True):
-        line = f"- [{review.review_date_estimate.strftime('%Y-%m-%d')}] {review.content} (Rating: {review.rating}, Sentiment: {review.sentiment_description}, Topics: {review.topics})"
+        topics = ', '.join(review_topics.get(review.id, []))
+        line = f"- [{review.review_date_estimate.strftime('%Y-%m-%d')}] {review.content} (Rating: {review.rating}, Sentiment: {review.sentiment_description}, Topics: {topics})"
         prompt_lines.append(line)
 
     prompt = "\n".join(prompt_lines)
@@ -0,0 +1,72 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from backend.models.database import db
+from backend.models.business import Business
+from backend.models.job import Job
+from backend.services.jobs import ACTIVE_STATUSES, enqueue_job
+
+jobs_bp = Blueprint('jobs', __name__)
+
+
+@jobs_bp.route('/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    """
+    Get the status and progress of a background job
+
+    Returns:
+        200: Job status, progress (0-100) and current step
+        404: Not found if the job doesn't exist or belongs to another user
+    """
+    current_user_id = get_jwt_identity()
+
+    job = db.session.get(Job, job_id)
+    if not job or not Business.query.filter_by(id=job.business_id, user_id=current_user_id).first():
+        return jsonify({"error": "Job not found or access denied"}), 404
+
+    return jsonify({"job": job.to_dict()}), 200
+
+
+@jobs_bp.route('/business/<int:business_id>/latest', methods=['GET'])
+@jwt_required()
+def get_latest_business_job(business_id):
+    """
+    Get the most recent background job of a business, so the dashboard can show
+    whether its reviews are still being collected
+    """
+    current_user_id = get_jwt_identity()
+
+    business = Business.query.filter_by(id=business_id, user_id=current_user_id).first()
+    if not business:
+        return jsonify({"error": "Business not found or access denied"}), 404
+
+    job = Job.query.filter_by(business_id=business_id).order_by(Job.created_at.desc(), Job.id.desc()).first()
+    return jsonify({"job": job.to_dict() if job else None}), 200
+
+
+@jobs_bp.route('/business/<int:business_id>/refresh', methods=['POST'])
+@jwt_required()
+def refresh_business_reviews(business_id):
+    """
+    Queue a scrape of the business's new reviews
+
+    Returns:
+        202: The queued job, or the job already queued/running for this business
+        404: Not found if the business doesn't exist or belongs to another user
+    """
+    current_user_id = get_jwt_identity()
+
+    business = Business.query.filter_by(id=business_id, user_id=current_user_id).first()
+    if not business:
+        return jsonify({"error": "Business not found or access denied"}), 404
+
+    job = Job.query.filter(
+        Job.business_id == business_id,
+        Job.kind == 'scrape_business',
+        Job.status.in_(ACTIVE_STATUSES)
+    ).first()
+    if not job:
+        job = enqueue_job('scrape_business', business_id=business_id)
+        db.session.commit()
+
+    return jsonify({"job": job.to_dict()}), 202
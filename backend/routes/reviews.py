@@ -1,8 +1,10 @@
 from flask import Blueprint, request, jsonify
 from backend.services.scraper import scrape_reviews_for_business
 from backend.services.llm import process_reviews
+from backend.services.nlp_cache import cache_stats
 from backend.models.database import db
 from backend.models.review import Review
+from backend.models.review_topic import ReviewTopic
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from backend.models.business import Business
 from sqlalchemy import func
@@ -18,6 +20,17 @@ def analyze_reviews():
     return jsonify(results)
 
 
+@reviews_bp.route('/nlp-cache', methods=['GET'])
+@jwt_required()
+def get_nlp_cache_stats():
+    """
+    Hit rate and size of the NLP analysis cache. The size is the table's, but
+    hits, misses and evictions are counted by each process since it started, so
+    this only shows the ones of the process serving the request.
+    """
+    return jsonify(cache_stats()), 200
+
+
 
 @reviews_bp.route('/<int:business_id>', methods=['GET'])
 def get_reviews(business_id):
@@ -79,31 +92,12 @@ def get_topics_frequency(business_id):
     if not business:
         return jsonify({"error": "Business not found or access denied"}), 404
     
-    # Get all reviews for this business
-    reviews = Review.query.filter_by(business_id=business_id).all()
-    
-    # Count topic frequencies
-    topic_counts = {}
-    
-    for review in reviews:
-        if not review.topics:
-            continue
-            
-        # Parse topics
-        if isinstance(review.topics, str):
-            topics = [topic.strip() for topic in review.topics.split(',')]
-        else:
-            topics = [review.topics]
-        
-        for topic in topics:
-            if not topic:
-                continue
-                
-            # Update topic counts
-            topic_counts[topic] = topic_counts.get(topic, 0) + 1
-    
     # Get top 4 topics by frequency
-    top_topics = sorted(topic_counts.items(), key=lambda x: x[1], reverse=True)[:4]
+    top_topics = db.session.query(ReviewTopic.topic, func.count(ReviewTopic.id)).filter(
+        ReviewTopic.business_id == business_id
+    ).group_by(ReviewTopic.topic).order_by(
+        func.count(ReviewTopic.id).desc(), func.min(ReviewTopic.review_id)
+    ).limit(4).all()
     
     # Define colors for the top topics (updated colors)
     colors = ["#3B82F6", "#F59E42", "#10B981", "#F43F5E"]
@@ -120,5 +114,5 @@ def get_topics_frequency(business_id):
     
     return jsonify({
         "topics": topic_data,
-        "total_reviews": len(reviews)
+        "total_reviews": Review.query.filter_by(business_id=business_id).count()
     }), 200
\ No newline at end of file
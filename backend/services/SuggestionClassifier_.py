@@ -3,22 +3,20 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pickle
-import spacy
 import re
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 
+from backend.services.lemmatizer import BATCH_SIZE, N_PROCESS, lemmatize, lemmatize_batch, load_nlp
+
 
 class SuggestionClassifier:
     """A classifier that identifies suggestions in text."""
     
     def __init__(self):
         """Initialize the classifier."""
-        # Load spaCy model for text processing
-        self.nlp = spacy.load('en_core_web_sm')
-        
         # Initialize TF-IDF vectorizer
         self.vectorizer = TfidfVectorizer(max_features=5000, ngram_range=(1, 2))
         
@@ -57,29 +55,36 @@ class SuggestionClassifier:
         # Is the model fitted?
         self.is_fitted = False
     
+    @property
+    def nlp(self):
+        """The shared slim spaCy pipeline, loaded on first use"""
+        return load_nlp()
+    
+    def __getstate__(self):
+        # the spaCy pipeline is loaded by whoever unpickles, not stored
+        state = self.__dict__.copy()
+        state.pop('nlp', None)
+        return state
+    
+    def __setstate__(self, state):
+        # older pickles carry their own full pipeline, drop it for the shared slim one
+        state.pop('nlp', None)
+        self.__dict__.update(state)
+    
     def preprocess(self, text):
         """Clean and normalize text"""
-        # Convert to lowercase and strip whitespace
-        text = text.lower().strip()
-        
-        # Process with spaCy
-        doc = self.nlp(text)
-        
-        # Extract lemmatized tokens, excluding stopwords and punctuation
-        tokens = [token.lemma_ for token in doc 
-                 if not token.is_stop and not token.is_punct]
-        
-        return " ".join(tokens)
+        return lemmatize(text)
+    
+    def preprocess_batch(self, texts, batch_size=BATCH_SIZE, n_process=N_PROCESS):
+        """Clean and normalize many texts, streaming the ones not cached through spaCy in batches"""
+        return lemmatize_batch(texts, batch_size=batch_size, n_process=n_process)
     
     def _create_labeled_data(self, texts):
         """Create weakly labeled data based on pattern matching."""
-        X = []
+        X = self.preprocess_batch(texts)
         y = []
         
         for text in texts:
-            processed_text = self.preprocess(text)
-            X.append(processed_text)
-            
             # Check if any pattern matches
             is_suggestion = 0
             for pattern in self.compiled_patterns:
@@ -125,12 +130,30 @@ class SuggestionClassifier:
         proba = self.clf.predict_proba(X_tfidf)[0, 1]
         return proba
     
+    def predict_batch(self, texts, threshold=0.5, batch_size=BATCH_SIZE, n_process=N_PROCESS):
+        """Predict for each text if it contains a suggestion, as a boolean array."""
+        return self.predict_proba_batch(texts, batch_size=batch_size, n_process=n_process) >= threshold
+    
+    def predict_proba_batch(self, texts, batch_size=BATCH_SIZE, n_process=N_PROCESS):
+        """Get the probability that each text contains a suggestion, as an array.
+        
+        All texts go through one TF-IDF transform and one forest call, which is much
+        faster than predict_proba in a loop.
+        """
+        if not self.is_fitted:
+            raise ValueError("The classifier has not been trained yet. Call fit_unsupervised first.")
+        if not texts:
+            return np.zeros(0)
+        
+        X_tfidf = self.vectorizer.transform(self.preprocess_batch(texts, batch_size=batch_size, n_process=n_process))
+        return self.clf.predict_proba(X_tfidf)[:, 1]
+    
     def evaluate(self, texts, true_labels):
         """Evaluate the classifier on labeled data."""
         if not self.is_fitted:
             raise ValueError("The classifier has not been trained yet. Call fit_unsupervised first.")
         
-        predictions = [self.predict(text) for text in texts]
+        predictions = self.predict_batch(list(texts))
         
         # Calculate evaluation metrics
         accuracy = accuracy_score(true_labels, predictions)
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows, writes aren't locked there
+    fcntl = None
+
+CHECKPOINT_DIR = os.environ.get(
+    'SCRAPER_CHECKPOINT_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'checkpoints')
+)
+# the review list of a place changes over time, don't resume from checkpoints older than this
+CHECKPOINT_MAX_AGE = int(os.environ.get('SCRAPER_CHECKPOINT_MAX_AGE', 24 * 3600))
+
+
+class ScrapeCheckpoint:
+    """Progress of a single place's scrape, persisted so a crashed scrape can resume.
+
+    Two files are kept per place: a small json state file (offset reached, last
+    review id seen, iteration) that is replaced atomically, and an append-only
+    jsonl file with one line per scraped batch. Writers take an exclusive lock on
+    a third, empty file so two scrapes of the same place can't interleave them.
+    """
+
+    def __init__(self, key, directory=CHECKPOINT_DIR):
+        self.key = key
+        self.directory = directory
+        self.state_path = os.path.join(directory, f'{key}.json')
+        self.batches_path = os.path.join(directory, f'{key}.jsonl')
+        self.lock_path = os.path.join(directory, f'{key}.lock')
+
+    @classmethod
+    def for_url(cls, url, mode='full', directory=CHECKPOINT_DIR):
+        """Checkpoint of the place at a Google Maps url.
+
+        An incremental scrape stops at the first known review and a full one
+        doesn't, so each mode gets its own checkpoint and never resumes the other's.
+        """
+        digest = hashlib.sha1(f'{mode}:{url}'.encode('utf-8')).hexdigest()[:16]
+        return cls(f'{mode}-{digest}', directory)
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.lock_path, 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def load(self, max_age=CHECKPOINT_MAX_AGE):
+        """Return the saved state, or None if there is no usable checkpoint"""
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - state.get('updated_at', 0) > max_age:
+            self.clear()
+            return None
+        return state
+
+    def save_batch(self, reviews, offset, iteration):
+        """Append a scraped batch, then move the state forward past it"""
+        state = {
+            'offset': offset,
+            'iteration': iteration,
+            'last_review_id': reviews[-1].get('id_review') if reviews else None,
+            'updated_at': time.time(),
+        }
+        with self._locked():
+            with open(self.batches_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(reviews, ensure_ascii=False, default=str) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+            # a tmp file per process, a concurrent os.replace can't pick up a half written one
+            tmp_path = f'{self.state_path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+
+    def read_batches(self):
+        """Yield the batches saved so far; a torn last line from a crash is skipped"""
+        try:
+            with open(self.batches_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except OSError:
+            return
+
+    def clear(self):
+        """Remove the checkpoint once the scrape has finished"""
+        with self._locked():
+            for path in (self.state_path, self.batches_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
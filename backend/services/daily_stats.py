@@ -0,0 +1,285 @@
+# Per business and day review counts and sums (business_daily_stats), so the
+# dashboard's trend charts read one row per day instead of every review.
+#
+# Ingest adds its new reviews to the rollup in the same transaction. To rebuild
+# it from the review table, run from the repo root:
+#   python -m backend.services.daily_stats
+#   python -m backend.services.daily_stats --business-id 3
+import argparse
+import os
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import case, func, select
+
+from backend.models.business_daily_stats import BusinessDailyStats
+from backend.models.database import db, dialect_insert
+from backend.models.review import Review
+
+COUNTERS = [
+    'review_count', 'rating_count', 'rating_sum', 'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5',
+    'sentiment_sum', 'positive_count', 'neutral_count', 'negative_count', 'suggestion_count',
+]
+SENTIMENTS = ('positive', 'neutral', 'negative')
+STARS = range(1, 6)
+# days of reviews each dashboard period looks back over
+PERIOD_DAYS = {'week': 7, 'month': 30, 'quarter': 90, 'year': 365}
+# the Review columns the rollup counts
+REVIEW_COLUMNS = ['business_id', 'review_date_estimate', 'rating', 'senti_score', 'sentiment_description',
+                  'is_suggestion']
+
+
+def in_star(rating, star):
+    """
+    Whether a rating counts under a star, halves round up. Works on numbers and
+    on column expressions, so record_reviews and the rebuild agree on x.5 ratings.
+    """
+    return (rating >= star - 0.5) & (rating < star + 0.5)
+
+
+def review_stats(review):
+    """The columns of a Review the rollup counts, as a mapping for record_reviews"""
+    return {name: getattr(review, name) for name in REVIEW_COLUMNS}
+
+
+def record_reviews(reviews, sign=1):
+    """
+    Add reviews to the rollup, in the caller's transaction.
+
+    Args:
+        reviews (list): Review rows as mappings of column name to value, not counted
+            yet; reviews without a date estimate are skipped
+        sign (int): -1 to take the reviews back out, before they are overwritten
+    """
+    days = {}
+    for review in reviews:
+        date_estimate = review.get('review_date_estimate')
+        if date_estimate is None:
+            continue
+        stats = days.setdefault((review['business_id'], date_estimate.date()), dict.fromkeys(COUNTERS, 0))
+        stats['review_count'] += sign
+        rating = review.get('rating')
+        if rating is not None:
+            stats['rating_count'] += sign
+            stats['rating_sum'] += sign * rating
+            for star in STARS:
+                if in_star(rating, star):
+                    stats[f'rating_{star}'] += sign
+        stats['sentiment_sum'] += sign * (review.get('senti_score') or 0)
+        sentiment = (review.get('sentiment_description') or '').lower()
+        if sentiment in SENTIMENTS:
+            stats[f'{sentiment}_count'] += sign
+        if review.get('is_suggestion'):
+            stats['suggestion_count'] += sign
+
+    rows = [dict(stats, business_id=business_id, date=day) for (business_id, day), stats in days.items()]
+    if not rows:
+        return
+    table = BusinessDailyStats.__table__
+    statement = dialect_insert(table)
+    # executemany of one cached statement, SQLAlchemy batches the rows into multi-row INSERTs
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=['business_id', 'date'],
+        set_={name: table.c[name] + statement.excluded[name] for name in COUNTERS}
+    ), rows)
+
+
+def counter_columns():
+    """Aggregates of the selected reviews, one per name in COUNTERS"""
+    sentiment = func.lower(Review.sentiment_description)
+    return [
+        func.count(Review.id),
+        func.count(Review.rating),
+        func.coalesce(func.sum(Review.rating), 0),
+        *[func.sum(case((in_star(Review.rating, value), 1), else_=0)) for value in STARS],
+        func.coalesce(func.sum(Review.senti_score), 0),
+        *[func.sum(case((sentiment == value, 1), else_=0)) for value in SENTIMENTS],
+        func.sum(case((Review.is_suggestion, 1), else_=0)),
+    ]
+
+
+def daily_stats_select(business_id=None):
+    """SELECT of the rollup rows (business_id, date, *COUNTERS) computed from the review table"""
+    day = func.date(Review.review_date_estimate)
+    statement = select(Review.business_id, day, *counter_columns()).group_by(Review.business_id, day)
+    if business_id is not None:
+        statement = statement.where(Review.business_id == business_id)
+    return statement
+
+
+def review_counters(business_id, *conditions):
+    """COUNTERS of the reviews of a business matching conditions, read from the review table"""
+    row = db.session.execute(
+        select(*counter_columns()).where(Review.business_id == business_id, *conditions)
+    ).one()
+    # the sums are NULL when no review matched
+    return {name: value or 0 for name, value in zip(COUNTERS, row)}
+
+
+def rebuild_daily_stats(business_id=None, only_if_empty=False):
+    """
+    Recompute the rollup from the review table with one GROUP BY and commit.
+
+    Args:
+        business_id (int, optional): Only rebuild this business
+        only_if_empty (bool): Do nothing if the rollup already has rows, the
+            cheap check run at startup
+
+    Returns:
+        int: The number of days written
+    """
+    if only_if_empty and db.session.query(BusinessDailyStats.id).first() is not None:
+        return 0
+
+    existing = BusinessDailyStats.query
+    if business_id is not None:
+        existing = existing.filter(BusinessDailyStats.business_id == business_id)
+
+    existing.delete(synchronize_session=False)
+    result = db.session.execute(BusinessDailyStats.__table__.insert().from_select(
+        ['business_id', 'date'] + COUNTERS, daily_stats_select(business_id)
+    ))
+    db.session.commit()
+    if result.rowcount:
+        print(f"Rebuilt {result.rowcount} days of review stats")
+    return result.rowcount
+
+
+def get_daily_stats(business_id, start_date=None):
+    """The rollup rows of a business, oldest first, from start_date (a date) on"""
+    query = BusinessDailyStats.query.filter(BusinessDailyStats.business_id == business_id)
+    if start_date is not None:
+        query = query.filter(BusinessDailyStats.date >= start_date)
+    return query.order_by(BusinessDailyStats.date).all()
+
+
+def first_day_conditions(start):
+    """
+    Filters of the reviews on start's day from start's time of day on. The rollup
+    only has whole days, so that day is counted from the review table.
+
+    Returns:
+        tuple: (list of Review conditions, the date the rollup is read from)
+    """
+    next_day = start.date() + timedelta(days=1)
+    conditions = [Review.review_date_estimate >= start,
+                  Review.review_date_estimate < datetime.combine(next_day, time())]
+    return conditions, next_day
+
+
+def get_period_stats(business_id, start):
+    """The COUNTERS of each day of a business from the datetime start on, oldest first, as (date, dict)"""
+    conditions, next_day = first_day_conditions(start)
+    days = [(start.date(), review_counters(business_id, *conditions))]
+    for stats in get_daily_stats(business_id, next_day):
+        days.append((stats.date, {name: getattr(stats, name) for name in COUNTERS}))
+    return days
+
+
+def get_sentiment_trends(business_id, period, now=None):
+    """
+    Average sentiment over time and the sentiment distribution of a period.
+
+    The buckets are the ones the dashboard used to fill review by review: the
+    period starts at now's time of day, and a month keeps its four weeks dated
+    28 to 7 days ago even though the last day falls in none of them.
+
+    Args:
+        business_id (int): The business
+        period (str): One of PERIOD_DAYS. A week is split in days, a month in
+            weeks, a quarter in months and a year in quarters
+        now (datetime, optional): End of the period, defaults to now
+
+    Returns:
+        tuple: (trend buckets as dicts of date, avg_sentiment and review_count,
+            count per sentiment, total reviews)
+    """
+    now = now or datetime.now()
+    start = now - timedelta(days=PERIOD_DAYS[period])
+    days = get_period_stats(business_id, start)
+
+    if period == 'week':
+        keys = [(now - timedelta(days=6 - i)).strftime('%Y-%m-%d') for i in range(7)]
+    elif period == 'month':
+        keys = [(now - timedelta(days=28 - i * 7)).strftime('%Y-%m-%d') for i in range(4)]
+    elif period == 'quarter':
+        keys = [(now - timedelta(days=90 - i * 30)).strftime('%Y-%m') for i in range(3)]
+    else:
+        keys = [_quarter(now - timedelta(days=365 - i * 90)) for i in range(4)]
+    # a review went to the first week dated less than 7 days after and at most 6 days
+    # before it; for a day's reviews after midnight that is the week dated 5 days
+    # before to 1 day after the day, or the first week for the days before it
+    first_week = (now - timedelta(days=29)).date()
+
+    buckets = {key: {'count': 0, 'sentiment': 0.0} for key in keys}
+    distribution = dict.fromkeys(SENTIMENTS, 0)
+    total = 0
+    for day, stats in days:
+        if period == 'week':
+            key = day.strftime('%Y-%m-%d')
+        elif period == 'month':
+            week = max((day - first_week).days // 7, 0)
+            key = keys[week] if week < len(keys) else None
+        elif period == 'quarter':
+            key = day.strftime('%Y-%m')
+        else:
+            key = _quarter(day)
+
+        if key in buckets:
+            _add_to_bucket(buckets[key], stats)
+        for sentiment in SENTIMENTS:
+            distribution[sentiment] += stats[f'{sentiment}_count']
+        total += stats['review_count']
+
+    if period == 'month':
+        # a review at exactly midnight 6 days after a week's date is still in that week,
+        # the rest of its day is in the next one
+        for week, key in enumerate(keys):
+            boundary = datetime.strptime(key, '%Y-%m-%d') + timedelta(days=6)
+            stats = review_counters(business_id, Review.review_date_estimate == boundary)
+            if not stats['review_count']:
+                continue
+            _add_to_bucket(buckets[key], stats)
+            if week + 1 < len(keys):
+                _add_to_bucket(buckets[keys[week + 1]], stats, sign=-1)
+
+    trends = [{
+        'date': key,
+        'avg_sentiment': bucket['sentiment'] / bucket['count'] if bucket['count'] else 0,
+        'review_count': bucket['count'],
+    } for key, bucket in buckets.items()]
+    return trends, distribution, total
+
+
+def get_rating_counts(business_id, start=None):
+    """Number of reviews per star (as '1' to '5') of a business, from the datetime start on"""
+    query = db.session.query(*[
+        func.coalesce(func.sum(getattr(BusinessDailyStats, f'rating_{star}')), 0) for star in STARS
+    ]).filter(BusinessDailyStats.business_id == business_id)
+    first_day = dict.fromkeys(COUNTERS, 0)
+    if start is not None:
+        conditions, next_day = first_day_conditions(start)
+        query = query.filter(BusinessDailyStats.date >= next_day)
+        first_day = review_counters(business_id, *conditions)
+    return {str(star): int(count) + first_day[f'rating_{star}'] for star, count in zip(STARS, query.one())}
+
+
+def _add_to_bucket(bucket, stats, sign=1):
+    bucket['count'] += sign * stats['review_count']
+    bucket['sentiment'] += sign * stats['sentiment_sum']
+
+
+def _quarter(day):
+    return f'{day.year}-Q{(day.month - 1) // 3 + 1}'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rebuild the per day review stats from the reviews')
+    parser.add_argument('--business-id', type=int, help='only rebuild this business, defaults to all')
+    args = parser.parse_args()
+    # the schema is upgraded once by the web app or backend.models.upgrade, not here
+    os.environ['DB_UPGRADE_ON_START'] = '0'
+
+    from backend.app import app
+
+    with app.app_context():
+        rebuild_daily_stats(args.business_id)
@@ -0,0 +1,179 @@
+# Discovery of the places around a set of search points (see
+# googlemaps.gen_search_points), streamed to a csv or parquet file as they are
+# found instead of being collected in memory first.
+#
+# Run from the repo root:
+#   python -m backend.services.discovery restaurant cafe --output output/places.csv --workers 3
+import argparse
+import csv
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from backend.services.driver_pool import DriverPool
+from backend.services.googlemaps import MAX_PLACES, SQUARE_POINTS_CSV, GoogleMapsScraper, gen_search_points
+
+PLACE_FIELDS = ['search_point_url', 'href', 'name']
+# rows buffered per parquet row group
+PARQUET_CHUNK_SIZE = 1000
+
+
+class CsvPlaceSink:
+    """Appends places to a csv file, flushing after every write.
+
+    An existing file is appended to and its places are treated as seen, so an
+    interrupted discovery can simply be started again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.seen = set()
+        if os.path.exists(path):
+            with open(path, newline='', encoding='utf-8') as f:
+                self.seen.update(row['href'] for row in csv.DictReader(f))
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'a', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=PLACE_FIELDS, extrasaction='ignore')
+        if new_file:
+            self._writer.writeheader()
+
+    def write(self, places):
+        self._writer.writerows(places)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetPlaceSink:
+    """Writes places to a parquet file, one row group per PARQUET_CHUNK_SIZE places.
+
+    Parquet files can't be appended to, so an existing file is replaced.
+    """
+
+    def __init__(self, path, chunk_size=PARQUET_CHUNK_SIZE):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self.seen = set()
+        self.chunk_size = chunk_size
+        self._pa = pa
+        self._schema = pa.schema([(field, pa.string()) for field in PLACE_FIELDS])
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._buffer = []
+
+    def write(self, places):
+        self._buffer.extend(places)
+        if len(self._buffer) >= self.chunk_size:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            columns = {field: [place.get(field) for place in self._buffer] for field in PLACE_FIELDS}
+            self._writer.write_table(self._pa.Table.from_pydict(columns, schema=self._schema))
+            self._buffer = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+def open_place_sink(path):
+    """Sink for path, parquet if it ends in .parquet and csv otherwise"""
+    if path.endswith('.parquet'):
+        return ParquetPlaceSink(path)
+    return CsvPlaceSink(path)
+
+
+def _search_point_places(pool, search_point_url, max_places):
+    # runs in a worker thread with a driver of its own
+    with pool.driver() as driver, GoogleMapsScraper(driver=driver) as scraper:
+        return [place for batch in scraper.iter_places(search_point_url, max_places) for place in batch]
+
+
+def discover_places(search_point_urls, output, workers=1, max_places=MAX_PLACES, scraper=None):
+    """Find the places around every search point and write each new one to output.
+
+    Args:
+        search_point_urls (list): Google Maps search urls
+        output (str): csv or parquet file to write the places to
+        workers (int): Number of search points searched at once, each in its own browser
+        max_places (int): Stop scrolling a search's results after this many places
+        scraper (GoogleMapsScraper, optional): Search sequentially with this scraper's
+            driver instead of a pool of browsers
+
+    Returns:
+        int: Number of new places written
+    """
+    sink = open_place_sink(output)
+    written = 0
+
+    def write_new(places):
+        nonlocal written
+        new_places = []
+        for place in places:
+            if place['href'] not in sink.seen:
+                sink.seen.add(place['href'])
+                new_places.append(place)
+        if new_places:
+            sink.write(new_places)
+            written += len(new_places)
+
+    try:
+        if scraper is not None:
+            for i, search_point_url in enumerate(search_point_urls):
+                print(f"{i + 1}/{len(search_point_urls)} {search_point_url}")
+                for places in scraper.iter_places(search_point_url, max_places):
+                    write_new(places)
+            return written
+
+        pool = DriverPool(size=workers)
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                urls = iter(search_point_urls)
+                pending = {}
+                done_count = 0
+                while True:
+                    # only keep `workers` searches in flight so results are written as they come
+                    while len(pending) < workers:
+                        url = next(urls, None)
+                        if url is None:
+                            break
+                        pending[executor.submit(_search_point_places, pool, url, max_places)] = url
+                    if not pending:
+                        break
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        url = pending.pop(future)
+                        done_count += 1
+                        try:
+                            write_new(future.result())
+                            print(f"{done_count}/{len(search_point_urls)} {url}")
+                        except Exception as e:
+                            print(f"Error searching {url}: {e}")
+        finally:
+            pool.close()
+    finally:
+        sink.close()
+
+    return written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Discover the places around the square points of each city')
+    parser.add_argument('keywords', nargs='+', help='what to search for at every point')
+    parser.add_argument('--points', default=SQUARE_POINTS_CSV, help='csv with city, latitude and longitude')
+    parser.add_argument('--output', default='output/places_wax.csv', help='.csv or .parquet file')
+    parser.add_argument('--workers', type=int, default=2, help='number of browsers searching at once')
+    parser.add_argument('--max-places', type=int, default=MAX_PLACES)
+    args = parser.parse_args()
+
+    urls = gen_search_points(args.keywords, path=args.points)
+    total = discover_places(urls, args.output, workers=args.workers, max_places=args.max_places)
+    print(f"Wrote {total} new places to {args.output}")
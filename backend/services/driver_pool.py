@@ -0,0 +1,200 @@
+import atexit
+import logging
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver import ChromeOptions as Options
+from selenium.webdriver.chrome.service import Service
+
+GM_WEBPAGE = 'https://www.google.com/maps/'
+
+# number of browsers kept alive per process
+POOL_SIZE = int(os.environ.get('SCRAPER_POOL_SIZE', 2))
+# a browser is recycled after this many scrapes to keep memory growth in check
+MAX_USES_PER_DRIVER = int(os.environ.get('SCRAPER_DRIVER_MAX_USES', 20))
+# seconds to wait for a free browser before giving up
+ACQUIRE_TIMEOUT = int(os.environ.get('SCRAPER_POOL_ACQUIRE_TIMEOUT', 600))
+
+logger = logging.getLogger('googlemaps-scraper')
+
+
+def create_driver(debug=False, start_url=GM_WEBPAGE):
+    """Start a new Chrome webdriver configured for scraping Google Maps"""
+    options = Options()
+
+    if not debug:
+        options.add_argument("--headless")
+    else:
+        options.add_argument("--window-size=1366,768")
+
+    options.add_argument("--disable-notifications")
+    #options.add_argument("--lang=en-GB")
+    options.add_argument("--accept-lang=en-GB")
+
+    # run chromedriver (and the chrome it spawns) in its own process group so it
+    # can be killed without touching the browsers of other scrapes on this host
+    service = Service(popen_kw={'start_new_session': True}) if os.name == 'posix' else Service()
+    input_driver = webdriver.Chrome(service=service, options=options)
+
+     # click on google agree button so we can continue (not needed anymore)
+     # EC.element_to_be_clickable((By.XPATH, '//span[contains(text(), "I agree")]')))
+    input_driver.get(start_url)
+
+    return input_driver
+
+
+def kill_driver_processes(driver):
+    """Force kill the chromedriver process (and its browser) behind a single driver"""
+    try:
+        process = driver.service.process
+    except AttributeError:
+        return
+
+    if process is None or process.poll() is not None:
+        return
+
+    try:
+        if os.name == 'posix':
+            os.killpg(os.getpgid(process.pid), signal.SIGKILL)
+        else:
+            process.kill()
+        logger.info(f"Killed chromedriver process {process.pid}")
+    except Exception as e:
+        logger.warning(f"Error killing chromedriver process {process.pid}: {e}")
+
+
+def quit_driver(driver):
+    """Quit a driver, falling back to killing its processes if quit fails"""
+    try:
+        driver.quit()
+    except Exception as e:
+        logger.warning(f"Error quitting driver: {e}")
+    kill_driver_processes(driver)
+
+
+class PooledDriver:
+    """A webdriver owned by a DriverPool together with its usage bookkeeping"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.time()
+
+
+class DriverPool:
+    """A thread-safe pool of reusable headless Chrome drivers.
+
+    Drivers are started lazily up to `size`, health checked before being handed
+    out, and recycled after `max_uses` scrapes or as soon as they look broken.
+    """
+
+    def __init__(self, size=POOL_SIZE, max_uses=MAX_USES_PER_DRIVER, debug=False):
+        if size < 1:
+            raise ValueError("Driver pool size must be at least 1")
+
+        self.size = size
+        self.max_uses = max_uses
+        self.debug = debug
+
+        self._idle = []
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def acquire(self, timeout=ACQUIRE_TIMEOUT):
+        """Take a healthy driver out of the pool, starting one if none is idle"""
+        if self._closed:
+            raise RuntimeError("Driver pool is closed")
+
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No scraper driver became available within {timeout}s")
+
+        try:
+            while True:
+                with self._lock:
+                    pooled = self._idle.pop() if self._idle else None
+
+                if pooled is None:
+                    return PooledDriver(create_driver(debug=self.debug))
+
+                if self._is_healthy(pooled.driver):
+                    return pooled
+
+                logger.info("Discarding unhealthy pooled driver")
+                quit_driver(pooled.driver)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, pooled, broken=False):
+        """Give a driver back to the pool, recycling it if it is broken or worn out"""
+        pooled.uses += 1
+        try:
+            if self._closed or broken or pooled.uses >= self.max_uses or not self._reset(pooled.driver):
+                quit_driver(pooled.driver)
+            else:
+                with self._lock:
+                    self._idle.append(pooled)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self, timeout=ACQUIRE_TIMEOUT):
+        """Context manager lending a driver for the duration of one scrape"""
+        pooled = self.acquire(timeout=timeout)
+        broken = False
+        try:
+            yield pooled.driver
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self.release(pooled, broken=broken)
+
+    def close(self):
+        """Quit every idle driver; drivers still in use are quit on release"""
+        self._closed = True
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            quit_driver(pooled.driver)
+
+    def _is_healthy(self, driver):
+        try:
+            driver.current_url
+            return len(driver.window_handles) > 0
+        except Exception:
+            return False
+
+    def _reset(self, driver):
+        """Bring a driver back to a clean single-window state, False if that fails"""
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.switch_to.default_content()
+            driver.get('about:blank')
+            return True
+        except Exception as e:
+            logger.warning(f"Error resetting pooled driver: {e}")
+            return False
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    """Return the process-wide driver pool, creating it on first use"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = DriverPool()
+            atexit.register(_default_pool.close)
+        return _default_pool
@@ -1,15 +1,21 @@
+# Trains the suggestion classifier and saves it as the model artifact review.py loads:
+#   python -m backend.services.export_classifier
+# This is the only way to get one: the app doesn't start without it, and old
+# suggestion_detector.pkl files are no longer read.
+import os
+
 from backend.services.SuggestionClassifier_ import SuggestionClassifier
-import pickle  # Import pickle
+from backend.services.suggestion_model import MODEL_DIR, SERVICES_DIR, export_model
 
 def create_training_data():
     suggestion_reviews = []
     non_suggestion_reviews = []
 
-    with open('sugg_train.txt', 'r') as f:
+    with open(os.path.join(SERVICES_DIR, 'sugg_train.txt'), 'r') as f:
         for line in f:
             suggestion_reviews.append(line.strip())
 
-    with open('non_sugg_train.txt', 'r') as f:
+    with open(os.path.join(SERVICES_DIR, 'non_sugg_train.txt'), 'r') as f:
         for line in f:
             non_suggestion_reviews.append(line.strip())
 
@@ -28,10 +34,9 @@ def train_classifier():
 
 trained_classifier = train_classifier()
 
-# Save the trained classifier to a pickle file
-with open('suggestion_detector.pkl', 'wb') as f:
-    pickle.dump(trained_classifier, f)
+# Save the trained classifier as a model artifact
+export_model(trained_classifier, MODEL_DIR)
 
-print("Trained classifier has been saved to suggestion_detector.pkl")
+print(f"Trained classifier has been saved to {MODEL_DIR}")
 
 # No need to run train_classifier() again in the main block, it's already done above
\ No newline at end of file
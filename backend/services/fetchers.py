@@ -0,0 +1,135 @@
+import logging
+import os
+from abc import ABC, abstractmethod
+
+import requests
+
+from backend.services.driver_pool import get_driver_pool
+from backend.services.googlemaps import GoogleMapsScraper, parse_review, parse_review_blocks
+from backend.services.rate_limit import get_rate_limiter
+
+# selenium, http, or auto (http first, selenium when the page has no reviews in it).
+# Live Google Maps pages are rendered client side, so http and auto only pay off
+# for cached or recorded pages and stand-in servers.
+REVIEW_FETCHER = os.environ.get('REVIEW_FETCHER', 'selenium')
+HTTP_TIMEOUT = 20
+# reviews per yielded batch, roughly what one scroll of the review pane loads
+HTTP_BATCH_SIZE = 10
+
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) '
+                  'Chrome/134.0.0.0 Safari/537.36',
+    'Accept-Language': 'en-GB,en;q=0.9',
+}
+
+logger = logging.getLogger('googlemaps-scraper')
+
+
+class FetcherUnavailable(Exception):
+    """Raised by a fetcher that can't get the reviews of a url before yielding any"""
+
+
+class ReviewFetcher(ABC):
+    """Source of the raw reviews of a place.
+
+    iter_reviews yields lists of reviews in the field mapping produced by
+    googlemaps.parse_review, newest first, leaving out known_ids and stopping
+    at the first batch made only of known reviews.
+    """
+
+    name = None
+
+    @abstractmethod
+    def iter_reviews(self, url, known_ids=None, checkpoint=None):
+        """Yield the batches of reviews of url, see the class docstring"""
+
+
+class SeleniumReviewFetcher(ReviewFetcher):
+    """Scrolls the review pane in a pooled headless Chrome"""
+
+    name = 'selenium'
+
+    def __init__(self, pool=None):
+        self.pool = pool
+
+    def iter_reviews(self, url, known_ids=None, checkpoint=None):
+        pool = self.pool or get_driver_pool()
+        with pool.driver() as driver, GoogleMapsScraper(driver=driver) as scraper:
+            yield from scraper.iter_reviews(url, known_ids=known_ids, checkpoint=checkpoint)
+            logger.info(f"Finished scraping, waited {scraper.wait_time:.1f}s on the page")
+
+
+class HttpReviewFetcher(ReviewFetcher):
+    """Gets the review markup with a plain HTTP request, no browser involved.
+
+    Only works for pages that are served with their reviews already rendered
+    (cached or recorded pages, stand-in servers); raises FetcherUnavailable
+    otherwise so the caller can fall back to Selenium. Requests go through the
+    same per-host rate limiter as the Selenium scraper.
+    """
+
+    name = 'http'
+
+    def __init__(self, session=None, timeout=HTTP_TIMEOUT, batch_size=HTTP_BATCH_SIZE, rate_limiter=None):
+        self.session = session or requests.Session()
+        self.session.headers.update(HTTP_HEADERS)
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+
+    def fetch_reviews(self, url):
+        """Download url and parse every review block on it"""
+        self.rate_limiter.acquire(url)
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            self.rate_limiter.record_failure(url, 'http_error')
+            raise FetcherUnavailable(f"HTTP request failed: {e}")
+        self.rate_limiter.record_success(url)
+
+        blocks = parse_review_blocks([response.text])
+        if not blocks:
+            raise FetcherUnavailable("No reviews in the HTTP response")
+        return [parse_review(block) for block in blocks]
+
+    def iter_reviews(self, url, known_ids=None, checkpoint=None):
+        # a single request is cheap to redo, no need for checkpoints
+        known_ids = set(known_ids or ())
+        reviews = self.fetch_reviews(url)
+
+        for start in range(0, len(reviews), self.batch_size):
+            batch = reviews[start:start + self.batch_size]
+            new_reviews = [r for r in batch if r.get('id_review') not in known_ids]
+            if known_ids and not new_reviews:
+                break
+            yield new_reviews
+
+
+class FallbackReviewFetcher(ReviewFetcher):
+    """Tries each fetcher in turn until one can get the reviews"""
+
+    name = 'auto'
+
+    def __init__(self, fetchers):
+        self.fetchers = fetchers
+
+    def iter_reviews(self, url, known_ids=None, checkpoint=None):
+        for fetcher in self.fetchers:
+            try:
+                yield from fetcher.iter_reviews(url, known_ids=known_ids, checkpoint=checkpoint)
+                return
+            except FetcherUnavailable as e:
+                logger.info(f"{fetcher.name} fetcher unavailable for {url}: {e}")
+        raise FetcherUnavailable(f"No fetcher could get the reviews of {url}")
+
+
+def get_review_fetcher(name=REVIEW_FETCHER):
+    """Build the review fetcher configured by name (selenium, http or auto)"""
+    if name == 'selenium':
+        return SeleniumReviewFetcher()
+    if name == 'http':
+        return HttpReviewFetcher()
+    if name == 'auto':
+        return FallbackReviewFetcher([HttpReviewFetcher(), SeleniumReviewFetcher()])
+    raise ValueError(f"Unknown review fetcher: {name}")
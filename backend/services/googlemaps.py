@@ -4,6 +4,7 @@ import logging
 import re
 import time
 import traceback
+from collections import deque
 from datetime import datetime
 import threading
 
@@ -11,7 +12,7 @@ import numpy as np
 import pandas as pd
 from bs4 import BeautifulSoup
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver import ChromeOptions as Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.action_chains import ActionChains
@@ -21,18 +22,163 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 
-GM_WEBPAGE = 'https://www.google.com/maps/'
+from backend.services.driver_pool import GM_WEBPAGE, create_driver, kill_driver_processes
+from backend.services.rate_limit import get_rate_limiter
+
 MAX_WAIT = 10
 MAX_RETRY = 5
 MAX_SCROLLS = 40
+# lower bound for the adaptive wait on newly loaded reviews
+MIN_LOAD_WAIT = 2
+# the adaptive timeout is this many times the average of the recent load times
+LOAD_WAIT_FACTOR = 3
+LOAD_TIME_WINDOW = 10
+
+# TODO: Subject to changes
+REVIEW_SELECTOR = 'div.jftiEf.fontBodyMedium'
+SPINNER_SELECTOR = 'div.m6QErb div.qjESne'
+
+# search results pane of a place search, the places in it, and the marker shown
+# once the list can't be scrolled any further (Google stops at around 120)
+RESULTS_SELECTOR = "div.m6QErb.DxyBCb.kA9KIf.dS8AEf.ecceSd > div[aria-label*='Results for']"
+PLACE_SELECTOR = RESULTS_SELECTOR + ' div[jsaction] > a[href]'
+END_OF_LIST_SELECTOR = 'span.HlvSq'
+MAX_PLACES = 120
+SQUARE_POINTS_CSV = 'input/square_points.csv'
+
+# returns the href and name of the places past the given offset
+NEW_PLACES_SCRIPT = '''
+return Array.from(document.querySelectorAll(arguments[0]))
+    .slice(arguments[1])
+    .map(function (el) { return [el.getAttribute('href'), el.getAttribute('aria-label')]; });
+'''
+
+# returns the outer html of the review blocks past the given offset, so only
+# newly loaded reviews cross the webdriver bridge and get parsed
+NEW_REVIEWS_SCRIPT = '''
+return Array.from(document.querySelectorAll(arguments[0]))
+    .slice(arguments[1])
+    .map(function (el) { return el.outerHTML; });
+'''
+
+
+def parse_review_blocks(fragments):
+    """Parse a list of review block html fragments into BeautifulSoup elements"""
+    if not fragments:
+        return []
+    response = BeautifulSoup(''.join(fragments), 'lxml')
+    # TODO: Subject to changes
+    return response.find_all('div', class_='jftiEf fontBodyMedium')
+
+
+def parse_review(review):
+    """Map a review block to the raw review fields used throughout the scraper"""
+
+    item = {}
+
+    try:
+        id_review = review['data-review-id']
+    except Exception as e:
+        id_review = None
+
+    try:
+
+        username = review['aria-label']
+    except Exception as e:
+        username = None
+
+    try:
+        review_text = filter_string(review.find('span', class_='wiI7pd').text)
+    except Exception as e:
+        review_text = None
+
+    try:
+        rating = float(review.find('span', class_='kvMYJc')['aria-label'].split(' ')[0])
+    except Exception as e:
+        rating = None
+
+    try:
+        relative_date = review.find('span', class_='rsqaWe').text
+    except Exception as e:
+        relative_date = None
+
+    try:
+        n_reviews = review.find('div', class_='RfnDt').text.split(' ')[3]
+    except Exception as e:
+        n_reviews = 0
+
+    try:
+        user_url = review.find('button', class_='WEBjve')['data-href']
+    except Exception as e:
+        user_url = None
+
+    item['id_review'] = id_review
+    item['caption'] = review_text
+
+    # depends on language, which depends on geolocation defined by Google Maps
+    # custom mapping to transform into date should be implemented
+    item['relative_date'] = relative_date
+
+    # store datetime of scraping and apply further processing to calculate
+    # correct date as retrieval_date - time(relative_date)
+    item['retrieval_date'] = datetime.now()
+    item['rating'] = rating
+    item['username'] = username
+    item['n_review_user'] = n_reviews
+    #item['n_photo_user'] = n_photos  ## not available anymore
+    item['url_user'] = user_url
+
+    return item
+
+
+def filter_string(str):
+    strOut = str.replace('\r', ' ').replace('\n', ' ').replace('\t', ' ')
+    return strOut
+
+
+def gen_search_points(keyword_list=None, path=SQUARE_POINTS_CSV):
+    """Search urls for every keyword at every latitude/longitude of each city's square"""
+    keyword_list = [] if keyword_list is None else keyword_list
+
+    square_points = pd.read_csv(path)
+
+    cities = square_points['city'].unique()
+
+    search_urls = []
+
+    for city in cities:
+
+        df_aux = square_points[square_points['city'] == city]
+        latitudes = df_aux['latitude'].unique()
+        longitudes = df_aux['longitude'].unique()
+        coordinates_list = list(itertools.product(latitudes, longitudes, keyword_list))
+
+        search_urls += [f"https://www.google.com/maps/search/{coordinates[2]}/@{str(coordinates[1])},{str(coordinates[0])},{str(15)}z"
+         for coordinates in coordinates_list]
+
+    return search_urls
+
 
 class GoogleMapsScraper:
 
-    def __init__(self, debug=False):
+    def __init__(self, debug=False, driver=None, rate_limiter=None):
         self.debug = debug
-        self.driver = self.__get_driver()
+        # a driver passed in (e.g. from a DriverPool) is borrowed: it is not quit on exit
+        self.owns_driver = driver is None
+        self.driver = driver if driver is not None else self.__get_driver()
         self.logger = self.__get_logger()
 
+        # total seconds spent waiting on the page, and recent review load times
+        # which drive the adaptive timeout in __wait_for_new_reviews
+        self.wait_time = 0.0
+        self.load_times = deque(maxlen=LOAD_TIME_WINDOW)
+
+        # every page load and scroll goes through the per-host limiter; the url
+        # of the place being scraped is what scrolls are accounted against
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.throttle_time = 0.0
+        self.url = None
+
     def __enter__(self):
         return self
     def __exit__(self, exc_type, exc_value, tb):
@@ -42,6 +188,12 @@ class GoogleMapsScraper:
             if exc_type is not None:
                 print(f"Exception occurred: {exc_type}")
                 traceback.print_exception(exc_type, exc_value, tb)
+
+        # borrowed drivers are cleaned up by their owner, which also needs to see
+        # the exception to know whether the driver can be reused
+        if not self.owns_driver:
+            self.driver = None
+            return False
         
         # First, try to close all open windows
         try:
@@ -87,147 +239,162 @@ class GoogleMapsScraper:
         return True
 
     def _force_kill_chromedriver(self):
-        """Force kill chromedriver processes if needed"""
+        """Force kill the chromedriver process behind this scraper's driver"""
         if self.debug:
-            print("Attempting to force kill chromedriver processes")
-        try:
-            import os
-            import signal
-            import subprocess
-            
-            # For macOS/Linux
-            try:
-                chromedriver_pids = subprocess.check_output(["pgrep", "chromedriver"]).decode().strip().split("\n")
-                for pid in chromedriver_pids:
-                    if pid:
-                        os.kill(int(pid), signal.SIGKILL)
-                        if self.debug:
-                            print(f"Killed chromedriver process {pid}")
-            except:
-                pass
-                
-            # For Windows
-            try:
-                os.system("taskkill /f /im chromedriver.exe")
-            except:
-                pass
-        except Exception as e:
-            if self.debug:
-                print(f"Error force killing chromedriver: {e}")
+            print("Attempting to force kill chromedriver process")
+        if self.driver:
+            kill_driver_processes(self.driver)
 
     def sort_by(self, url, ind):
 
+        self.url = url
+        self.__throttle()
         self.driver.get(url)
         self.__click_on_cookie_agreement()
 
-        wait = WebDriverWait(self.driver, MAX_WAIT)
-
         # open dropdown menu
         clicked = False
         tries = 0
         while not clicked and tries < MAX_RETRY:
             try:
-                menu_bt = wait.until(EC.element_to_be_clickable((By.XPATH, '//button[@data-value=\'Sort\']')))
+                menu_bt = self.__wait(EC.element_to_be_clickable((By.XPATH, '//button[@data-value=\'Sort\']')))
                 menu_bt.click()
 
+                self.__wait(EC.visibility_of_any_elements_located((By.XPATH, '//div[@role=\'menuitemradio\']')))
                 clicked = True
-                time.sleep(1)
             except Exception as e:
                 tries += 1
                 self.logger.warn('Failed to click sorting button')
+                # a missing sort button is what a throttled page looks like
+                self.rate_limiter.record_failure(url, 'sort_timeout')
 
             # failed to open the dropdown
             if tries == MAX_RETRY:
                 return -1
 
+            if not clicked:
+                self.__throttle()
+                self.driver.refresh()
+
         #  element of the list specified according to ind
         recent_rating_bt = self.driver.find_elements(By.XPATH, '//div[@role=\'menuitemradio\']')[ind]
+        old_reviews = self.driver.find_elements(By.CSS_SELECTOR, REVIEW_SELECTOR)
         recent_rating_bt.click()
 
-        # wait to load review (ajax call)
-        time.sleep(2)
+        # wait for the review list to be replaced by the sorted one (ajax call)
+        try:
+            if old_reviews:
+                self.__wait(EC.staleness_of(old_reviews[0]))
+            self.__wait(EC.presence_of_element_located((By.CSS_SELECTOR, REVIEW_SELECTOR)))
+            self.__wait(EC.invisibility_of_element_located((By.CSS_SELECTOR, SPINNER_SELECTOR)))
+        except TimeoutException:
+            self.logger.warning('Timed out waiting for sorted reviews to load')
 
         return 0
 
-    def get_places(self, keyword_list=None):
+    def get_places(self, keyword_list=None, output='output/places_wax.csv'):
+        """Search every point of input/square_points.csv for the keywords and
+        stream the places found to output (csv or parquet), deduplicated by href.
 
-        df_places = pd.DataFrame()
-        search_point_url_list = self._gen_search_points_from_square(keyword_list=keyword_list)
+        Uses this scraper's driver; see discovery.discover_places to search
+        several points in parallel.
 
-        for i, search_point_url in enumerate(search_point_url_list):
-            print(search_point_url)
+        Returns:
+            int: Number of distinct places written
+        """
+        from backend.services.discovery import discover_places
 
-            if (i+1) % 10 == 0:
-                print(f"{i}/{len(search_point_url_list)}")
-                df_places = df_places[['search_point_url', 'href', 'name', 'rating', 'num_reviews', 'close_time', 'other']]
-                df_places.to_csv('output/places_wax.csv', index=False)
+        search_point_url_list = self._gen_search_points_from_square(keyword_list=keyword_list)
+        return discover_places(search_point_url_list, output, scraper=self)
 
-            try:
-                self.driver.get(search_point_url)
-            except NoSuchElementException:
-                self.driver.quit()
-                self.driver = self.__get_driver()
-                self.driver.get(search_point_url)
+    def iter_places(self, search_point_url, max_places=MAX_PLACES):
+        """
+        Yields the places of a search as they are loaded, in batches of dicts
+        with search_point_url, href and name. The result list is scrolled until
+        it ends or max_places were found, so searches aren't capped at the first 20.
+        """
+        self.url = search_point_url
+        self.__throttle()
+        try:
+            self.driver.get(search_point_url)
+        except NoSuchElementException:
+            # a borrowed driver is discarded by its pool when the error reaches it
+            if not self.owns_driver:
+                raise
+            self.driver.quit()
+            self.driver = self.__get_driver()
+            self.driver.get(search_point_url)
+        self.__click_on_cookie_agreement()
 
-            # scroll to load all (20) places into the page
-            scrollable_div = self.driver.find_element(By.CSS_SELECTOR,
-                "div.m6QErb.DxyBCb.kA9KIf.dS8AEf.ecceSd > div[aria-label*='Results for']")
-            for i in range(10):
-                self.driver.execute_script('arguments[0].scrollTop = arguments[0].scrollHeight', scrollable_div)
+        try:
+            results = self.__wait(EC.presence_of_element_located((By.CSS_SELECTOR, RESULTS_SELECTOR)))
+        except TimeoutException:
+            # a search with a single match opens the place itself, nothing to list
+            self.logger.info(f"No result list for {search_point_url}")
+            return
 
-            # Get places names and href
-            time.sleep(2)
-            response = BeautifulSoup(self.driver.page_source, 'html.parser')
-            div_places = response.select('div[jsaction] > a[href]')
+        search_point = search_point_url.replace('https://www.google.com/maps/search/', '')
+        offset = 0
+        while offset < max_places:
+            places = self.driver.execute_script(NEW_PLACES_SCRIPT, PLACE_SELECTOR, offset)
+            if places:
+                offset += len(places)
+                yield [{'search_point_url': search_point, 'href': href, 'name': name} for href, name in places]
 
-            for div_place in div_places:
-                place_info = {
-                    'search_point_url': search_point_url.replace('https://www.google.com/maps/search/', ''),
-                    'href': div_place['href'],
-                    'name': div_place['aria-label']
-                }
+            if self.driver.find_elements(By.CSS_SELECTOR, END_OF_LIST_SELECTOR):
+                break
 
-                df_places = df_places.append(place_info, ignore_index=True)
+            # scroll to load the next page of places
+            self.__throttle()
+            self.driver.execute_script('arguments[0].scrollTop = arguments[0].scrollHeight', results)
 
-            # TODO: implement click to handle > 20 places
+            def places_loaded(driver):
+                return len(driver.find_elements(By.CSS_SELECTOR, PLACE_SELECTOR)) > offset or \
+                    bool(driver.find_elements(By.CSS_SELECTOR, END_OF_LIST_SELECTOR))
 
-        df_places = df_places[['search_point_url', 'href', 'name']]
-        df_places.to_csv('output/places_wax.csv', index=False)
+            try:
+                self.__wait(places_loaded, timeout=self.__load_timeout())
+            except TimeoutException:
+                break
 
 
     def get_reviews(self, offset):
 
         # scroll to load reviews
+        previous_count = len(self.driver.find_elements(By.CSS_SELECTOR, REVIEW_SELECTOR))
         self.__scroll()
 
         # wait for other reviews to load (ajax)
-        time.sleep(2)
+        self.__wait_for_new_reviews(previous_count)
 
         # expand review text
         self.__expand_reviews()
 
-        # parse reviews
-        response = BeautifulSoup(self.driver.page_source, 'html.parser')
-        # TODO: Subject to changes
-        rblock = response.find_all('div', class_='jftiEf fontBodyMedium')
+        # parse only the reviews loaded since the last call
+        fragments = self.driver.execute_script(NEW_REVIEWS_SCRIPT, REVIEW_SELECTOR, offset)
+        rblock = parse_review_blocks(fragments)
         parsed_reviews = []
-        for index, review in enumerate(rblock):
-            if index >= offset:
-                r = self.__parse(review)
-                parsed_reviews.append(r)
+        for review in rblock:
+            r = self.__parse(review)
+            parsed_reviews.append(r)
 
-                # logging to std out
-                print(f"Review by {r.get('username', 'unknown')} with rating {r.get('rating', 'N/A')}")
+            # logging to std out
+            print(f"Review by {r.get('username', 'unknown')} with rating {r.get('rating', 'N/A')}")
 
         return parsed_reviews
 
 
     def get_account(self, url):
 
+        self.url = url
+        self.__throttle()
         self.driver.get(url)
         self.__click_on_cookie_agreement()
 
-        time.sleep(2)
+        try:
+            self.__wait(EC.presence_of_element_located((By.CSS_SELECTOR, 'h1.DUwDvf')))
+        except TimeoutException:
+            self.logger.warning('Timed out waiting for place details to load')
 
         resp = BeautifulSoup(self.driver.page_source, 'html.parser')
 
@@ -237,62 +404,7 @@ class GoogleMapsScraper:
 
 
     def __parse(self, review):
-
-        item = {}
-
-        try:
-            id_review = review['data-review-id']
-        except Exception as e:
-            id_review = None
-
-        try:
-
-            username = review['aria-label']
-        except Exception as e:
-            username = None
-
-        try:
-            review_text = self.__filter_string(review.find('span', class_='wiI7pd').text)
-        except Exception as e:
-            review_text = None
-
-        try:
-            rating = float(review.find('span', class_='kvMYJc')['aria-label'].split(' ')[0])
-        except Exception as e:
-            rating = None
-
-        try:
-            relative_date = review.find('span', class_='rsqaWe').text
-        except Exception as e:
-            relative_date = None
-
-        try:
-            n_reviews = review.find('div', class_='RfnDt').text.split(' ')[3]
-        except Exception as e:
-            n_reviews = 0
-
-        try:
-            user_url = review.find('button', class_='WEBjve')['data-href']
-        except Exception as e:
-            user_url = None
-
-        item['id_review'] = id_review
-        item['caption'] = review_text
-
-        # depends on language, which depends on geolocation defined by Google Maps
-        # custom mapping to transform into date should be implemented
-        item['relative_date'] = relative_date
-
-        # store datetime of scraping and apply further processing to calculate
-        # correct date as retrieval_date - time(relative_date)
-        item['retrieval_date'] = datetime.now()
-        item['rating'] = rating
-        item['username'] = username
-        item['n_review_user'] = n_reviews
-        #item['n_photo_user'] = n_photos  ## not available anymore
-        item['url_user'] = user_url
-
-        return item
+        return parse_review(review)
 
 
     def __parse_place(self, response, url):
@@ -365,39 +477,82 @@ class GoogleMapsScraper:
 
 
     def _gen_search_points_from_square(self, keyword_list=None):
+        return gen_search_points(keyword_list=keyword_list)
 
 
-        keyword_list = [] if keyword_list is None else keyword_list
 
-        square_points = pd.read_csv('input/square_points.csv')
+    def __expand_reviews(self):
+        # use XPath to load complete reviews
+        # TODO: Subject to changes
+        buttons = self.driver.find_elements(By.CSS_SELECTOR,'button.w8nwRe.kyuRq')
+        for button in buttons:
+            self.driver.execute_script("arguments[0].click();", button)
+
 
-        cities = square_points['city'].unique()
+    def __wait(self, condition, timeout=MAX_WAIT):
+        """WebDriverWait.until that adds the time spent to self.wait_time"""
+        start = time.perf_counter()
+        try:
+            return WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(condition)
+        finally:
+            self.wait_time += time.perf_counter() - start
 
-        search_urls = []
 
-        for city in cities:
+    def __load_timeout(self):
+        # adapt to how fast this place has been loading so far, so a dead end
+        # (no more reviews) doesn't cost a full MAX_WAIT on a fast connection
+        if not self.load_times:
+            return MAX_WAIT
+        average = sum(self.load_times) / len(self.load_times)
+        return min(MAX_WAIT, max(MIN_LOAD_WAIT, LOAD_WAIT_FACTOR * average))
 
-            df_aux = square_points[square_points['city'] == city]
-            latitudes = df_aux['latitude'].unique()
-            longitudes = df_aux['longitude'].unique()
-            coordinates_list = list(itertools.product(latitudes, longitudes, keyword_list))
 
-            search_urls += [f"https://www.google.com/maps/search/{coordinates[2]}/@{str(coordinates[1])},{str(coordinates[0])},{str(15)}z"
-             for coordinates in coordinates_list]
+    def __wait_for_new_reviews(self, previous_count):
+        """Wait until more than previous_count reviews are rendered and the spinner is gone.
 
-        return search_urls
+        Returns False on timeout, which usually means there are no more reviews.
+        """
+        def reviews_loaded(driver):
+            if driver.find_elements(By.CSS_SELECTOR, SPINNER_SELECTOR):
+                return False
+            return len(driver.find_elements(By.CSS_SELECTOR, REVIEW_SELECTOR)) > previous_count
 
+        start = time.perf_counter()
+        try:
+            self.__wait(reviews_loaded, timeout=self.__load_timeout())
+        except TimeoutException:
+            self.logger.info(f"No new reviews loaded after {previous_count} reviews")
+            return False
 
+        self.load_times.append(time.perf_counter() - start)
+        return True
 
-    def __expand_reviews(self):
-        # use XPath to load complete reviews
-        # TODO: Subject to changes
-        buttons = self.driver.find_elements(By.CSS_SELECTOR,'button.w8nwRe.kyuRq')
-        for button in buttons:
-            self.driver.execute_script("arguments[0].click();", button)
+
+    def __scroll_to_offset(self, offset):
+        """Scroll until at least offset reviews are rendered, without parsing them.
+
+        Returns the number of rendered reviews, which is less than offset if the
+        list has become shorter since the offset was recorded.
+        """
+        count = len(self.driver.find_elements(By.CSS_SELECTOR, REVIEW_SELECTOR))
+        while count < offset:
+            self.__scroll()
+            if not self.__wait_for_new_reviews(count):
+                break
+            count = len(self.driver.find_elements(By.CSS_SELECTOR, REVIEW_SELECTOR))
+        return min(count, offset)
+
+
+    def __throttle(self):
+        """Wait for the rate limiter to allow another request to the place's host"""
+        waited = self.rate_limiter.acquire(self.url or GM_WEBPAGE)
+        if waited:
+            self.logger.info(f"Rate limited for {waited:.1f}s")
+        self.throttle_time += waited
 
 
     def __scroll(self):
+        self.__throttle()
         # TODO: Subject to changes
         scrollable_div = self.driver.find_element(By.CSS_SELECTOR,'div.m6QErb.DxyBCb.kA9KIf.dS8AEf')
         self.driver.execute_script('arguments[0].scrollTop = arguments[0].scrollHeight', scrollable_div)
@@ -409,6 +564,10 @@ class GoogleMapsScraper:
         logger = logging.getLogger('googlemaps-scraper')
         logger.setLevel(logging.DEBUG)
 
+        # scrapers are created once per business, only attach the handler once
+        if logger.handlers:
+            return logger
+
         # create console handler and set level to debug
         fh = logging.FileHandler('gm-scraper.log')
         fh.setLevel(logging.DEBUG)
@@ -426,28 +585,17 @@ class GoogleMapsScraper:
 
 
     def __get_driver(self, debug=False):
-        options = Options()
-
-        if not self.debug:
-            options.add_argument("--headless")
-        else:
-            options.add_argument("--window-size=1366,768")
-
-        options.add_argument("--disable-notifications")
-        #options.add_argument("--lang=en-GB")
-        options.add_argument("--accept-lang=en-GB")
-        input_driver = webdriver.Chrome(service=Service(), options=options)
-
-         # click on google agree button so we can continue (not needed anymore)
-         # EC.element_to_be_clickable((By.XPATH, '//span[contains(text(), "I agree")]')))
-        input_driver.get(GM_WEBPAGE)
-
-        return input_driver
+        return create_driver(debug=self.debug)
 
 
     def __click_on_cookie_agreement(self):
+        # the consent page is a redirect, don't wait for a button that isn't coming
+        if 'consent.' not in self.driver.current_url and \
+                not self.driver.find_elements(By.XPATH, '//span[contains(text(), "Reject all")]'):
+            return False
+
         try:
-            agree = WebDriverWait(self.driver, 10).until(
+            agree = self.__wait(
                 EC.element_to_be_clickable((By.XPATH, '//span[contains(text(), "Reject all")]')))
             agree.click()
 
@@ -460,24 +608,52 @@ class GoogleMapsScraper:
 
 
     def __filter_string(self, str):
-        strOut = str.replace('\r', ' ').replace('\n', ' ').replace('\t', ' ')
-        return strOut
+        return filter_string(str)
     
-    def get_all_reviews(self, url, max_iterations=15):
+    def iter_reviews(self, url, max_iterations=15, known_ids=None, checkpoint=None):
         """
-        Scrapes reviews from a Google Maps URL with proper termination.
+        Scrapes reviews from a Google Maps URL, yielding each newly loaded batch
+        as soon as it is parsed so callers can store it before scrolling further.
+
+        If known_ids (the id_review values already ingested for this place) is
+        given, the scrape runs incrementally: reviews are sorted newest first, so
+        scrolling stops as soon as a batch contains only known reviews, and known
+        reviews are left out of the batches.
+
+        If a ScrapeCheckpoint is given every batch is saved to it before being
+        yielded. When it holds the progress of an earlier scrape that died, the
+        saved batches are yielded first and scrolling resumes where it stopped.
+        An error while scrolling then raises instead of silently ending the
+        scrape, so the checkpoint is kept for the next attempt.
+
+        Raises:
+            RuntimeError: If the reviews couldn't be sorted by newest
         """
+        known_ids = set(known_ids or ())
+        state = checkpoint.load() if checkpoint else None
+
+        # reviews from the checkpoint are yielded again but shouldn't come back twice
+        replayed_ids = set()
+        if state:
+            self.logger.info(f"Resuming scrape from checkpoint at offset {state['offset']}")
+            for reviews in checkpoint.read_batches():
+                replayed_ids.update(r.get('id_review') for r in reviews)
+                yield reviews
         # Sort reviews by newest first
         error = self.sort_by(url, 1)
         
         if error != 0:
             self.logger.error(f"Failed to sort reviews for URL: {url}")
-            return {"error": "Failed to sort reviews", "reviews": []}
+            raise RuntimeError("Failed to sort reviews")
         
-        all_reviews = []
         offset = 0
         total_scraped = 0
         iteration = 0
+
+        if state:
+            # load the reviews we already have without parsing them again
+            offset = self.__scroll_to_offset(state['offset'])
+            iteration = state['iteration']
         
         while iteration < max_iterations:
             iteration += 1
@@ -486,36 +662,67 @@ class GoogleMapsScraper:
             try:
                 # Get reviews with timeout protection
                 reviews = self.get_reviews(offset)
-                
-                # IMPORTANT FIX: If this batch has no reviews, break the loop
-                if not reviews or len(reviews) == 0:
-                    self.logger.info("No more reviews found, breaking loop")
-                    break
-                    
-                all_reviews.extend(reviews)
-                total_scraped += len(reviews)
-                self.logger.info(f"Scraped {len(reviews)} reviews. Total so far: {total_scraped}")
-                
-                # Update offset for next batch
-                offset += len(reviews)
-                
-                # Add a small delay
-                time.sleep(2)
-                
             except Exception as e:
                 self.logger.error(f"Error while fetching reviews: {e}")
+                if checkpoint:
+                    raise
+                break
+                
+            # IMPORTANT FIX: If this batch has no reviews, break the loop
+            if not reviews or len(reviews) == 0:
+                if offset == 0:
+                    # a place with a review pane but not a single review loaded is throttling
+                    self.logger.warning("No reviews loaded at all, the page looks throttled")
+                    self.rate_limiter.record_failure(url, 'empty_page')
+                self.logger.info("No more reviews found, breaking loop")
                 break
+
+            self.rate_limiter.record_success(url)
+                
+            # Update offset for next batch (it counts every review block on the page)
+            offset += len(reviews)
+
+            new_reviews = [r for r in reviews if r.get('id_review') not in known_ids]
+            if known_ids and not new_reviews:
+                self.logger.info("Batch only contains already ingested reviews, breaking loop")
+                break
+
+            if replayed_ids:
+                new_reviews = [r for r in new_reviews if r.get('id_review') not in replayed_ids]
+            if checkpoint:
+                checkpoint.save_batch(new_reviews, offset, iteration)
+
+            total_scraped += len(new_reviews)
+            self.logger.info(f"Scraped {len(new_reviews)} new reviews. Total so far: {total_scraped}")
+            yield new_reviews
+
+        if checkpoint:
+            checkpoint.clear()
         
         # Add this log to confirm we exited the loop
         self.logger.info(f"Finished scraping loop after {iteration} iterations")
+        self.logger.info(f"Successfully scraped {total_scraped} reviews, spent {self.wait_time:.1f}s waiting on the page "
+                         f"and {self.throttle_time:.1f}s rate limited")
+
+    def get_all_reviews(self, url, max_iterations=15, known_ids=None, checkpoint=None):
+        """
+        Scrapes all reviews from a Google Maps URL into a single result.
+        See iter_reviews for the incremental known_ids mode and checkpoints.
+        """
+        all_reviews = []
+        try:
+            for reviews in self.iter_reviews(url, max_iterations=max_iterations, known_ids=known_ids,
+                                             checkpoint=checkpoint):
+                all_reviews.extend(reviews)
+        except RuntimeError as e:
+            return {"error": str(e), "reviews": []}
         
         result = {
             "place_url": url,
-            "total_reviews": total_scraped,
-            "reviews": all_reviews
+            "total_reviews": len(all_reviews),
+            "reviews": all_reviews,
+            "wait_seconds": round(self.wait_time, 2),
+            "throttled_seconds": round(self.throttle_time, 2)
         }
         
-        self.logger.info(f"Successfully scraped {total_scraped} reviews")
-        
         return result
-    
\ No newline at end of file
@@ -0,0 +1,173 @@
+# Database backed job queue for work that is too slow for a request, like
+# scraping and analyzing the reviews of a newly registered business.
+#
+# Web workers only enqueue jobs; start any number of job workers next to them:
+#   python -m backend.services.jobs --concurrency 2
+import argparse
+import multiprocessing
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from backend.models.business import Business
+from backend.models.database import db
+from backend.models.job import Job
+from backend.services.rate_limit import create_shared_rate_limiter, install_rate_limiter
+from backend.services.review import ingest_business_reviews
+
+# seconds an idle worker waits before polling for new jobs again
+POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', 2))
+# running jobs without a heartbeat for this long are assumed to belong to a dead worker and are requeued
+JOB_TIMEOUT = int(os.environ.get('JOB_TIMEOUT', 3600))
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+def enqueue_job(kind, business_id=None):
+    """Add a job to the queue. The caller is responsible for committing the session."""
+    job = Job(kind=kind, business_id=business_id, status='queued', progress=0, message='Waiting for a worker')
+    db.session.add(job)
+    db.session.flush()
+    return job
+
+
+def update_job(job, progress=None, message=None):
+    """Record the progress of a running job so it can be polled, and that its worker is alive"""
+    job.heartbeat_at = datetime.now(timezone.utc)
+    if progress is not None:
+        job.progress = progress
+    if message is not None:
+        job.message = message
+    db.session.commit()
+
+
+def claim_next_job():
+    """Atomically mark the oldest queued job as running and return it, or None"""
+    while True:
+        job = Job.query.filter_by(status='queued').order_by(Job.created_at, Job.id).first()
+        if job is None:
+            return None
+
+        # another worker may have claimed it in the meantime, only one update can match
+        now = datetime.now(timezone.utc)
+        claimed = Job.query.filter_by(id=job.id, status='queued').update(
+            {'status': 'running', 'started_at': now, 'heartbeat_at': now, 'message': 'Started'},
+            synchronize_session=False
+        )
+        db.session.commit()
+        if claimed:
+            db.session.refresh(job)
+            return job
+
+
+def requeue_stale_jobs(timeout=JOB_TIMEOUT):
+    """Put jobs whose worker died while running them back in the queue"""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=timeout)
+    # jobs claimed before heartbeats were recorded only have their start time
+    last_seen = db.func.coalesce(Job.heartbeat_at, Job.started_at)
+    requeued = Job.query.filter(Job.status == 'running', last_seen < cutoff).update(
+        {'status': 'queued', 'started_at': None, 'heartbeat_at': None, 'progress': 0,
+         'message': 'Requeued after worker timeout'},
+        synchronize_session=False
+    )
+    db.session.commit()
+    return requeued
+
+
+def run_job(job):
+    """Run a claimed job with its handler and record the outcome"""
+    handler = JOB_HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown job kind: {job.kind}")
+        message = handler(job)
+        job.status = 'done'
+        job.progress = 100
+        job.message = message or 'Done'
+    except Exception as e:
+        print(f"Job {job.id} failed: {e}")
+        db.session.rollback()
+        job.status = 'failed'
+        job.error = str(e)
+    job.finished_at = datetime.now(timezone.utc)
+    db.session.commit()
+
+
+def work(poll_interval=POLL_INTERVAL, once=False):
+    """Process jobs until stopped. Must run inside an app context.
+
+    Args:
+        poll_interval (float): Seconds to sleep when the queue is empty
+        once (bool): Return as soon as the queue is empty instead of polling
+    """
+    while True:
+        job = claim_next_job()
+        if job is None:
+            if once:
+                return
+            requeue_stale_jobs()
+            time.sleep(poll_interval)
+            continue
+
+        print(f"Running job {job.id} ({job.kind})")
+        run_job(job)
+
+
+def scrape_business_job(job):
+    """Scrape a business's Google Maps reviews and analyze them"""
+    business = db.session.get(Business, job.business_id)
+    if business is None:
+        raise ValueError(f"Business {job.business_id} not found")
+
+    update_job(job, progress=10, message='Scraping reviews')
+
+    # the total isn't known up front, creep towards 90% as batches are stored
+    batches = 0
+
+    def on_batch(total):
+        nonlocal batches
+        batches += 1
+        update_job(job, progress=min(90, 10 + 5 * batches), message=f'Stored {total} reviews so far')
+
+    total = ingest_business_reviews(business, incremental=True, on_batch=on_batch)
+    return f'Stored {total} new reviews'
+
+
+JOB_HANDLERS = {
+    'scrape_business': scrape_business_job,
+}
+
+
+def _worker_main(poll_interval, rate_limiter=None):
+    if rate_limiter is not None:
+        install_rate_limiter(rate_limiter)
+
+    # import the app in the worker itself so no connection is shared across processes
+    from backend.app import app
+
+    with app.app_context():
+        work(poll_interval=poll_interval)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run background job workers')
+    parser.add_argument('--concurrency', type=int, default=1, help='number of worker processes')
+    parser.add_argument('--poll-interval', type=float, default=POLL_INTERVAL)
+    args = parser.parse_args()
+    # the schema is upgraded once by the web app or backend.models.upgrade, not here
+    os.environ['DB_UPGRADE_ON_START'] = '0'
+
+    if args.concurrency == 1:
+        _worker_main(args.poll_interval)
+    else:
+        # the workers scrape the same hosts, so they share one rate limiter
+        with multiprocessing.Manager() as manager:
+            rate_limiter = create_shared_rate_limiter(manager)
+            workers = [
+                multiprocessing.Process(target=_worker_main, args=(args.poll_interval, rate_limiter))
+                for _ in range(args.concurrency)
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
@@ -0,0 +1,82 @@
+# Lemmatization for the suggestion classifiers, which only need lemmas and
+# stop word/punctuation flags from spaCy.
+#
+# The pipeline is loaded once per process without the dependency parser and the
+# entity recognizer, and lemmatized texts are kept in an LRU cache since the
+# same review is classified again on every re-scrape.
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+SPACY_MODEL = 'en_core_web_sm'
+# the rule lemmatizer reads the part of speech set by the tagger and the
+# attribute ruler, so only the components after it are left out
+EXCLUDED_COMPONENTS = ('parser', 'ner', 'senter')
+CACHE_SIZE = int(os.environ.get('SUGGESTION_LEMMA_CACHE_SIZE', 50000))
+# processes spaCy spreads a batch over, worth it from a few thousand texts
+N_PROCESS = int(os.environ.get('SUGGESTION_N_PROCESS', 1))
+BATCH_SIZE = 256
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def load_nlp(model=SPACY_MODEL):
+    """The spaCy pipeline with only the components lemmatization needs"""
+    import spacy
+
+    return spacy.load(model, exclude=list(EXCLUDED_COMPONENTS))
+
+
+def _lemmas(doc):
+    return " ".join(token.lemma_ for token in doc if not token.is_stop and not token.is_punct)
+
+
+def _cached(texts):
+    with _cache_lock:
+        found = {}
+        for text in texts:
+            if text in _cache:
+                _cache.move_to_end(text)
+                found[text] = _cache[text]
+        return found
+
+
+def _store(results, cache_size):
+    with _cache_lock:
+        _cache.update(results)
+        while len(_cache) > cache_size:
+            _cache.popitem(last=False)
+
+
+def lemmatize(text):
+    """Lowercased lemmas of a text, without stop words and punctuation"""
+    return lemmatize_batch([text])[0]
+
+
+def lemmatize_batch(texts, batch_size=BATCH_SIZE, n_process=N_PROCESS, cache_size=None):
+    """
+    Lemmatize many texts, running spaCy only on the ones not seen before.
+
+    Args:
+        texts (list): The texts to lemmatize
+        batch_size (int): Texts per nlp.pipe batch
+        n_process (int): Processes nlp.pipe uses, 1 to stay in this process
+        cache_size (int, optional): Lemmatized texts kept between calls, CACHE_SIZE if not given
+
+    Returns:
+        list: The space separated lemmas of each text, in order
+    """
+    normalized = [text.lower().strip() for text in texts]
+    results = _cached(set(normalized))
+
+    missing = [text for text in dict.fromkeys(normalized) if text not in results]
+    if missing:
+        docs = load_nlp().pipe(missing, batch_size=batch_size, n_process=n_process)
+        computed = {text: _lemmas(doc) for text, doc in zip(missing, docs)}
+        _store(computed, CACHE_SIZE if cache_size is None else cache_size)
+        results.update(computed)
+
+    return [results[text] for text in normalized]
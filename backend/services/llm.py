@@ -1,36 +1,41 @@
-from datetime import datetime
-from google.cloud import language_v1
+from datetime import datetime, timezone
 from backend.models.review import Review
 from backend.models.database import db
-from flask import current_app
+from backend.models.review_topic import unique_topics
+from backend.services.nlp import NEUTRAL_ANALYSIS, analysis_topics, analyze_text, describe_sentiment
+from backend.services.nlp_cache import analyze_texts_cached
+from backend.services.review_store import get_known_review_ids, store_reviews
 
 def analyze_sentiment(text_content):
-    client = language_v1.LanguageServiceClient(
-        client_options={"api_key": current_app.config['GOOGLE_CLOUD_API_KEY']}
-    )
-    
-    document = language_v1.Document(
-        content=text_content,
-        type_=language_v1.Document.Type.PLAIN_TEXT
-    )
-    
-    sentiment = client.analyze_sentiment(request={'document': document}).document_sentiment
-    entities = client.analyze_entities(request={'document': document}).entities
-    
-    sentiment_description = "Positive" if sentiment.score > 0 else "Negative" if sentiment.score < 0 else "Neutral"
-    
-    return {
-        'sentiment_score': sentiment.score,
-        'sentiment_magnitude': sentiment.magnitude,
-        'sentiment_description': sentiment_description,
-        'entities': [(entity.name, entity.type_.name, entity.salience) for entity in entities]
-    }
+    analysis = analyze_text(text_content)
+    # any positive score is Positive here, unlike the review tagging's threshold
+    analysis['sentiment_description'] = describe_sentiment(analysis['sentiment_score'], threshold=0)
+    return analysis
 
 def process_reviews(reviews):
-    results = []
-
+    # reviews already stored for their business are skipped, not analyzed again
+    known_ids = {}
+    new_reviews = []
     for review in reviews:
-        analysis = analyze_sentiment(review['content'])
+        external_id = review.get('external_id')
+        if external_id is not None:
+            if review['business_id'] not in known_ids:
+                known_ids[review['business_id']] = get_known_review_ids(review['business_id'])
+            if external_id in known_ids[review['business_id']]:
+                continue
+            known_ids[review['business_id']].add(external_id)
+        new_reviews.append(review)
+    reviews = new_reviews
+
+    rows = []
+    topics = []
+
+    # analyze the whole batch concurrently up front, skipping texts analyzed before
+    analyses = analyze_texts_cached([review['content'] for review in reviews])
+
+    for review, analysis in zip(reviews, analyses):
+        if analysis is None:
+            analysis = NEUTRAL_ANALYSIS
 
         # Handle null values for retrieved_at and review_date
         if review['retrieved_at']:
@@ -42,31 +47,40 @@ def process_reviews(reviews):
             review_date = datetime.fromisoformat(review['review_date'])
             review_date_timestamp = int(review_date.strftime('%s'))
         else:
+            review_date = None
             review_date_timestamp = None
 
-        review_entry = Review(
-            source=review['source'],
-            content=review['content'],
-            rating=review['rating'],
-            retrieved_at=retrieved_at,
-            review_date=review_date_timestamp,
-            username=review['username'],
-            user_review_count=review['user_review_count'],
-            user_profile_url=review['user_profile_url'],
-            business_id=review['business_id'],
-            senti_score=analysis['sentiment_score'],
-            is_suggestion=False,  # default value TODO update this
-            topics=','.join([entity[0] for entity in analysis['entities'][:3]])  # top 3 ranked topics
-        )
-        db.session.add(review_entry)
-        review_dict = review_entry.to_dict()
-        review_dict.update({
+        rows.append({
+            'source': review['source'],
+            'content': review['content'],
+            'rating': review['rating'],
+            'retrieved_at': retrieved_at,
+            'review_date': review_date_timestamp,
+            # the review's own date, or when it was retrieved if it has none
+            'review_date_estimate': review_date or retrieved_at or datetime.now(timezone.utc),
+            'username': review['username'],
+            'user_review_count': review['user_review_count'],
+            'user_profile_url': review['user_profile_url'],
+            'business_id': review['business_id'],
             'senti_score': analysis['sentiment_score'],
-            'topics': ','.join([entity[0] for entity in analysis['entities'][:3]])
+            'sentiment_magnitude': analysis['sentiment_magnitude'],
+            'sentiment_description': analysis['sentiment_description'],
+            'is_suggestion': False,  # default value TODO update this
+            'external_id': review.get('external_id'),
         })
-        results.append(review_dict)
+        # top 3 ranked topics
+        topics.append(unique_topics(analysis_topics(analysis)))
+        rows[-1]['topics'] = ', '.join(name for name, _ in topics[-1])
 
+    ids = store_reviews(rows, topics)
     db.session.commit()
+
+    columns = Review.__table__.columns.keys()
+    results = []
+    for review_id, row in zip(ids, rows):
+        review_dict = dict.fromkeys(columns)
+        review_dict.update(row, id=review_id)
+        results.append(review_dict)
     return results
 
 def summarize_reviews(reviews):
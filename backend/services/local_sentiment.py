@@ -0,0 +1,131 @@
+# Offline sentiment and aspect tagging of reviews, a CPU-only stand-in for the
+# Google NLP analysis that needs no network or credentials.
+#
+# Scores come from a word lexicon: every matched word adds its weight, "not
+# good" style negations flip it, and the sum is squashed into [-1, 1]. Topics
+# are the aspects (food, service, ...) the review's words point at most.
+# Both are a sparse count matrix times a weight matrix, so a whole batch is
+# scored with a couple of CountVectorizer transforms.
+from functools import lru_cache
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+from backend.services.nlp import describe_sentiment
+
+LEXICON = {
+    # positive
+    'amazing': 3, 'awesome': 3, 'best': 3, 'excellent': 3, 'exceptional': 3, 'fantastic': 3,
+    'incredible': 3, 'outstanding': 3, 'perfect': 3, 'superb': 3, 'wonderful': 3, 'phenomenal': 3,
+    'delicious': 2.5, 'love': 2.5, 'loved': 2.5, 'great': 2.5, 'gem': 2.5, 'yummy': 2.5, 'tasty': 2,
+    'good': 2, 'nice': 2, 'friendly': 2, 'fresh': 2, 'recommend': 2, 'recommended': 2, 'enjoyed': 2,
+    'beautiful': 2, 'lovely': 2, 'helpful': 2, 'polite': 2, 'welcoming': 2, 'attentive': 2,
+    'kind': 1.5, 'clean': 1.5, 'cozy': 1.5, 'happy': 1.5, 'fast': 1.5, 'quick': 1.5, 'fun': 1.5,
+    'sweet': 1, 'worth': 1.5, 'reasonable': 1, 'affordable': 1, 'fair': 1, 'pleasant': 1.5,
+    'favorite': 2.5, 'favourite': 2.5, 'definitely': 1, 'thanks': 1, 'thank': 1, 'satisfied': 1.5,
+    'generous': 1.5, 'authentic': 1, 'solid': 1, 'decent': 1, 'fine': 0.5, 'ok': 0.3, 'okay': 0.3,
+    # negative
+    'awful': -3, 'disgusting': -3, 'horrible': -3, 'terrible': -3, 'worst': -3, 'inedible': -3,
+    'disappointing': -2.5, 'disappointed': -2.5, 'rude': -2.5, 'dirty': -2.5, 'gross': -2.5,
+    'bad': -2, 'poor': -2, 'cold': -1, 'stale': -2, 'bland': -2, 'overpriced': -2, 'slow': -1.5,
+    'mediocre': -1.5, 'expensive': -1, 'greasy': -1, 'soggy': -1.5, 'burnt': -1.5, 'raw': -1,
+    'avoid': -2.5, 'never': -1, 'waste': -2.5, 'wasted': -2.5, 'unfriendly': -2, 'unprofessional': -2,
+    'ignored': -2, 'wrong': -1.5, 'sick': -2.5, 'scam': -3, 'overcooked': -1.5, 'undercooked': -2,
+    'noisy': -1, 'crowded': -0.5, 'lukewarm': -1, 'tasteless': -2, 'complain': -1.5, 'refund': -1.5,
+    'reheated': -1.5, 'warmed': -0.5, 'unfortunately': -1, 'sadly': -1, 'nasty': -2.5, 'meh': -1,
+}
+
+# words flipping the sentiment of the word right after them; contractions are
+# cut by the tokenizer ("wasn't" becomes "wasn")
+NEGATORS = ['not', 'no', 'never', 'isn', 'wasn', 'aren', 'weren', 'don', 'didn', 'doesn', 'hardly', 'nothing']
+
+ASPECTS = {
+    'food': ['food', 'pizza', 'dish', 'dishes', 'meal', 'taste', 'tasty', 'delicious', 'flavor', 'menu',
+             'breakfast', 'lunch', 'dinner', 'dessert', 'burger', 'burgers', 'slice', 'fresh', 'portion',
+             'portions', 'coffee', 'drinks', 'cheese', 'sauce', 'bread', 'salad', 'chicken', 'sandwich'],
+    'service': ['service', 'staff', 'waiter', 'waitress', 'server', 'servers', 'owner', 'manager', 'friendly',
+                'rude', 'polite', 'helpful', 'attentive', 'employees', 'team', 'welcoming', 'served'],
+    'ambiance': ['ambiance', 'ambience', 'atmosphere', 'vibe', 'music', 'decor', 'cozy', 'noisy', 'seating',
+                 'interior', 'view', 'place', 'spot'],
+    'price': ['price', 'prices', 'pricing', 'priced', 'overpriced', 'expensive', 'cheap', 'affordable',
+              'value', 'worth', 'dollars', 'money', 'cost', 'reasonable'],
+    'location': ['location', 'located', 'street', 'avenue', 'neighborhood', 'area', 'parking', 'downtown',
+                 'walk', 'near', 'corner'],
+    'cleanliness': ['clean', 'dirty', 'hygiene', 'bathroom', 'restroom', 'tables', 'sanitary'],
+    'wait time': ['wait', 'waited', 'waiting', 'line', 'queue', 'slow', 'fast', 'quick', 'minutes', 'hour'],
+}
+
+# the more sentiment words a review has the surer the score, but with diminishing returns
+SCORE_SCALE = 4.0
+
+
+@lru_cache(maxsize=None)
+def _sentiment_model():
+    # unigrams carry their weight; "not good" carries -2x so together with the
+    # "good" it also contains the pair nets to the opposite of "good"
+    weights = dict(LEXICON)
+    for negator in NEGATORS:
+        for word, weight in LEXICON.items():
+            weights[f'{negator} {word}'] = -2 * weight
+    vectorizer = CountVectorizer(vocabulary=list(weights), ngram_range=(1, 2), lowercase=True)
+    return vectorizer, np.array(list(weights.values()), dtype=np.float64)
+
+
+@lru_cache(maxsize=None)
+def _aspect_model():
+    vocabulary = sorted({word for words in ASPECTS.values() for word in words})
+    index = {word: i for i, word in enumerate(vocabulary)}
+    rows, cols = [], []
+    for aspect_index, words in enumerate(ASPECTS.values()):
+        for word in words:
+            rows.append(index[word])
+            cols.append(aspect_index)
+    mapping = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(vocabulary), len(ASPECTS)))
+    return CountVectorizer(vocabulary=vocabulary, lowercase=True), mapping
+
+
+def analyze_texts_local(texts, top_aspects=3):
+    """
+    Score the sentiment and aspects of many texts at once.
+
+    Args:
+        texts (list): The texts to analyze
+        top_aspects (int): Number of aspects kept per text
+
+    Returns:
+        list: One dict per text with the keys of nlp.analyze_text (sentiment_score,
+            sentiment_magnitude, sentiment_description and entities, here the
+            aspects as (name, 'ASPECT', salience)). Empty texts are Neutral
+    """
+    if not texts:
+        return []
+    documents = [text or '' for text in texts]
+
+    vectorizer, weights = _sentiment_model()
+    counts = vectorizer.transform(documents)
+    raw = counts @ weights
+    # magnitude follows Google's meaning: how much emotion there is, whatever its sign
+    magnitude = abs(counts) @ np.abs(weights) / SCORE_SCALE
+    scores = np.tanh(raw / SCORE_SCALE)
+
+    aspect_vectorizer, mapping = _aspect_model()
+    aspect_counts = (aspect_vectorizer.transform(documents) @ mapping).toarray()
+    totals = aspect_counts.sum(axis=1, keepdims=True)
+    salience = np.divide(aspect_counts, totals, out=np.zeros_like(aspect_counts), where=totals > 0)
+    ranked = np.argsort(-salience, axis=1, kind='stable')[:, :top_aspects]
+    aspect_names = list(ASPECTS)
+
+    results = []
+    for i in range(len(documents)):
+        score = round(float(scores[i]), 3)
+        results.append({
+            'sentiment_score': score,
+            'sentiment_magnitude': round(float(magnitude[i]), 3),
+            'sentiment_description': describe_sentiment(score),
+            'entities': [
+                (aspect_names[j], 'ASPECT', round(float(salience[i, j]), 3))
+                for j in ranked[i] if salience[i, j] > 0
+            ],
+        })
+    return results
@@ -0,0 +1,157 @@
+# Google Cloud Natural Language analysis of review texts.
+#
+# One client is shared by every caller (clients are thread safe and expensive
+# to build), sentiment and entities come from a single annotate_text call per
+# text, and batches are sent concurrently from a bounded thread pool.
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, has_app_context
+from google.cloud import language_v1
+from sqlalchemy import inspect
+
+from backend.services.daily_stats import record_reviews, review_stats
+
+# concurrent requests per batch, keep it under the API's per-minute quota
+MAX_WORKERS = int(os.environ.get('NLP_MAX_WORKERS', 8))
+# point the client somewhere else than Google, e.g. http://127.0.0.1:8085 for a stand-in server
+API_ENDPOINT = os.environ.get('GOOGLE_NLP_ENDPOINT') or None
+REQUEST_TIMEOUT = 30
+# reviews scoring above this (or below minus this) are Positive (Negative)
+SENTIMENT_THRESHOLD = 0.25
+# what a review is stored with when it can't be scored
+NEUTRAL_ANALYSIS = {
+    'sentiment_score': 0.0,
+    'sentiment_magnitude': 0.0,
+    'sentiment_description': 'Neutral',
+    'entities': [],
+}
+
+FEATURES = language_v1.AnnotateTextRequest.Features(
+    extract_entities=True,
+    extract_document_sentiment=True,
+)
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _default_api_key():
+    if has_app_context():
+        return current_app.config.get('GOOGLE_CLOUD_API_KEY')
+    return os.environ.get('GOOGLE_CLOUD_API_KEY')
+
+
+def get_language_client(api_key=None, api_endpoint=API_ENDPOINT):
+    """Return the shared LanguageServiceClient for an api key and endpoint.
+
+    Without an api key the client uses the application default credentials.
+    An http(s):// endpoint is spoken to over REST, which is what stand-in
+    servers implement.
+    """
+    api_key = api_key or _default_api_key()
+    key = (api_key, api_endpoint)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client_options = {}
+            if api_key:
+                client_options['api_key'] = api_key
+            if api_endpoint:
+                client_options['api_endpoint'] = api_endpoint
+
+            transport = 'rest' if api_endpoint and api_endpoint.startswith(('http://', 'https://')) else None
+            client = language_v1.LanguageServiceClient(client_options=client_options, transport=transport)
+            _clients[key] = client
+        return client
+
+
+def describe_sentiment(score, threshold=SENTIMENT_THRESHOLD):
+    """Positive, Negative or Neutral label of a sentiment score"""
+    if score > threshold:
+        return "Positive"
+    if score < -threshold:
+        return "Negative"
+    return "Neutral"
+
+
+def analyze_text(text, client=None):
+    """
+    Analyze the sentiment and entities of a text with one annotate_text call.
+
+    Args:
+        text (str): The text to analyze
+        client (LanguageServiceClient, optional): Defaults to the shared client
+
+    Returns:
+        dict: sentiment_score, sentiment_magnitude, sentiment_description and
+            entities, a list of (name, type, salience) ranked by salience
+    """
+    client = client or get_language_client()
+    document = language_v1.Document(content=text, type_=language_v1.Document.Type.PLAIN_TEXT)
+    response = client.annotate_text(
+        request={'document': document, 'features': FEATURES},
+        timeout=REQUEST_TIMEOUT,
+    )
+
+    sentiment = response.document_sentiment
+    return {
+        'sentiment_score': sentiment.score,
+        'sentiment_magnitude': sentiment.magnitude,
+        'sentiment_description': describe_sentiment(sentiment.score),
+        'entities': [(entity.name, entity.type_.name, entity.salience) for entity in response.entities],
+    }
+
+
+def analyze_texts(texts, client=None, max_workers=MAX_WORKERS):
+    """
+    Analyze many texts concurrently.
+
+    Args:
+        texts (list): The texts to analyze
+        client (LanguageServiceClient, optional): Defaults to the shared client
+        max_workers (int): Number of requests in flight at once
+
+    Returns:
+        list: One analyze_text result per text, in order; None for empty texts
+            and texts whose request failed
+    """
+    client = client or get_language_client()
+
+    def analyze(text):
+        if not text or not text.strip():
+            return None
+        try:
+            return analyze_text(text, client)
+        except Exception as e:
+            print(f"Error analyzing text: {e}")
+            return None
+
+    if not texts:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(texts)))) as executor:
+        return list(executor.map(analyze, texts))
+
+
+def analysis_topics(analysis):
+    """The top 3 entities of an analyze_text result, as the (name, salience) topics of a review"""
+    return [(name, salience) for name, _, salience in analysis['entities'][:3]]
+
+
+def apply_analysis(review, analysis):
+    """
+    Store an analyze_text result on a Review, keeping its top 3 entities as topics.
+    A stored review is moved in the daily stats too: its old sentiment is taken out
+    and the new one added, in the caller's transaction.
+    """
+    stored = inspect(review).persistent
+    if stored:
+        record_reviews([review_stats(review)], sign=-1)
+    review.senti_score = analysis['sentiment_score']
+    review.sentiment_magnitude = analysis['sentiment_magnitude']
+    review.sentiment_description = analysis['sentiment_description']
+    review.set_topics(analysis_topics(analysis))
+    if stored:
+        record_reviews([review_stats(review)])
+    return review
@@ -0,0 +1,153 @@
+# Persistent cache of Google NLP analyses, so re-scrapes, re-ingests and
+# retries of the same review text don't pay for another API call.
+#
+# Entries are keyed by a hash of the model version and the normalized text,
+# and the least recently used ones are evicted beyond MAX_ENTRIES.
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime, timezone
+
+from backend.models.database import db, dialect_insert
+from backend.models.nlp_cache import NlpCacheEntry
+from backend.services.nlp import analyze_texts
+
+# bump when the analysis changes (api version, features, post-processing) to stop using old entries
+MODEL_VERSION = 'language_v1.annotate_text.1'
+MAX_ENTRIES = int(os.environ.get('NLP_CACHE_MAX_ENTRIES', 100000))
+# hashes per IN (...) lookup and rows per insert, under SQLite's bound parameter limit
+LOOKUP_CHUNK_SIZE = 500
+INSERT_CHUNK_SIZE = 50
+
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+_stats_lock = threading.Lock()
+
+
+def normalize_text(text):
+    """Text as it is hashed: lowercased, trimmed and with whitespace collapsed"""
+    return re.sub(r'\s+', ' ', text.strip().lower())
+
+
+def content_hash(text, model=MODEL_VERSION):
+    return hashlib.sha256(f'{model}\n{normalize_text(text)}'.encode('utf-8')).hexdigest()
+
+
+def _to_analysis(entry):
+    return {
+        'sentiment_score': entry.sentiment_score,
+        'sentiment_magnitude': entry.sentiment_magnitude,
+        'sentiment_description': entry.sentiment_description,
+        'entities': [tuple(entity) for entity in json.loads(entry.entities or '[]')],
+    }
+
+
+def _count(name, amount):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def analyze_texts_cached(texts, model=MODEL_VERSION, **kwargs):
+    """
+    analyze_texts with a lookup in the cache first. Must run inside an app context.
+
+    Identical texts (after normalization) in a batch are only analyzed once. New
+    results and hit counts are committed right away, together with anything
+    else pending in the session.
+
+    Args:
+        texts (list): The texts to analyze
+        model (str): Model version the results are cached under
+        **kwargs: Passed on to analyze_texts
+
+    Returns:
+        list: One analysis per text, in order; None for empty texts and failed requests
+    """
+    hashes = [content_hash(text, model) if text and text.strip() else None for text in texts]
+    wanted = {h for h in hashes if h is not None}
+
+    cached = {}
+    wanted_list = list(wanted)
+    for start in range(0, len(wanted_list), LOOKUP_CHUNK_SIZE):
+        chunk = wanted_list[start:start + LOOKUP_CHUNK_SIZE]
+        for entry in NlpCacheEntry.query.filter(NlpCacheEntry.content_hash.in_(chunk)).all():
+            cached[entry.content_hash] = entry
+
+    # analyze each missing text once, in order of first appearance
+    missing = {}
+    for text, h in zip(texts, hashes):
+        if h is not None and h not in cached and h not in missing:
+            missing[h] = text
+
+    now = datetime.now(timezone.utc)
+    results = {}
+    rows = []
+    # a batch of hits doesn't need the client at all
+    analyses = analyze_texts(list(missing.values()), **kwargs) if missing else []
+    for h, analysis in zip(missing, analyses):
+        if analysis is None:
+            continue
+        results[h] = analysis
+        rows.append({
+            'content_hash': h,
+            'model': model,
+            'sentiment_score': analysis['sentiment_score'],
+            'sentiment_magnitude': analysis['sentiment_magnitude'],
+            'sentiment_description': analysis['sentiment_description'],
+            'entities': json.dumps([list(entity) for entity in analysis['entities']]),
+            'hits': 0,
+            'created_at': now,
+            'last_used_at': now,
+        })
+
+    # another worker may have cached the same text in the meantime, keep its entry
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        db.session.execute(
+            dialect_insert(NlpCacheEntry.__table__)
+            .values(rows[start:start + INSERT_CHUNK_SIZE])
+            .on_conflict_do_nothing(index_elements=['content_hash'])
+        )
+
+    hit_count = 0
+    for h in hashes:
+        if h in cached:
+            hit_count += 1
+            cached[h].hits += 1
+            cached[h].last_used_at = now
+    for h, entry in cached.items():
+        results[h] = _to_analysis(entry)
+
+    _count('hits', hit_count)
+    _count('misses', sum(1 for h in hashes if h is not None) - hit_count)
+
+    db.session.commit()
+
+    if missing:
+        evict()
+    return [results.get(h) if h is not None else None for h in hashes]
+
+
+def evict(max_entries=MAX_ENTRIES):
+    """Delete the least recently used entries beyond max_entries"""
+    excess = NlpCacheEntry.query.count() - max_entries
+    if excess <= 0:
+        return 0
+
+    oldest = db.session.query(NlpCacheEntry.id).order_by(NlpCacheEntry.last_used_at, NlpCacheEntry.id).limit(excess)
+    evicted = NlpCacheEntry.query.filter(NlpCacheEntry.id.in_(oldest.scalar_subquery())).delete(
+        synchronize_session=False
+    )
+    db.session.commit()
+    _count('evictions', evicted)
+    return evicted
+
+
+def cache_stats():
+    """Hits, misses, hit rate and evictions of this process, plus the cache size"""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else None
+    stats['entries'] = NlpCacheEntry.query.count()
+    return stats
@@ -0,0 +1,152 @@
+# Per-host rate limiting of the requests scrapers make to Google Maps.
+#
+# Every page load and scroll takes a token, plus a random part of one (jitter),
+# from the host's bucket. The refill rate adapts to what Google lets through:
+# it creeps up while requests succeed and is cut, with an exponential cooldown,
+# when we look throttled (empty review pages, the sort button never showing up).
+#
+# Scraper processes share one limiter by installing a Manager backed one, see
+# create_shared_rate_limiter and install_rate_limiter.
+import os
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+# tokens (page loads or scrolls) per second each host starts with
+RATE = float(os.environ.get('SCRAPER_RATE', 1))
+# bounds the adaptive rate moves within
+MIN_RATE = float(os.environ.get('SCRAPER_MIN_RATE', 0.05))
+MAX_RATE = float(os.environ.get('SCRAPER_MAX_RATE', 4))
+# tokens that can be saved up while a host is idle
+BURST = float(os.environ.get('SCRAPER_BURST', 5))
+# every request costs up to this many extra tokens at random, so requests to a
+# host aren't evenly spaced
+JITTER = float(os.environ.get('SCRAPER_JITTER', 0.5))
+# rate gained per successful request, and rate multiplier on a failure
+RATE_INCREASE = 0.02
+RATE_DECREASE = 0.5
+# cooldown after the first failure in a row, doubled for each further one
+BASE_BACKOFF = float(os.environ.get('SCRAPER_BASE_BACKOFF', 5))
+MAX_BACKOFF = float(os.environ.get('SCRAPER_MAX_BACKOFF', 300))
+
+
+class AdaptiveRateLimiter:
+    """Token bucket per host with additive increase, multiplicative decrease.
+
+    The bucket state lives in `state` (a dict keyed by host) guarded by `lock`,
+    so passing a multiprocessing Manager dict and lock shares the limiter
+    between processes.
+    """
+
+    def __init__(self, rate=RATE, burst=BURST, min_rate=MIN_RATE, max_rate=MAX_RATE, jitter=JITTER,
+                 state=None, lock=None):
+        self.rate = rate
+        self.burst = burst
+        self.jitter = jitter
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.state = state if state is not None else {}
+        self.lock = lock if lock is not None else threading.Lock()
+
+    def _bucket(self, host, now):
+        # Manager dicts hand out copies, so buckets are read, changed and written back whole
+        bucket = self.state.get(host) or {
+            'tokens': self.burst, 'rate': self.rate, 'updated': now, 'blocked_until': 0.0,
+            'consecutive_failures': 0, 'successes': 0, 'failures': {}, 'throttled_seconds': 0.0,
+        }
+        bucket['tokens'] = min(self.burst, bucket['tokens'] + (now - bucket['updated']) * bucket['rate'])
+        bucket['updated'] = now
+        return bucket
+
+    def acquire(self, url):
+        """Block until a request to url's host may be made.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        host = urlparse(url).netloc
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                bucket = self._bucket(host, now)
+                delay = bucket['blocked_until'] - now
+                if delay <= 0 and bucket['tokens'] >= 1:
+                    bucket['tokens'] -= 1 + random.uniform(0, self.jitter)
+                    bucket['throttled_seconds'] += waited
+                    self.state[host] = bucket
+                    return waited
+                if delay <= 0:
+                    delay = (1 - bucket['tokens']) / bucket['rate']
+                self.state[host] = bucket
+
+            time.sleep(delay)
+            waited += delay
+
+    def record_success(self, url):
+        """Speed the host up a little after a request went through"""
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self._bucket(host, time.monotonic())
+            bucket['consecutive_failures'] = 0
+            bucket['successes'] += 1
+            bucket['rate'] = min(self.max_rate, bucket['rate'] + RATE_INCREASE)
+            self.state[host] = bucket
+
+    def record_failure(self, url, reason):
+        """Slow the host down and pause it after a request that looks throttled
+
+        Args:
+            url (str): Url of the failed request
+            reason (str): Kind of failure, counted separately in the metrics
+        """
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            bucket = self._bucket(host, now)
+            bucket['consecutive_failures'] += 1
+            bucket['failures'] = {**bucket['failures'], reason: bucket['failures'].get(reason, 0) + 1}
+            bucket['rate'] = max(self.min_rate, bucket['rate'] * RATE_DECREASE)
+            bucket['tokens'] = 0.0
+
+            backoff = min(MAX_BACKOFF, BASE_BACKOFF * 2 ** (bucket['consecutive_failures'] - 1))
+            bucket['blocked_until'] = max(bucket['blocked_until'], now + backoff * random.uniform(0.8, 1.2))
+            self.state[host] = bucket
+
+    def metrics(self):
+        """Current rate, throttled seconds and success/failure counts of every host"""
+        with self.lock:
+            return {
+                host: {
+                    'rate': round(bucket['rate'], 3),
+                    'throttled_seconds': round(bucket['throttled_seconds'], 1),
+                    'successes': bucket['successes'],
+                    'failures': dict(bucket['failures']),
+                }
+                for host, bucket in self.state.items()
+            }
+
+
+def create_shared_rate_limiter(manager, **kwargs):
+    """Build a limiter whose state lives in a multiprocessing Manager"""
+    return AdaptiveRateLimiter(state=manager.dict(), lock=manager.Lock(), **kwargs)
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def install_rate_limiter(limiter):
+    """Make limiter the one get_rate_limiter returns in this process (e.g. a shared one)"""
+    global _rate_limiter
+    _rate_limiter = limiter
+
+
+def get_rate_limiter():
+    """Return the process-wide limiter, creating a process-local one on first use"""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = AdaptiveRateLimiter()
+        return _rate_limiter
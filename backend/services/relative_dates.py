@@ -0,0 +1,172 @@
+# Parsing of the relative review dates Google Maps shows ("2 years ago",
+# "il y a 2 ans", "vor 2 Jahren", ...). The language depends on the location
+# of the place and of the browser, so every locale in PHRASES is understood.
+import os
+import re
+from functools import lru_cache
+
+# restrict parsing to one locale of PHRASES, unset to understand them all
+SCRAPER_LOCALE = os.environ.get('SCRAPER_LOCALE') or None
+
+# {quantity} and {unit} are replaced by the numbers/articles and unit words
+# of the locale; 'now' lists the phrases used for reviews posted moments ago
+PHRASES = {
+    'en': {
+        'pattern': r'{quantity}\s+{unit}\s+ago',
+        'articles': ('a', 'an', 'one'),
+        'units': {
+            'second': ('second', 'seconds'),
+            'minute': ('minute', 'minutes'),
+            'hour': ('hour', 'hours'),
+            'day': ('day', 'days'),
+            'week': ('week', 'weeks'),
+            'month': ('month', 'months'),
+            'year': ('year', 'years'),
+        },
+        'now': ('just now', 'moments ago'),
+    },
+    'fr': {
+        'pattern': r'il\s+y\s+a\s+{quantity}\s+{unit}',
+        'articles': ('un', 'une'),
+        'units': {
+            'second': ('seconde', 'secondes'),
+            'minute': ('minute', 'minutes'),
+            'hour': ('heure', 'heures'),
+            'day': ('jour', 'jours'),
+            'week': ('semaine', 'semaines'),
+            'month': ('mois',),
+            'year': ('an', 'ans', 'année', 'années'),
+        },
+        'now': ("à l'instant", "a l'instant", 'il y a quelques instants'),
+    },
+    'es': {
+        'pattern': r'hace\s+{quantity}\s+{unit}',
+        'articles': ('un', 'una'),
+        'units': {
+            'second': ('segundo', 'segundos'),
+            'minute': ('minuto', 'minutos'),
+            'hour': ('hora', 'horas'),
+            'day': ('día', 'días', 'dia', 'dias'),
+            'week': ('semana', 'semanas'),
+            'month': ('mes', 'meses'),
+            'year': ('año', 'años'),
+        },
+        'now': ('hace un momento', 'justo ahora', 'ahora mismo'),
+    },
+    'de': {
+        'pattern': r'vor\s+{quantity}\s+{unit}',
+        'articles': ('einem', 'einer', 'einen'),
+        'units': {
+            'second': ('sekunde', 'sekunden'),
+            'minute': ('minute', 'minuten'),
+            'hour': ('stunde', 'stunden'),
+            'day': ('tag', 'tagen'),
+            'week': ('woche', 'wochen'),
+            'month': ('monat', 'monaten'),
+            'year': ('jahr', 'jahren'),
+        },
+        'now': ('gerade eben', 'soeben'),
+    },
+    'it': {
+        'pattern': r"{quantity}(?:\s+|')?{unit}\s+fa",
+        'articles': ('un', 'una', "un'"),
+        'units': {
+            'second': ('secondo', 'secondi'),
+            'minute': ('minuto', 'minuti'),
+            'hour': ('ora', 'ore'),
+            'day': ('giorno', 'giorni'),
+            'week': ('settimana', 'settimane'),
+            'month': ('mese', 'mesi'),
+            'year': ('anno', 'anni'),
+        },
+        'now': ('poco fa', 'proprio ora', 'adesso'),
+    },
+    'pt': {
+        'pattern': r'(?:há|ha)\s+{quantity}\s+{unit}',
+        'articles': ('um', 'uma'),
+        'units': {
+            'second': ('segundo', 'segundos'),
+            'minute': ('minuto', 'minutos'),
+            'hour': ('hora', 'horas'),
+            'day': ('dia', 'dias'),
+            'week': ('semana', 'semanas'),
+            'month': ('mês', 'mes', 'meses'),
+            'year': ('ano', 'anos'),
+        },
+        'now': ('agora mesmo', 'há instantes', 'agora'),
+    },
+    'nl': {
+        'pattern': r'{quantity}\s+{unit}\s+geleden',
+        'articles': ('een', 'één'),
+        'units': {
+            'second': ('seconde', 'seconden'),
+            'minute': ('minuut', 'minuten'),
+            'hour': ('uur',),
+            'day': ('dag', 'dagen'),
+            'week': ('week', 'weken'),
+            'month': ('maand', 'maanden'),
+            'year': ('jaar',),
+        },
+        'now': ('zojuist', 'zo net'),
+    },
+}
+
+
+def _alternation(words):
+    # longest first so 'minutes' isn't matched as 'minute'
+    return '|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+class RelativeDateMatcher:
+    """Compiled phrase table of one or more locales"""
+
+    def __init__(self, locales):
+        self.locales = locales
+        self._patterns = []
+        now_phrases = []
+
+        for locale in locales:
+            phrases = PHRASES[locale]
+            unit_words = {word: unit for unit, words in phrases['units'].items() for word in words}
+            pattern = phrases['pattern'].format(
+                quantity=rf"(?P<quantity>\d+|{_alternation(phrases['articles'])})",
+                unit=rf"(?P<unit>{_alternation(unit_words)})\b",
+            )
+            self._patterns.append((re.compile(rf'\b{pattern}', re.IGNORECASE), unit_words))
+            now_phrases.extend(phrases['now'])
+
+        self._now = re.compile(rf"(?:^|\s)(?:{_alternation(now_phrases)})(?:$|\s|\.)", re.IGNORECASE)
+
+    def match(self, relative_date):
+        """
+        Parse a relative date string.
+
+        Returns:
+            tuple: (unit, quantity) with unit one of second, minute, hour, day,
+                week, month or year; ('now', 0) for just posted reviews, or
+                None if the string isn't understood
+        """
+        # Google prefixes edited reviews ("Edited 2 weeks ago"), so search, don't match
+        text = relative_date.strip().replace('’', "'")
+        for pattern, unit_words in self._patterns:
+            match = pattern.search(text)
+            if match:
+                quantity = match.group('quantity')
+                return unit_words[match.group('unit').lower()], int(quantity) if quantity.isdigit() else 1
+
+        if self._now.search(text):
+            return 'now', 0
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_matcher(locale=SCRAPER_LOCALE):
+    """Return the cached matcher of a locale, or of every known locale if None"""
+    if locale is None:
+        return RelativeDateMatcher(tuple(PHRASES))
+
+    # accept full tags such as fr-CA or de_DE
+    language = locale.replace('_', '-').split('-')[0].lower()
+    if language not in PHRASES:
+        raise ValueError(f"No relative date phrases for locale: {locale}")
+    return RelativeDateMatcher((language,))
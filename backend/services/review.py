@@ -1,72 +1,95 @@
 # this file should process the scrapped reviews by adding the appropriate tags and topics,
 #  then should should also have a method to send batch of reviews to deepseek and get a summar
 
-from google.cloud import language_v1
 from datetime import datetime, timezone
 from backend.models.review import Review
 from backend.models.database import db
+from backend.models.review_topic import unique_topics
+from backend.services.nlp import NEUTRAL_ANALYSIS, analysis_topics, analyze_text, apply_analysis
+from backend.services.local_sentiment import analyze_texts_local
+from backend.services.review_store import get_known_review_ids, store_reviews
+from backend.services.scraper import iter_review_batches
+from backend.services.suggestion_model import get_suggestion_detector
 
 import random
 
-import pickle
 
-with open('services/suggestion_detector.pkl', 'rb') as f:
-    suggestion_detector = pickle.load(f)
-
-
-def process_reviews(reviews_data, business_id):
+def process_reviews(reviews_data, business_id, known_ids=None):
     """Process scraped reviews and add them to the database.
     
     Args:
         reviews_data: A list of dictionaries containing review data
         business_id: The ID of the business to associate with the reviews
+        known_ids (set, optional): External ids already stored for the business, looked
+            up if not given. Updated in place with the ids of the added reviews.
     """
     print(f"Starting to process {len(reviews_data)} reviews")
 
-    
+    # skip reviews that are already stored, the (business_id, external_id) index is unique
+    if known_ids is None:
+        known_ids = get_known_review_ids(business_id)
+
+    new_reviews = []
     for review_data in reviews_data:  
         #print(f"Processing review: {review_data}")  
         try:
-
-            # Create new review object
-            new_review = Review(
-                source=review_data.get('source', 'Google'),
-                content=review_data.get('content', ''),
-                rating=review_data.get('rating', 0.0),
-                retrieved_at=review_data.get('retrieval_date', datetime.now(timezone.utc)),
-                review_date=review_data.get('time_period_code', 0),
-                username=review_data.get('username', ''),
-                user_review_count=review_data.get('n_review_user', 0),
-                user_profile_url=review_data.get('user_profile_url', ''),
-                review_date_estimate=review_data.get('review_date_estimate', datetime.now(timezone.utc)), 
-                business_id=business_id
-
-            )
-            
-            # Mock sentiment analysis
-            new_review = analyze_sentiment_mock(new_review)
-            
-            try:
-                if new_review.content:
-                    content = new_review.content.lower().strip()   
-                    is_suggestion = suggestion_detector.predict(content)
-                    new_review.is_suggestion = is_suggestion
-                else:
-                    new_review.is_suggestion = False
-
-            except Exception as predict_error:
-                print(f"Error predicting suggestion: {predict_error}")
-                new_review.is_suggestion = False
-
-            
-            db.session.add(new_review)
-            
+            external_id = review_data.get('external_id')
+            if external_id is not None:
+                if external_id in known_ids:
+                    continue
+                known_ids.add(external_id)
+
+            # Column values of the new review, inserted in bulk below
+            new_reviews.append({
+                'source': review_data.get('source', 'Google'),
+                'content': review_data.get('content', ''),
+                'rating': review_data.get('rating', 0.0),
+                'retrieved_at': review_data.get('retrieval_date', datetime.now(timezone.utc)),
+                'review_date': review_data.get('time_period_code', 0),
+                'username': review_data.get('username', ''),
+                'user_review_count': review_data.get('n_review_user', 0),
+                'user_profile_url': review_data.get('user_profile_url', ''),
+                'review_date_estimate': review_data.get('review_date_estimate', datetime.now(timezone.utc)),
+                'business_id': business_id,
+                'external_id': external_id,
+            })
         except Exception as review_error:
             print(f"Error processing review: {review_error}")
-    
-    # Commit all reviews at once
+
+    # score the whole batch at once with the offline engine
     try:
+        analyses = analyze_texts_local([new_review['content'] for new_review in new_reviews])
+    except Exception as analysis_error:
+        print(f"Error analyzing sentiment: {analysis_error}")
+        analyses = [analyze_text_local(new_review['content']) for new_review in new_reviews]
+
+    topics = []
+    for new_review, analysis in zip(new_reviews, analyses):
+        topics.append(unique_topics(analysis_topics(analysis)))
+        new_review.update({
+            'senti_score': analysis['sentiment_score'],
+            'sentiment_magnitude': analysis['sentiment_magnitude'],
+            'sentiment_description': analysis['sentiment_description'],
+            'topics': ', '.join(name for name, _ in topics[-1]),
+        })
+
+    # classify the whole batch at once: one spaCy pipe, one tfidf transform and one forest call
+    with_content = [new_review for new_review in new_reviews if new_review['content']]
+    for new_review in new_reviews:
+        new_review['is_suggestion'] = False
+    try:
+        if with_content:
+            predictions = get_suggestion_detector().predict_batch(
+                [new_review['content'].lower().strip() for new_review in with_content]
+            )
+            for new_review, is_suggestion in zip(with_content, predictions):
+                new_review['is_suggestion'] = bool(is_suggestion)
+    except Exception as predict_error:
+        print(f"Error predicting suggestions: {predict_error}")
 
+    # Insert and commit all reviews at once
+    try:
+        store_reviews(new_reviews, topics)
         db.session.commit()
         print(f"Successfully committed  reviews to database")
     except Exception as commit_error:
@@ -75,6 +98,40 @@ def process_reviews(reviews_data, business_id):
 
 
 
+def analyze_text_local(text):
+    """Score one text with the offline engine, neutral and without topics if that fails"""
+    try:
+        return analyze_texts_local([text])[0]
+    except Exception as analysis_error:
+        print(f"Error analyzing sentiment: {analysis_error}")
+        return NEUTRAL_ANALYSIS
+
+
+def ingest_business_reviews(business, incremental=True, on_batch=None):
+    """Scrape a business and store its reviews batch by batch as they are scrolled in.
+
+    Each batch is tagged and committed before the next one is scraped, so memory
+    stays bounded and the dashboard can show partial data during long scrapes.
+
+    Args:
+        business: The Business to scrape
+        incremental (bool): Only scrape reviews newer than the ones already stored
+        on_batch (callable, optional): Called with the number of reviews stored so far
+            after every batch
+
+    Returns:
+        int: The number of scraped reviews
+    """
+    known_ids = get_known_review_ids(business.id)
+    total = 0
+    for batch in iter_review_batches(business.url, known_ids=set(known_ids) if incremental else None):
+        process_reviews(batch, business.id, known_ids=known_ids)
+        total += len(batch)
+        if on_batch:
+            on_batch(total)
+    return total
+
+
 def analyze_sentiment(review):
     """
     Analyzes the sentiment of a given review and extracts the top entities.
@@ -87,34 +144,7 @@ def analyze_sentiment(review):
     Returns:
         Review (updated): The updated review object with additional attributes
     """
-    client = language_v1.LanguageServiceClient()
-    
-    document = language_v1.Document(
-        content=review.content,
-        type_=language_v1.Document.Type.PLAIN_TEXT
-    )
-    
-    sentiment = client.analyze_sentiment(request={'document': document}).document_sentiment
-    entities = client.analyze_entities(request={'document': document}).entities
-    
-    # Determine sentiment description based on sentiment score
-    if sentiment.score > 0.25:
-        sentiment_description = "Positive"
-    elif sentiment.score < -0.25:
-        sentiment_description = "Negative"
-    else:
-        sentiment_description = "Neutral"
-    
-    # Extract top 3 entities
-    top_entities = [(entity.name, entity.type_.name, entity.salience) for entity in entities[:3]]
-    
-
-    review.senti_score = sentiment.score
-    review.sentiment_magnitude = sentiment.magnitude
-    review.sentiment_description = sentiment_description
-    review.topics = ', '.join([entity[0] for entity in top_entities])
-    
-    return review
+    return apply_analysis(review, analyze_text(review.content))
 
 
 def analyze_sentiment_mock(review):
@@ -144,9 +174,11 @@ def analyze_sentiment_mock(review):
     top_entities = random.sample(topics, min(3, len(topics)))
 
 
-    review.senti_score = sentiment_score
-    review.sentiment_magnitude = sentiment_magnitude
-    review.sentiment_description = sentiment_description
-    review.topics = ', '.join(top_entities)
+    apply_analysis(review, {
+        'sentiment_score': sentiment_score,
+        'sentiment_magnitude': sentiment_magnitude,
+        'sentiment_description': sentiment_description,
+        'entities': [(topic, None, None) for topic in top_entities],
+    })
 
     return review
\ No newline at end of file
@@ -0,0 +1,109 @@
+# Writes ingested reviews with Core bulk INSERTs instead of one ORM object and
+# session.add per review.
+#
+# Rows are upserted on (business_id, external_id): a review scraped again
+# overwrites the stored one, and its topics and daily stats are replaced along
+# with it. Reviews without an external id are always inserted.
+from collections import defaultdict
+
+from sqlalchemy import select
+
+from backend.models.database import db, dialect_insert
+from backend.models.review import Review
+from backend.models.review_topic import ReviewTopic, unique_topics
+from backend.services.daily_stats import REVIEW_COLUMNS, record_reviews
+
+# rows per INSERT statement, SQLAlchemy splits them further under the dialect's bound parameter limit
+INSERT_CHUNK_SIZE = 1000
+# columns a re-scraped review overwrites, everything but the keys
+UPDATE_COLUMNS = [column.name for column in Review.__table__.columns
+                  if column.name not in ('id', 'business_id', 'external_id')]
+STATS_COLUMNS = [Review.id, Review.external_id] + [Review.__table__.c[name] for name in REVIEW_COLUMNS]
+
+
+def get_known_review_ids(business_id):
+    """Return the set of external review ids already stored for a business"""
+    rows = db.session.query(Review.external_id).filter(
+        Review.business_id == business_id,
+        Review.external_id.isnot(None)
+    ).all()
+    return {external_id for (external_id,) in rows}
+
+
+def _stored_versions(rows):
+    """The stored rows the given ones will overwrite, with the columns the daily stats use"""
+    external_ids = defaultdict(list)
+    for row in rows:
+        if row.get('external_id') is not None:
+            external_ids[row['business_id']].append(row['external_id'])
+
+    stored = []
+    for business_id, ids in external_ids.items():
+        stored.extend(db.session.execute(select(*STATS_COLUMNS).where(
+            Review.business_id == business_id,
+            Review.external_id.in_(ids)
+        )).mappings().all())
+    return stored
+
+
+def store_reviews(rows, topics=None, chunk_size=INSERT_CHUNK_SIZE):
+    """
+    Upsert reviews, their topics and their daily stats, in the caller's transaction.
+
+    Args:
+        rows (list): Review column values as dicts, every dict with the same keys
+        topics (list, optional): For each row, its (name, salience) topics
+        chunk_size (int): Rows per INSERT statement
+
+    Returns:
+        list: The ids of the rows, in order
+    """
+    if not rows:
+        return []
+
+    table = Review.__table__
+    upsert = dialect_insert(table)
+    columns = [name for name in UPDATE_COLUMNS if name in rows[0]]
+    # rows come back in any order from a multi-row upsert, they are matched on their external id
+    upsert = upsert.on_conflict_do_update(
+        index_elements=['business_id', 'external_id'],
+        set_={name: upsert.excluded[name] for name in columns}
+    ).returning(table.c.id, table.c.business_id, table.c.external_id)
+    # reviews without an external id can't conflict, a plain insert returns their ids in order
+    insert = table.insert().returning(table.c.id, sort_by_parameter_order=True)
+
+    ids = []
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        chunk_topics = topics[start:start + chunk_size] if topics is not None else [[]] * len(chunk)
+
+        stored = _stored_versions(chunk)
+        keyed = [row for row in chunk if row.get('external_id') is not None]
+        unkeyed = [row for row in chunk if row.get('external_id') is None]
+        keyed_ids = {}
+        if keyed:
+            keyed_ids = {(business_id, external_id): review_id for review_id, business_id, external_id
+                         in db.session.execute(upsert, keyed)}
+        unkeyed_ids = iter(db.session.execute(insert, unkeyed).scalars().all() if unkeyed else [])
+        chunk_ids = [
+            keyed_ids[(row['business_id'], row['external_id'])] if row.get('external_id') is not None
+            else next(unkeyed_ids)
+            for row in chunk
+        ]
+
+        if stored:
+            # overwritten reviews leave the daily stats and lose their old topics
+            record_reviews(stored, sign=-1)
+            db.session.execute(ReviewTopic.__table__.delete().where(
+                ReviewTopic.review_id.in_([review['id'] for review in stored])
+            ))
+        topic_rows = [
+            {'review_id': review_id, 'business_id': row['business_id'], 'topic': name, 'salience': salience}
+            for review_id, row, row_topics in zip(chunk_ids, chunk, chunk_topics)
+            for name, salience in unique_topics(row_topics)
+        ]
+        if topic_rows:
+            db.session.execute(ReviewTopic.__table__.insert(), topic_rows)
+        record_reviews(chunk)
+        ids.extend(chunk_ids)
+    return ids
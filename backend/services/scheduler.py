@@ -0,0 +1,111 @@
+# Refresh the reviews of many businesses at once: scrapes are fanned out over a
+# pool of worker processes (each with its own browser) and the results are
+# written to the database by the parent process as they come in. All workers
+# share one per-host rate limiter, see services/rate_limit.py.
+#
+# Run from the repo root:
+#   python -m backend.services.scheduler --workers 4
+#   python -m backend.services.scheduler --business-id 3 --business-id 7 --full
+import argparse
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import ExitStack
+from datetime import datetime
+
+from backend.services.rate_limit import create_shared_rate_limiter, install_rate_limiter
+from backend.services.review import get_known_review_ids, process_reviews
+from backend.services.scraper import scrape_reviews_for_business
+
+WORKERS = int(os.environ.get('SCRAPER_WORKERS', 4))
+
+
+def _scrape_in_worker(url, known_ids):
+    # runs in a worker process, which keeps its own driver pool between scrapes
+    return scrape_reviews_for_business(url, known_ids=known_ids)
+
+
+def scrape_businesses(businesses, workers=WORKERS, incremental=True, rate_limiter=None):
+    """Scrape and store reviews for many businesses in parallel.
+
+    Must be called inside an app context; only the calling process touches the
+    database.
+
+    Args:
+        businesses: Business rows to refresh
+        workers (int): Number of scraper processes
+        incremental (bool): Only scrape reviews newer than the ones already stored
+        rate_limiter (AdaptiveRateLimiter, optional): Limiter shared by the workers, it
+            must be picklable (Manager backed); one is created if not given
+
+    Returns:
+        list: One dict per business with its status and number of scraped reviews
+    """
+    queue = deque(
+        (business.id, business.url, get_known_review_ids(business.id) if incremental else None)
+        for business in businesses
+    )
+    summary = []
+
+    with ExitStack() as stack:
+        if rate_limiter is None:
+            rate_limiter = create_shared_rate_limiter(stack.enter_context(multiprocessing.Manager()))
+        executor = stack.enter_context(ProcessPoolExecutor(
+            max_workers=workers, initializer=install_rate_limiter, initargs=(rate_limiter,)
+        ))
+
+        pending = {}
+        while queue or pending:
+            # keep every worker busy, the shared limiter paces their requests
+            while queue and len(pending) < workers:
+                business_id, url, known_ids = queue.popleft()
+                future = executor.submit(_scrape_in_worker, url, known_ids)
+                pending[future] = (business_id, time.monotonic())
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                business_id, started = pending.pop(future)
+                entry = {'business_id': business_id, 'seconds': round(time.monotonic() - started, 1)}
+                try:
+                    result = future.result()
+                    reviews = result.get('reviews', [])
+                    process_reviews(reviews, business_id)
+                    entry.update(status='done', reviews=len(reviews))
+                except Exception as e:
+                    print(f"Error refreshing business {business_id}: {e}")
+                    entry.update(status='failed', reviews=0, error=str(e))
+
+                print(f"Business {business_id}: {entry['status']}, {entry['reviews']} reviews in {entry['seconds']}s")
+                summary.append(entry)
+
+        for host, metrics in rate_limiter.metrics().items():
+            print(f"Rate limit {host}: {metrics}")
+
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Refresh Google Maps reviews for many businesses')
+    parser.add_argument('--workers', type=int, default=WORKERS, help='number of scraper processes')
+    parser.add_argument('--business-id', type=int, action='append', dest='business_ids',
+                        help='only refresh this business (can be repeated), defaults to all')
+    parser.add_argument('--full', action='store_true', help='re-scrape every review instead of only new ones')
+    args = parser.parse_args()
+    # the schema is upgraded once by the web app or backend.models.upgrade, not here
+    os.environ['DB_UPGRADE_ON_START'] = '0'
+
+    from backend.app import app
+    from backend.models.business import Business
+
+    with app.app_context():
+        query = Business.query
+        if args.business_ids:
+            query = query.filter(Business.id.in_(args.business_ids))
+        businesses = query.all()
+
+        started_at = datetime.now()
+        summary = scrape_businesses(businesses, workers=args.workers, incremental=not args.full)
+        failed = [entry for entry in summary if entry['status'] != 'done']
+        print(f"Refreshed {len(summary) - len(failed)}/{len(summary)} businesses in {datetime.now() - started_at}")
@@ -1,19 +1,67 @@
 # from .googlemaps import GoogleMapsScraper
-from backend.services.googlemaps import GoogleMapsScraper
+from backend.services.checkpoint import ScrapeCheckpoint
+from backend.services.fetchers import get_review_fetcher
+from backend.services.relative_dates import SCRAPER_LOCALE, get_matcher
 from datetime import datetime, timedelta
-import re
-import json
+from functools import lru_cache
 import threading
 import os
 import signal
 import subprocess
 import platform
-import random
+
+import numpy as np
+
+
+# timedelta and period code of each relative date unit (months and years approximated)
+TIME_UNITS = {
+    'second': (timedelta(seconds=1), 2),
+    'minute': (timedelta(minutes=1), 3),
+    'hour': (timedelta(hours=1), 4),
+    'day': (timedelta(days=1), 5),
+    'week': (timedelta(weeks=1), 6),
+    'month': (timedelta(days=30), 7),
+    'year': (timedelta(days=365), 8),
+}
+# the estimate is spread by up to this many days either way, keyed by unit code
+MAX_OFFSET_DAYS = {2: 0, 3: 0, 4: 1, 5: 3, 6: 7, 7: 15, 8: 90}
+# seed for the review_date_estimate offsets, unset for a different spread on every run
+DATE_OFFSET_SEED = os.environ.get('SCRAPER_DATE_OFFSET_SEED')
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+@lru_cache(maxsize=1024)
+def relative_date_rule(relative_date, locale=SCRAPER_LOCALE):
+    """
+    Parse a relative date string once; there are only a few dozen distinct ones.
+
+    Args:
+        relative_date (str): Relative date string from Google Maps, in any language
+            of relative_dates.PHRASES
+        locale (str, optional): Only understand this locale's phrases
+
+    Returns:
+        timedelta: How long before the retrieval date the review was posted
+        int: The time period code, see parse_relative_date
+    """
+    if not relative_date:
+        return timedelta(0), 0
+
+    parsed = get_matcher(locale).match(relative_date)
+    if parsed is None:
+        return timedelta(0), 0
+
+    unit, quantity = parsed
+    if unit == 'now':
+        return timedelta(0), 1
+    delta, period_code = TIME_UNITS[unit]
+    return delta * quantity, period_code * 10 + min(quantity, 9)
 
 
 def parse_relative_date(relative_date, retrieval_date):
     """
-    Convert relative date expressions like '2 years ago', 'a month ago', etc.
+    Convert relative date expressions like '2 years ago', 'il y a un mois', etc.
     into an actual datetime object based on the retrieval date.
     
     Args:
@@ -22,203 +70,168 @@ def parse_relative_date(relative_date, retrieval_date):
         
     Returns:
         datetime: The calculated review date
-        int: A code representing the time period (useful for filtering/analysis)
+        int: A code representing the time period (useful for filtering/analysis).
+            Single digit unit code followed by the quantity capped at 9, e.g. 81 for
+            "1 year ago", 52 for "2 days ago"; 1 for "just now" and 0 if unknown
     """
-    if not relative_date:
-        return retrieval_date, 0  # Default to retrieval date if missing
-    
-    # Handle "just now" or similar expressions
-    if "just now" in relative_date.lower() or "moments ago" in relative_date.lower():
-        return retrieval_date, 1
-    
-    # Extract number and time unit using regex
-    match = re.match(r'(\d+|a|an)\s+(second|minute|hour|day|week|month|year)s?\s+ago', relative_date.lower())
-    if not match:
-        return retrieval_date, 0  # Return retrieval date if pattern doesn't match
-    
-    quantity, unit = match.groups()
-    
-    # Convert words like 'a' or 'an' to 1
-    if quantity in ['a', 'an']:
-        quantity = 1
-    else:
-        quantity = int(quantity)
-    
-    # Map time units to timedelta arguments and period codes
-    time_units = {
-        'second': ('seconds', 2),
-        'minute': ('minutes', 3),
-        'hour': ('hours', 4),
-        'day': ('days', 5),
-        'week': ('weeks', 6),
-        'month': ('days', 7),  # Approximate months as 30 days
-        'year': ('days', 8)    # Approximate years as 365 days
-    }
-    
-    delta_unit, period_code = time_units.get(unit, ('days', 0))
-    
-    # Special handling for months and years to better approximate actual time
-    if unit == 'month':
-        delta_args = {delta_unit: quantity * 30}
-    elif unit == 'year':
-        delta_args = {delta_unit: quantity * 365}
-    else:
-        delta_args = {delta_unit: quantity}
-    
-    # Calculate the actual date
-    calculated_date = retrieval_date - timedelta(**delta_args)
-    
-    # Return both the calculated date and a period code
-    # Period code format: single digit representing the unit, followed by quantity
-    # e.g., 81 for "1 year ago", 52 for "2 days ago"
-    return calculated_date, period_code * 10 + (quantity if quantity < 10 else 9)
+    delta, period_code = relative_date_rule(relative_date)
+    return retrieval_date - delta, period_code
+
+
+def normalize_review_dates(retrieval_dates, relative_dates, seed=DATE_OFFSET_SEED):
+    """
+    Compute the review dates of a whole batch at once.
+
+    Args:
+        retrieval_dates (list): datetimes the reviews were retrieved at
+        relative_dates (list): Relative date strings from Google Maps
+        seed (int, optional): Seed for the estimate offsets, for reproducible runs
+
+    Returns:
+        list: The calculated review dates
+        list: The review date estimates, the calculated date moved by a random
+            number of days within the precision of its unit
+        list: The time period codes
+    """
+    # look every distinct string up once and gather per review by index
+    distinct = {}
+    index = np.array([distinct.setdefault(relative_date or '', len(distinct)) for relative_date in relative_dates],
+                     dtype=np.int64)
+    rules = [relative_date_rule(relative_date) for relative_date in distinct]
+    deltas = np.array([delta for delta, _ in rules], dtype='timedelta64[us]').reshape(-1)[index]
+    codes = np.array([code for _, code in rules], dtype=np.int64).reshape(-1)[index]
+    max_offsets = np.array([MAX_OFFSET_DAYS.get(code // 10, 0) for _, code in rules],
+                           dtype=np.int64).reshape(-1)[index]
 
-def process_review_data(reviews):
+    rng = np.random.default_rng(None if seed is None else int(seed))
+    offsets = rng.integers(-max_offsets, max_offsets, endpoint=True)
+
+    # numpy datetimes are naive, carry the timezone of each retrieval date over separately
+    tzinfos = [d.tzinfo for d in retrieval_dates]
+    aware = any(tz is not None for tz in tzinfos)
+    if aware:
+        retrieval_dates = [d.replace(tzinfo=None) for d in retrieval_dates]
+    # np.array on datetime objects is slow, go through integer microseconds instead
+    retrieved = np.fromiter(((d - EPOCH) // MICROSECOND for d in retrieval_dates), dtype=np.int64,
+                            count=len(retrieval_dates)).astype('datetime64[us]')
+    review_dates = (retrieved - deltas).tolist()
+    estimates = (retrieved - deltas + offsets.astype('timedelta64[D]')).tolist()
+
+    if aware:
+        review_dates = [d.replace(tzinfo=tz) for d, tz in zip(review_dates, tzinfos)]
+        estimates = [d.replace(tzinfo=tz) for d, tz in zip(estimates, tzinfos)]
+    return review_dates, estimates, codes.tolist()
+
+
+def process_review_data(reviews, seed=DATE_OFFSET_SEED):
     """
     Process raw review data to standardize dates and add additional fields.
 
     Args:
         reviews (list): List of review dictionaries from the scraper
+        seed (int, optional): Seed for the review_date_estimate offsets
 
     Returns:
         list: Processed review data ready for database insertion.
     """
-    processed_reviews = []
+    valid_reviews = []
+    retrieval_dates = []
     
     for idx, review in enumerate(reviews):
-        try:
-            # print(f"Processing review #{idx}")
-
-            # Get and parse the retrieval date (when the review was scraped)
-            retrieval_date = review.get('retrieval_date')
-            if isinstance(retrieval_date, str):
-                try:
-                    retrieval_date = datetime.fromisoformat(retrieval_date.replace('Z', '+00:00'))
-                except Exception as e:
-                    print(f"Error parsing retrieval_date: {review.get('retrieval_date')} - {e}")
-                    continue  # Skip this review if retrieval_date cannot be parsed
-            if not isinstance(retrieval_date, datetime):
-                print("retrieval_date is not a valid datetime. Skipping review.")
-                continue
-
-            # Parse the relative date
-            relative_date = review.get('relative_date', '')
-            calculated_date, time_period_code = parse_relative_date(relative_date, retrieval_date)
-
-            # Ensure calculated_date is a datetime; otherwise, fallback to retrieval_date
-            if not isinstance(calculated_date, datetime):
-                print("Calculated date is not a datetime. Falling back to retrieval_date.")
-                calculated_date = retrieval_date
-
-            # Calculate review_date_estimate (start with the calculated date)
-            review_date_estimate = calculated_date
-
-            # Adjust estimate based on time_period_code
-            if time_period_code == 1:  # "Just now"
-                review_date_estimate = retrieval_date
-            elif time_period_code == 0:  # Unknown/Invalid
-                review_date_estimate = retrieval_date
-            else:
-                try:
-                    # Introduce a small random offset based on the time unit
-                    unit_code = time_period_code // 10  # Extract the unit code
-                    quantity = time_period_code % 10      # Extract the quantity
-                    # print(f"Unit Code: {unit_code}, Quantity: {quantity}")
-
-                    max_offset_days = 0
-                    if unit_code == 2:  # Seconds
-                        max_offset_days = 0
-                    elif unit_code == 3:  # Minutes
-                        max_offset_days = 0
-                    elif unit_code == 4:  # Hours
-                        max_offset_days = 1
-                    elif unit_code == 5:  # Days
-                        max_offset_days = 3
-                    elif unit_code == 6:  # Weeks
-                        max_offset_days = 7
-                    elif unit_code == 7:  # Months
-                        max_offset_days = 15
-                    elif unit_code == 8:  # Years
-                        max_offset_days = 90
-
-                    offset = random.randint(-max_offset_days, max_offset_days)
-                    # print(f"Offset (days) applied: {offset}")
-                    review_date_estimate = calculated_date + timedelta(days=offset)
-                except Exception as offset_error:
-                    print(f"Error calculating offset: {offset_error}")
-                    review_date_estimate = calculated_date
-                    
-        
+        # Get and parse the retrieval date (when the review was scraped)
+        retrieval_date = review.get('retrieval_date')
+        if isinstance(retrieval_date, str):
+            try:
+                retrieval_date = datetime.fromisoformat(retrieval_date.replace('Z', '+00:00'))
+            except Exception as e:
+                print(f"Error parsing retrieval_date: {review.get('retrieval_date')} - {e}")
+                continue  # Skip this review if retrieval_date cannot be parsed
+        if not isinstance(retrieval_date, datetime):
+            print(f"retrieval_date of review #{idx} is not a valid datetime. Skipping review.")
+            continue
 
-            # Build the processed review dictionary with correct types
-            processed_review = {
-                'source': 'Google',
-                'content': review.get('caption', ''),
-                'rating': review.get('rating', 0.0),
-                'retrieved_at': retrieval_date,
-                'review_date': calculated_date,
-                'review_date_estimate': review_date_estimate,
-                'time_period_code': time_period_code,
-                'relative_date_original': relative_date,
-                'username': review.get('username', ''),
-                'user_review_count': review.get('n_review_user', 0),
-                'user_profile_url': review.get('url_user', '')
-            }
-    
-            processed_reviews.append(processed_review)
-        except Exception as e:
-            print(f"Error processing review #{idx}: {e}")
-    
-    return processed_reviews
+        valid_reviews.append(review)
+        retrieval_dates.append(retrieval_date)
+
+    relative_dates = [review.get('relative_date', '') for review in valid_reviews]
+    review_dates, estimates, codes = normalize_review_dates(retrieval_dates, relative_dates, seed=seed)
+
+    # Build the processed review dictionaries with correct types
+    return [
+        {
+            'source': 'Google',
+            'content': review.get('caption', ''),
+            'rating': review.get('rating', 0.0),
+            'retrieved_at': retrieval_date,
+            'review_date': review_date,
+            'review_date_estimate': review_date_estimate,
+            'time_period_code': time_period_code,
+            'relative_date_original': relative_date,
+            'username': review.get('username', ''),
+            'user_review_count': review.get('n_review_user', 0),
+            'user_profile_url': review.get('url_user', ''),
+            'external_id': review.get('id_review')
+        }
+        for review, retrieval_date, relative_date, review_date, review_date_estimate, time_period_code
+        in zip(valid_reviews, retrieval_dates, relative_dates, review_dates, estimates, codes)
+    ]
+
+def iter_review_batches(url, known_ids=None, resume=True, fetcher=None):
+    """
+    Scrape reviews for a business from Google Maps, yielding each scrolled batch
+    already processed so it can be stored while the scrape goes on.
+
+    Args:
+        url (str): Google Maps URL for the business
+        known_ids (set, optional): id_review values already stored for the business.
+            When given only reviews newer than the known ones are scraped.
+        resume (bool): Checkpoint every batch, and resume from the checkpoint of an
+            earlier scrape of the same url and mode (full or incremental) that crashed
+        fetcher (ReviewFetcher, optional): Where to get the reviews from, defaults
+            to the one configured by REVIEW_FETCHER
 
-def scrape_reviews_for_business(url):
+    Yields:
+        list: Processed review data for one batch
+    """
+    print("Starting scraper...")
+    fetcher = fetcher or get_review_fetcher()
+    mode = 'incremental' if known_ids else 'full'
+    checkpoint = ScrapeCheckpoint.for_url(url, mode=mode) if resume else None
+    for reviews in fetcher.iter_reviews(url, known_ids=known_ids, checkpoint=checkpoint):
+        yield process_review_data(reviews)
+
+
+def scrape_reviews_for_business(url, known_ids=None):
     """
     Scrape reviews for a business from Google Maps
     
     Args:
         url (str): Google Maps URL for the business
+        known_ids (set, optional): id_review values already stored for the business.
+            When given only reviews newer than the known ones are scraped.
         
     Returns:
         dict: Processed review data
     """
-    print("Cleaning existing orphaned processes...")
-    cleanup_orphaned_processes(debug=True)
-    print("Starting scraper...")
-    with GoogleMapsScraper(debug=False) as scraper:
-        print("Getting reviews...")
-        raw_reviews = scraper.get_all_reviews(url)
-
-        print(f"Scraped {len(raw_reviews.get('reviews', []))} reviews")
-        
-        # Extract just the reviews array from the response
-        reviews = raw_reviews.get('reviews', [])
-        
-        print("Processing review data...")
-        # Process the raw review data
-        processed_reviews = process_review_data(reviews)
-        
-        print("Creating result dictionary...")
-        # Create the result dictionary
-        result = {
-            'place_url': url,
-            'total_reviews': len(processed_reviews),
-            'reviews': processed_reviews,
-            'scraped_at': datetime.now().isoformat()
-        }
-        
-        print("Saving to file...")
-        # Save to file for debugging/backup 
-        with open('all_reviews.json', 'w', encoding='utf-8') as f:
-            json.dump(result, f, ensure_ascii=False, indent=4, default=str)
+    processed_reviews = []
+    for batch in iter_review_batches(url, known_ids=known_ids):
+        processed_reviews.extend(batch)
 
-        print("Finished within context manager")
-    
-    #print("Exited context manager")
-    #print("Active threads:", threading.enumerate())
-    return result
+    print(f"Scraped {len(processed_reviews)} reviews")
+    return {
+        'place_url': url,
+        'total_reviews': len(processed_reviews),
+        'reviews': processed_reviews,
+        'scraped_at': datetime.now().isoformat()
+    }
 
 
 def cleanup_orphaned_processes(debug=False):
+    """Kill every chromedriver process on this host.
+
+    Only meant for manual recovery: it also kills the drivers of scrapes that are
+    still running. Scrapes clean up their own driver through the DriverPool.
+    """
 
     try:
         if platform.system() == "Darwin" or platform.system() == "Linux":
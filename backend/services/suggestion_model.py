@@ -0,0 +1,183 @@
+# The trained suggestion classifier saved as plain arrays instead of a pickle:
+#
+#   suggestion_model/
+#     metadata.json     format version, vectorizer settings, classes, training info
+#     vocabulary.json   tfidf terms, in column order
+#     idf.npy           tfidf idf weights
+#     roots.npy, feature.npy, threshold.npy, children_left.npy, children_right.npy,
+#     proba.npy         the forest's trees, one node table for all of them
+#
+# Loading runs no code from the files, and the arrays are memory-mapped so the
+# gunicorn workers of a host share one copy through the page cache. The model
+# is loaded on first use, not when the app is imported.
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import sklearn
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from backend.services.lemmatizer import BATCH_SIZE, N_PROCESS, lemmatize_batch
+
+ARTIFACT_FORMAT = 'suggestion-model'
+# bump when the layout changes, loading refuses artifacts newer than this
+ARTIFACT_VERSION = 1
+SERVICES_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.environ.get('SUGGESTION_MODEL_DIR', os.path.join(SERVICES_DIR, 'suggestion_model'))
+
+VECTORIZER_PARAMS = ('lowercase', 'token_pattern', 'ngram_range', 'analyzer', 'binary',
+                     'norm', 'use_idf', 'smooth_idf', 'sublinear_tf', 'strip_accents')
+NODE_ARRAYS = ('feature', 'threshold', 'children_left', 'children_right', 'proba')
+LEAF = -1
+# texts whose dense feature rows are walked down the trees at once
+PREDICT_CHUNK_SIZE = 512
+
+_detector = None
+_detector_lock = threading.Lock()
+
+
+def export_model(classifier, path=MODEL_DIR, threshold=0.5):
+    """
+    Save a fitted classifier's vectorizer and forest as a model artifact.
+
+    Args:
+        classifier: A fitted SuggestionClassifier or SuggestionDetector (anything
+            with a TfidfVectorizer `vectorizer` and a RandomForestClassifier `clf`)
+        path (str): Directory written to, created if needed
+        threshold (float): Default probability threshold of predict_batch
+    """
+    vectorizer, clf = classifier.vectorizer, classifier.clf
+    positive = list(clf.classes_).index(1) if 1 in clf.classes_ else None
+
+    # all trees in one node table, child indices shifted to point into it
+    roots, tables, offset = [], {name: [] for name in NODE_ARRAYS}, 0
+    for estimator in clf.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == LEAF
+        values = tree.value[:, 0, :]
+        totals = values.sum(axis=1)
+        proba = np.zeros(tree.node_count)
+        if positive is not None:
+            proba = np.divide(values[:, positive], totals, out=proba, where=totals > 0)
+
+        roots.append(offset)
+        tables['feature'].append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        tables['threshold'].append(tree.threshold.astype(np.float64))
+        tables['children_left'].append(np.where(is_leaf, LEAF, tree.children_left + offset).astype(np.int32))
+        tables['children_right'].append(np.where(is_leaf, LEAF, tree.children_right + offset).astype(np.int32))
+        tables['proba'].append(proba)
+        offset += tree.node_count
+
+    vocabulary = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    params = {name: vectorizer.get_params()[name] for name in VECTORIZER_PARAMS}
+    metadata = {
+        'format': ARTIFACT_FORMAT,
+        'version': ARTIFACT_VERSION,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'sklearn_version': sklearn.__version__,
+        'vectorizer': params,
+        'classes': [int(c) for c in clf.classes_],
+        'n_trees': len(roots),
+        'n_nodes': offset,
+        'threshold': threshold,
+    }
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, 'idf.npy'), vectorizer.idf_.astype(np.float64))
+    np.save(os.path.join(path, 'roots.npy'), np.array(roots, dtype=np.int32))
+    for name, parts in tables.items():
+        np.save(os.path.join(path, f'{name}.npy'), np.concatenate(parts))
+    with open(os.path.join(path, 'vocabulary.json'), 'w', encoding='utf-8') as f:
+        json.dump(vocabulary, f, ensure_ascii=False)
+    # written last, an artifact without it is incomplete
+    with open(os.path.join(path, 'metadata.json'), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
+
+
+class SuggestionModel:
+    """A suggestion classifier read from a model artifact, see export_model."""
+
+    def __init__(self, path=MODEL_DIR):
+        with open(os.path.join(path, 'metadata.json'), encoding='utf-8') as f:
+            self.metadata = json.load(f)
+        if self.metadata.get('format') != ARTIFACT_FORMAT:
+            raise ValueError(f"{path} is not a suggestion model artifact")
+        if self.metadata['version'] > ARTIFACT_VERSION:
+            raise ValueError(f"Model artifact version {self.metadata['version']} is newer than "
+                             f"the supported version {ARTIFACT_VERSION}")
+
+        with open(os.path.join(path, 'vocabulary.json'), encoding='utf-8') as f:
+            vocabulary = json.load(f)
+        params = dict(self.metadata['vectorizer'], ngram_range=tuple(self.metadata['vectorizer']['ngram_range']))
+        self.vectorizer = TfidfVectorizer(vocabulary={term: i for i, term in enumerate(vocabulary)}, **params)
+        # the vectorizer keeps the memory-mapped array as is, no copy
+        self.vectorizer.idf_ = np.load(os.path.join(path, 'idf.npy'), mmap_mode='r')
+
+        self.roots = np.load(os.path.join(path, 'roots.npy'))
+        for name in NODE_ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r'))
+        self.default_threshold = self.metadata['threshold']
+
+    def preprocess_batch(self, texts, batch_size=BATCH_SIZE, n_process=N_PROCESS):
+        """Clean and normalize many texts, the same way the classifier was trained"""
+        return lemmatize_batch(texts, batch_size=batch_size, n_process=n_process)
+
+    def _forest_proba(self, X):
+        return np.concatenate([
+            self._walk_trees(X[start:start + PREDICT_CHUNK_SIZE])
+            for start in range(0, X.shape[0], PREDICT_CHUNK_SIZE)
+        ])
+
+    def _walk_trees(self, X):
+        # sklearn compares float32 features with the thresholds, do the same to split alike
+        X = X.astype(np.float32).toarray()
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots))).copy()
+        while True:
+            left = self.children_left[nodes]
+            inner = left != LEAF
+            if not inner.any():
+                break
+            goes_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(inner, np.where(goes_left, left, self.children_right[nodes]), nodes)
+        return self.proba[nodes].mean(axis=1)
+
+    def predict_proba_batch(self, texts, batch_size=BATCH_SIZE, n_process=N_PROCESS):
+        """Get the probability that each text contains a suggestion, as an array."""
+        if not texts:
+            return np.zeros(0)
+        X_tfidf = self.vectorizer.transform(self.preprocess_batch(texts, batch_size=batch_size, n_process=n_process))
+        return self._forest_proba(X_tfidf)
+
+    def predict_batch(self, texts, threshold=None, batch_size=BATCH_SIZE, n_process=N_PROCESS):
+        """Predict for each text if it contains a suggestion, as a boolean array."""
+        if threshold is None:
+            threshold = self.default_threshold
+        return self.predict_proba_batch(texts, batch_size=batch_size, n_process=n_process) >= threshold
+
+    def predict_proba(self, text):
+        """Get the probability that a text contains a suggestion."""
+        return float(self.predict_proba_batch([text])[0])
+
+    def predict(self, text, threshold=None):
+        """Predict if a text contains a suggestion."""
+        return bool(self.predict_batch([text], threshold=threshold)[0])
+
+
+def require_model_artifact(path=MODEL_DIR):
+    """Raise FileNotFoundError if no model artifact was exported to path"""
+    if not os.path.exists(os.path.join(path, 'metadata.json')):
+        raise FileNotFoundError(f"No suggestion model artifact in {path}. Train and export one with "
+                                f"python -m backend.services.export_classifier")
+
+
+def get_suggestion_detector(path=MODEL_DIR):
+    """The suggestion detector of this process, read from the model artifact on first use"""
+    global _detector
+    with _detector_lock:
+        if _detector is None:
+            require_model_artifact(path)
+            _detector = SuggestionModel(path)
+        return _detector
@@ -2,18 +2,16 @@
 # It contains a standalone implementation of the suggestion detection functionality
 
 import re
-import spacy
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier
 
+from backend.services.lemmatizer import BATCH_SIZE, N_PROCESS, lemmatize, lemmatize_batch, load_nlp
+
 class SuggestionDetector:
     """A standalone implementation of the suggestion detection functionality."""
     
     def __init__(self):
-        # Initialize spaCy model
-        self.nlp = spacy.load('en_core_web_sm')
-        
         # Load pre-trained vectorizer
         self.vectorizer = TfidfVectorizer(max_features=5000, ngram_range=(1, 2))
         # Configure vectorizer vocabulary and idf values to match the trained model
@@ -41,19 +39,29 @@ class SuggestionDetector:
         ]
         self.compiled_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in self.suggestion_patterns]
     
+    @property
+    def nlp(self):
+        """The shared slim spaCy pipeline, loaded on first use"""
+        return load_nlp()
+    
+    def __getstate__(self):
+        # the spaCy pipeline is loaded by whoever unpickles, not stored
+        state = self.__dict__.copy()
+        state.pop('nlp', None)
+        return state
+    
+    def __setstate__(self, state):
+        # older pickles carry their own full pipeline, drop it for the shared slim one
+        state.pop('nlp', None)
+        self.__dict__.update(state)
+    
     def preprocess(self, text):
         """Clean and normalize text"""
-        # Convert to lowercase and strip whitespace
-        text = text.lower().strip()
-        
-        # Process with spaCy
-        doc = self.nlp(text)
-        
-        # Extract lemmatized tokens, excluding stopwords and punctuation
-        tokens = [token.lemma_ for token in doc 
-                 if not token.is_stop and not token.is_punct]
-        
-        return " ".join(tokens)
+        return lemmatize(text)
+    
+    def preprocess_batch(self, texts, batch_size=BATCH_SIZE, n_process=N_PROCESS):
+        """Clean and normalize many texts, streaming the ones not cached through spaCy in batches"""
+        return lemmatize_batch(texts, batch_size=batch_size, n_process=n_process)
     
     def predict_proba(self, text):
         """Get the probability that a text contains a suggestion."""
@@ -70,6 +78,17 @@ class SuggestionDetector:
         prob = self.predict_proba(text)
         return prob >= threshold
     
+    def predict_proba_batch(self, texts, batch_size=BATCH_SIZE, n_process=N_PROCESS):
+        """Get the probability that each text contains a suggestion, with one transform and one forest call"""
+        if not texts:
+            return np.zeros(0)
+        X_tfidf = self.vectorizer.transform(self.preprocess_batch(texts, batch_size=batch_size, n_process=n_process))
+        return self.clf.predict_proba(X_tfidf)[:, 1]
+    
+    def predict_batch(self, texts, threshold=0.5, batch_size=BATCH_SIZE, n_process=N_PROCESS):
+        """Predict for each text if it contains a suggestion, as a boolean array."""
+        return self.predict_proba_batch(texts, batch_size=batch_size, n_process=n_process) >= threshold
+    
     def predict_pattern_only(self, text):
         """Simplified prediction using only pattern matching."""
         # Check if any pattern matches
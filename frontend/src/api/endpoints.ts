@@ -46,4 +46,14 @@ export const getRatingsDistribution = (business_id: number) =>
   api.get(`/api/reviews/${business_id}/ratings-distribution`);
 
 export const getTopicsFrequency = (business_id: number) =>
-  api.get(`/api/reviews/${business_id}/topics-frequency`);
\ No newline at end of file
+  api.get(`/api/reviews/${business_id}/topics-frequency`);
+
+// JOB ENDPOINTS
+export const getJob = (job_id: number) =>
+  api.get(`/api/jobs/${job_id}`);
+
+export const getLatestBusinessJob = (business_id: number) =>
+  api.get(`/api/jobs/business/${business_id}/latest`);
+
+export const refreshBusinessReviews = (business_id: number) =>
+  api.post(`/api/jobs/business/${business_id}/refresh`);
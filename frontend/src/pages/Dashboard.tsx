@@ -1,6 +1,6 @@
 import "../App.css";
 import { useState, useEffect } from "react";
-import { UserData } from "../types";
+import { Job, UserData } from "../types";
 import Header from "../components/header";
 import PerformanceSummary from "../components/PerformanceSummary";
 import SentimentAnalysis from "../components/SentimentAnalysis";
@@ -10,7 +10,7 @@ import ReviewSegmentation from "../components/ReviewSegmentation";
 import CriticalReviews from "../components/CriticalReviews";
 // import TopicRatings from "../components/TopicRatings";
 import AIInsights from "../components/AIInsights";
-import { getBusinessSummary, getRatingsDistribution, getTopicsFrequency } from "../api/endpoints";
+import { getBusinessSummary, getLatestBusinessJob, getRatingsDistribution, getTopicsFrequency } from "../api/endpoints";
 
 interface DashboardProps {
   userData: UserData | null;
@@ -92,6 +92,9 @@ interface DashboardData {
 function Dashboard({ userData }: DashboardProps) {
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  const [scrapeJob, setScrapeJob] = useState<Job | null>(null);
+  // Bumped when a scrape job finishes so the dashboard data is fetched again
+  const [refreshKey, setRefreshKey] = useState(0);
   
 
   const [dashboardData, setDashboardData] = useState<DashboardData>({
@@ -122,6 +125,51 @@ function Dashboard({ userData }: DashboardProps) {
     aiInsights: [],
   });
 
+  // Reviews are collected by a background job after registration, poll it until it is finished.
+  // Reviews are stored batch by batch, so the dashboard is reloaded whenever more have come in.
+  useEffect(() => {
+    if (!userData || !userData.businesses || !userData.businesses[0]) {
+      return;
+    }
+
+    const businessId = userData.businesses[0].id;
+    let timer: ReturnType<typeof setTimeout> | undefined;
+    let cancelled = false;
+    let wasActive = false;
+    let lastMessage: string | null = null;
+
+    const pollJob = async () => {
+      try {
+        const response = await getLatestBusinessJob(businessId);
+        const job: Job | null = response.data.job;
+        if (cancelled) {
+          return;
+        }
+
+        setScrapeJob(job);
+        if (job && (job.status === "queued" || job.status === "running")) {
+          if (wasActive && job.message !== lastMessage) {
+            setRefreshKey(key => key + 1);
+          }
+          wasActive = true;
+          lastMessage = job.message;
+          timer = setTimeout(pollJob, 3000);
+        } else if (wasActive) {
+          setRefreshKey(key => key + 1);
+        }
+      } catch (error) {
+        console.error("Failed to load scrape job:", error);
+      }
+    };
+
+    pollJob();
+
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [userData]);
+
   useEffect(() => {
     const fetchDashboardData = async () => {
       if (!userData || !userData.businesses || !userData.businesses[0]) {
@@ -130,7 +178,8 @@ function Dashboard({ userData }: DashboardProps) {
       }
 
       try {
-        setIsLoading(true);
+        // Reloads while reviews are being collected happen in place
+        setIsLoading(refreshKey === 0);
         setError(null);
         
         const businessId = userData.businesses[0].id;
@@ -181,7 +230,7 @@ function Dashboard({ userData }: DashboardProps) {
     if (userData) {
       fetchDashboardData();
     }
-  }, [userData]);
+  }, [userData, refreshKey]);
 
   if (isLoading) {
     return <div>Loading dashboard...</div>;
@@ -202,6 +251,21 @@ function Dashboard({ userData }: DashboardProps) {
           Welcome back, {userData?.first_name} {userData?.last_name}!
         </h1>
 
+        {/* Progress of the background job collecting the reviews */}
+        {scrapeJob && (scrapeJob.status === "queued" || scrapeJob.status === "running") && (
+          <div className="mb-8 bg-white p-4 rounded-lg shadow-md">
+            <p className="mb-2 text-coolgray">
+              {scrapeJob.message || "Collecting your reviews..."} ({scrapeJob.progress}%)
+            </p>
+            <div className="h-2 w-full rounded-full bg-gray-200">
+              <div
+                className="h-2 rounded-full bg-[#F59E42] transition-all"
+                style={{ width: `${scrapeJob.progress}%` }}
+              />
+            </div>
+          </div>
+        )}
+
         <div className="space-y-8">
           {/* Performance Summary */}
           <PerformanceSummary 
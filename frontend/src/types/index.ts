@@ -37,3 +37,16 @@ export interface UserData {
         name: string;
     }[];
 }
+
+export interface Job {
+    id: number;
+    kind: string;
+    status: "queued" | "running" | "done" | "failed";
+    business_id: number | null;
+    progress: number;
+    message: string | null;
+    error: string | null;
+    created_at: string;
+    started_at: string | null;
+    finished_at: string | null;
+}
@@ -0,0 +1,37 @@
+import pytest
+from flask import Flask
+
+from backend.models.database import db
+from backend.models.business import Business
+from backend.models.business_daily_stats import BusinessDailyStats
+from backend.models.insight import Insight
+from backend.models.job import Job
+from backend.models.nlp_cache import NlpCacheEntry
+from backend.models.review import Review
+from backend.models.review_topic import ReviewTopic
+from backend.models.user import User
+
+
+@pytest.fixture
+def app(tmp_path):
+    """A bare app on a new SQLite file, with the tables created and a context pushed"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'test.db'}"
+    app.config['GOOGLE_CLOUD_API_KEY'] = 'test-key'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def business(app):
+    user = User(first_name='Test', last_name='User', email='test@example.com')
+    db.session.add(user)
+    db.session.flush()
+    business = Business(name='Test Cafe', url='https://www.google.com/maps/place/test', user_id=user.id)
+    db.session.add(business)
+    db.session.commit()
+    return business
@@ -0,0 +1,16 @@
+from backend.models.business_daily_stats import BusinessDailyStats
+from backend.services.daily_stats import COUNTERS, rebuild_daily_stats
+
+
+def rollup_rows():
+    """The business_daily_stats rows with any reviews in them, as comparable tuples"""
+    return sorted(
+        (stats.business_id, stats.date) + tuple(getattr(stats, name) for name in COUNTERS)
+        for stats in BusinessDailyStats.query if stats.review_count
+    )
+
+
+def rebuilt_rollup_rows():
+    """rollup_rows after recomputing the rollup from the review table"""
+    rebuild_daily_stats()
+    return rollup_rows()
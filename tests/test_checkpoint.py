@@ -0,0 +1,95 @@
+import threading
+import time
+
+from backend.services import scraper
+from backend.services.checkpoint import ScrapeCheckpoint
+from backend.services.fetchers import ReviewFetcher
+
+URL = 'https://www.google.com/maps/place/test'
+
+
+def review(review_id):
+    return {'id_review': review_id, 'caption': f'review {review_id}'}
+
+
+def test_saved_batches_are_resumed(tmp_path):
+    checkpoint = ScrapeCheckpoint.for_url(URL, directory=str(tmp_path))
+    checkpoint.save_batch([review('a'), review('b')], offset=2, iteration=1)
+    checkpoint.save_batch([review('c')], offset=3, iteration=2)
+
+    resumed = ScrapeCheckpoint.for_url(URL, directory=str(tmp_path))
+    state = resumed.load()
+
+    assert state['offset'] == 3
+    assert state['iteration'] == 2
+    assert state['last_review_id'] == 'c'
+    assert list(resumed.read_batches()) == [[review('a'), review('b')], [review('c')]]
+
+
+def test_torn_last_batch_is_skipped(tmp_path):
+    checkpoint = ScrapeCheckpoint.for_url(URL, directory=str(tmp_path))
+    checkpoint.save_batch([review('a')], offset=1, iteration=1)
+    with open(checkpoint.batches_path, 'a', encoding='utf-8') as f:
+        f.write('[{"id_review": "b", "capt')
+
+    assert list(checkpoint.read_batches()) == [[review('a')]]
+
+
+def test_old_checkpoint_is_dropped(tmp_path):
+    checkpoint = ScrapeCheckpoint.for_url(URL, directory=str(tmp_path))
+    checkpoint.save_batch([review('a')], offset=1, iteration=1)
+
+    assert checkpoint.load(max_age=-1) is None
+    assert checkpoint.load() is None
+    assert list(checkpoint.read_batches()) == []
+
+
+def test_modes_have_separate_checkpoints(tmp_path):
+    full = ScrapeCheckpoint.for_url(URL, mode='full', directory=str(tmp_path))
+    incremental = ScrapeCheckpoint.for_url(URL, mode='incremental', directory=str(tmp_path))
+    full.save_batch([review('a')], offset=1, iteration=1)
+
+    assert full.key != incremental.key
+    assert incremental.load() is None
+    assert full.load()['offset'] == 1
+
+
+def test_save_waits_for_the_lock(tmp_path):
+    checkpoint = ScrapeCheckpoint.for_url(URL, directory=str(tmp_path))
+    other = ScrapeCheckpoint.for_url(URL, directory=str(tmp_path))
+    saved = threading.Event()
+
+    def save():
+        other.save_batch([review('a')], offset=1, iteration=1)
+        saved.set()
+
+    with checkpoint._locked():
+        thread = threading.Thread(target=save)
+        thread.start()
+        time.sleep(0.2)
+        assert not saved.is_set()
+    thread.join(timeout=5)
+
+    assert saved.is_set()
+    assert checkpoint.load()['offset'] == 1
+
+
+class RecordingFetcher(ReviewFetcher):
+    def __init__(self):
+        self.checkpoints = []
+
+    def iter_reviews(self, url, known_ids=None, checkpoint=None):
+        self.checkpoints.append(checkpoint)
+        return iter(())
+
+
+def test_scrape_mode_picks_the_checkpoint():
+    fetcher = RecordingFetcher()
+    list(scraper.iter_review_batches(URL, fetcher=fetcher))
+    list(scraper.iter_review_batches(URL, known_ids={'a'}, fetcher=fetcher))
+    list(scraper.iter_review_batches(URL, resume=False, fetcher=fetcher))
+
+    full, incremental, none = fetcher.checkpoints
+    assert full.key.startswith('full-')
+    assert incremental.key.startswith('incremental-')
+    assert none is None
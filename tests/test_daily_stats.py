@@ -0,0 +1,146 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.models.database import db
+from backend.models.review import Review
+from backend.services.daily_stats import PERIOD_DAYS, get_rating_counts, get_sentiment_trends
+from backend.services.review_store import store_reviews
+from tests.helpers import rebuilt_rollup_rows, rollup_rows
+
+NOW = datetime(2026, 5, 20, 15, 30)
+PERIODS = list(PERIOD_DAYS)
+
+
+def baseline_sentiment_trends(business_id, period, now):
+    """The dashboard's per review sentiment buckets before the rollup"""
+    start_date = now - timedelta(days=PERIOD_DAYS[period])
+    reviews = Review.query.filter(
+        Review.business_id == business_id,
+        Review.review_date_estimate >= start_date
+    ).order_by(Review.review_date_estimate).all()
+
+    time_buckets = {}
+    if period == 'week':
+        for i in range(7):
+            key = (now - timedelta(days=6 - i)).strftime('%Y-%m-%d')
+            time_buckets[key] = {'date': key, 'avg_sentiment': 0, 'review_count': 0}
+    elif period == 'month':
+        for i in range(4):
+            key = (now - timedelta(days=28 - i * 7)).strftime('%Y-%m-%d')
+            time_buckets[key] = {'date': key, 'avg_sentiment': 0, 'review_count': 0}
+    elif period == 'quarter':
+        for i in range(3):
+            key = (now - timedelta(days=90 - i * 30)).strftime('%Y-%m')
+            time_buckets[key] = {'date': key, 'avg_sentiment': 0, 'review_count': 0}
+    else:
+        # the old '%Y-Q%d' % quarter formatting raised, this is the key it meant
+        for i in range(4):
+            bucket_date = now - timedelta(days=365 - i * 90)
+            key = f'{bucket_date.year}-Q{(bucket_date.month - 1) // 3 + 1}'
+            time_buckets[key] = {'date': key, 'avg_sentiment': 0, 'review_count': 0}
+
+    for review in reviews:
+        bucket_key = None
+        review_date = review.review_date_estimate
+        if period == 'week':
+            bucket_key = review_date.strftime('%Y-%m-%d')
+        elif period == 'month':
+            for key in time_buckets:
+                if abs((datetime.strptime(key, '%Y-%m-%d') - review_date).days) < 7:
+                    bucket_key = key
+                    break
+        elif period == 'quarter':
+            bucket_key = review_date.strftime('%Y-%m')
+        else:
+            bucket_key = f'{review_date.year}-Q{(review_date.month - 1) // 3 + 1}'
+
+        if bucket_key in time_buckets:
+            bucket = time_buckets[bucket_key]
+            bucket['avg_sentiment'] = ((bucket['avg_sentiment'] * bucket['review_count'] + review.senti_score)
+                                       / (bucket['review_count'] + 1))
+            bucket['review_count'] += 1
+
+    distribution = {'positive': 0, 'neutral': 0, 'negative': 0}
+    for review in reviews:
+        sentiment = review.sentiment_description.lower()
+        if sentiment in distribution:
+            distribution[sentiment] += 1
+    return list(time_buckets.values()), distribution, len(reviews)
+
+
+def baseline_rating_counts(business_id, start_date):
+    """The dashboard's per review rating distribution before the rollup"""
+    distribution = dict.fromkeys('12345', 0)
+    for review in Review.query.filter(Review.business_id == business_id,
+                                      Review.review_date_estimate >= start_date):
+        if review.rating is not None and str(round(review.rating)) in distribution:
+            distribution[str(round(review.rating))] += 1
+    return distribution
+
+
+def review_row(business, number, date, rating, score):
+    sentiment = 'Positive' if score > 0.25 else 'Negative' if score < -0.25 else 'Neutral'
+    return {
+        'source': 'Google', 'content': f'review {number}', 'rating': rating, 'review_date_estimate': date,
+        'business_id': business.id, 'senti_score': score, 'sentiment_magnitude': abs(score),
+        'sentiment_description': sentiment, 'is_suggestion': False, 'external_id': f'id-{number}',
+    }
+
+
+def edge_dates():
+    """Times where a day based rollup could put a review in another bucket than the review did"""
+    today = datetime.combine(NOW.date(), datetime.min.time())
+    dates = [NOW, today, today - timedelta(days=1), today - timedelta(hours=1), NOW + timedelta(hours=2)]
+    for days in PERIOD_DAYS.values():
+        start = NOW - timedelta(days=days)
+        midnight = datetime.combine(start.date(), datetime.min.time())
+        dates += [start, start - timedelta(minutes=1), start + timedelta(minutes=1), midnight,
+                  midnight + timedelta(days=1), midnight + timedelta(days=1) - timedelta(seconds=1)]
+    # the month's week boundaries, at midnight and just after
+    for weeks in range(5):
+        boundary = today - timedelta(days=29 - 7 * weeks)
+        dates += [boundary, boundary + timedelta(minutes=1), boundary - timedelta(minutes=1)]
+    return dates
+
+
+@pytest.fixture
+def reviews(business):
+    rng = random.Random(0)
+    dates = edge_dates() + [NOW - timedelta(minutes=rng.randrange(60 * 24 * 400)) for _ in range(400)]
+    rows = [review_row(business, number, date, float(rng.randint(1, 5)), round(rng.uniform(-1, 1), 2))
+            for number, date in enumerate(dates)]
+    store_reviews(rows)
+    db.session.commit()
+    return rows
+
+
+@pytest.mark.parametrize('period', PERIODS)
+def test_sentiment_trends_match_the_per_review_buckets(business, reviews, period):
+    trends, distribution, total = get_sentiment_trends(business.id, period, now=NOW)
+    expected_trends, expected_distribution, expected_total = baseline_sentiment_trends(business.id, period, NOW)
+
+    assert [(bucket['date'], bucket['review_count']) for bucket in trends] == [
+        (bucket['date'], bucket['review_count']) for bucket in expected_trends
+    ]
+    assert [bucket['avg_sentiment'] for bucket in trends] == pytest.approx(
+        [bucket['avg_sentiment'] for bucket in expected_trends]
+    )
+    assert (distribution, total) == (expected_distribution, expected_total)
+
+
+@pytest.mark.parametrize('period', PERIODS)
+def test_rating_counts_match_the_per_review_counts(business, reviews, period):
+    start = NOW - timedelta(days=PERIOD_DAYS[period])
+
+    assert get_rating_counts(business.id, start) == baseline_rating_counts(business.id, start)
+
+
+def test_rating_counts_round_halves_up(business):
+    ratings = [0.5, 1.5, 2.0, 2.5, 3.5, 4.4, 4.5, 5.0]
+    store_reviews([review_row(business, number, NOW, rating, 0.0) for number, rating in enumerate(ratings)])
+    db.session.commit()
+
+    assert get_rating_counts(business.id) == {'1': 1, '2': 2, '3': 1, '4': 2, '5': 2}
+    assert rollup_rows() == rebuilt_rollup_rows()
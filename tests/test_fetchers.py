@@ -0,0 +1,46 @@
+import importlib
+
+import pytest
+
+from backend.services import fetchers
+
+
+@pytest.fixture
+def fetchers_with_env(monkeypatch):
+    """The fetchers module re-imported after the environment is set"""
+    def reload(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        return importlib.reload(fetchers)
+
+    yield reload
+    monkeypatch.undo()
+    importlib.reload(fetchers)
+
+
+@pytest.mark.parametrize('name, fetcher_class', [
+    ('http', 'HttpReviewFetcher'),
+    ('selenium', 'SeleniumReviewFetcher'),
+    ('auto', 'FallbackReviewFetcher'),
+])
+def test_review_fetcher_setting_picks_the_fetcher(fetchers_with_env, name, fetcher_class):
+    module = fetchers_with_env(REVIEW_FETCHER=name)
+
+    assert type(module.get_review_fetcher()) is getattr(module, fetcher_class)
+
+
+def test_selenium_is_the_default(fetchers_with_env, monkeypatch):
+    monkeypatch.delenv('REVIEW_FETCHER', raising=False)
+    module = fetchers_with_env()
+
+    assert isinstance(module.get_review_fetcher(), module.SeleniumReviewFetcher)
+
+
+def test_unknown_fetcher_is_rejected():
+    with pytest.raises(ValueError):
+        fetchers.get_review_fetcher('carrier-pigeon')
+
+
+def test_review_fetcher_is_abstract():
+    with pytest.raises(TypeError):
+        fetchers.ReviewFetcher()
@@ -0,0 +1,56 @@
+from bs4 import BeautifulSoup
+
+from backend.benchmarks.fixtures import load_fixture_reviews, render_page, render_review_block, render_review_blocks
+from backend.services.googlemaps import filter_string, parse_review, parse_review_blocks
+
+FIELDS = ('id_review', 'caption', 'relative_date', 'rating', 'username', 'n_review_user', 'url_user')
+
+
+def parsed(blocks):
+    return [{field: item[field] for field in FIELDS} for item in map(parse_review, blocks)]
+
+
+def test_fixture_reviews_are_parsed():
+    reviews = load_fixture_reviews()[:50]
+
+    items = parsed(parse_review_blocks(render_review_blocks(len(reviews), reviews)))
+
+    assert items == [{
+        'id_review': f"{review['id_review']}-{index}",
+        'caption': filter_string(review['caption']),
+        'relative_date': review['relative_date'],
+        'rating': float(review['rating']),
+        'username': review['username'],
+        'n_review_user': review['n_review_user'],
+        'url_user': review['url_user'],
+    } for index, review in enumerate(reviews)]
+
+
+def test_fragments_parse_like_the_whole_page():
+    blocks = render_review_blocks(30)
+    page = BeautifulSoup(render_page(blocks, overhead_kb=1), 'lxml')
+
+    assert parsed(parse_review_blocks(blocks[10:])) == parsed(
+        page.find_all('div', class_='jftiEf fontBodyMedium')[10:]
+    )
+
+
+def test_missing_fields_get_defaults():
+    block = '<div class="jftiEf fontBodyMedium" data-review-id="abc"></div>'
+
+    assert parsed(parse_review_blocks([block])) == [{
+        'id_review': 'abc', 'caption': None, 'relative_date': None, 'rating': None,
+        'username': None, 'n_review_user': 0, 'url_user': None,
+    }]
+
+
+def test_no_fragments_parse_to_nothing():
+    assert parse_review_blocks([]) == []
+
+
+def test_markup_in_text_is_unescaped():
+    review = dict(load_fixture_reviews()[0], caption='Fish & chips <3\nworth it')
+
+    item, = parsed(parse_review_blocks([render_review_block(review)]))
+
+    assert item['caption'] == 'Fish & chips <3 worth it'
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone
+
+from flask import Flask
+from sqlalchemy import inspect
+
+from backend.models.database import db, init_db
+from backend.models.job import Job
+from backend.services import jobs
+
+
+def test_claim_takes_the_oldest_queued_job(app):
+    first = jobs.enqueue_job('scrape_business')
+    second = jobs.enqueue_job('scrape_business')
+    first.created_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+    db.session.commit()
+
+    claimed = jobs.claim_next_job()
+
+    assert claimed.id == first.id
+    assert claimed.status == 'running'
+    assert claimed.started_at is not None
+    assert claimed.heartbeat_at == claimed.started_at
+    assert jobs.claim_next_job().id == second.id
+    assert jobs.claim_next_job() is None
+
+
+def test_claimed_job_is_not_claimed_again(app):
+    job = jobs.enqueue_job('scrape_business')
+    db.session.commit()
+    # another worker gets there first
+    Job.query.filter_by(id=job.id).update({'status': 'running'}, synchronize_session=False)
+    db.session.commit()
+
+    assert jobs.claim_next_job() is None
+
+
+def test_update_job_bumps_the_heartbeat(app):
+    jobs.enqueue_job('scrape_business')
+    db.session.commit()
+    job = jobs.claim_next_job()
+    job.heartbeat_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    db.session.commit()
+
+    jobs.update_job(job, progress=50, message='Halfway')
+    db.session.expire_all()
+
+    job = db.session.get(Job, job.id)
+    assert job.progress == 50
+    assert job.message == 'Halfway'
+    assert job.heartbeat_at > datetime.now() - timedelta(minutes=1)
+
+
+def running_job(started_ago, heartbeat_ago=None):
+    now = datetime.now(timezone.utc)
+    job = Job(kind='scrape_business', status='running', started_at=now - started_ago,
+              heartbeat_at=now - heartbeat_ago if heartbeat_ago is not None else None)
+    db.session.add(job)
+    db.session.commit()
+    return job.id
+
+
+def test_requeue_goes_by_the_heartbeat(app):
+    # long running but still beating, and started recently but silent since
+    alive = running_job(started_ago=timedelta(hours=5), heartbeat_ago=timedelta(seconds=10))
+    dead = running_job(started_ago=timedelta(minutes=20), heartbeat_ago=timedelta(minutes=15))
+
+    assert jobs.requeue_stale_jobs(timeout=600) == 1
+
+    assert db.session.get(Job, alive).status == 'running'
+    requeued = db.session.get(Job, dead)
+    assert requeued.status == 'queued'
+    assert requeued.started_at is None
+    assert requeued.heartbeat_at is None
+
+
+def test_requeue_falls_back_to_the_start_time(app):
+    old = running_job(started_ago=timedelta(hours=2))
+    recent = running_job(started_ago=timedelta(seconds=10))
+
+    assert jobs.requeue_stale_jobs(timeout=600) == 1
+
+    assert db.session.get(Job, old).status == 'queued'
+    assert db.session.get(Job, recent).status == 'running'
+
+
+def test_run_job_records_the_outcome(app, monkeypatch):
+    def fail(job):
+        raise RuntimeError('scrape failed')
+
+    monkeypatch.setitem(jobs.JOB_HANDLERS, 'ok', lambda job: 'All good')
+    monkeypatch.setitem(jobs.JOB_HANDLERS, 'broken', fail)
+    done, failed, unknown = (jobs.enqueue_job(kind) for kind in ('ok', 'broken', 'missing'))
+    db.session.commit()
+
+    jobs.work(once=True)
+
+    assert (done.status, done.progress, done.message) == ('done', 100, 'All good')
+    assert (failed.status, failed.error) == ('failed', 'scrape failed')
+    assert unknown.status == 'failed'
+    assert 'Unknown job kind' in unknown.error
+    assert all(job.finished_at is not None for job in (done, failed, unknown))
+
+
+def test_init_db_only_upgrades_when_asked(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'worker.db'}"
+
+    init_db(app, upgrade=False)
+
+    with app.app_context():
+        assert not inspect(db.engine).has_table('job')
+        db.engine.dispose()
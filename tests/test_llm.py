@@ -0,0 +1,96 @@
+import pytest
+
+from backend.models.review import Review
+from backend.models.review_topic import ReviewTopic
+from backend.services import llm, nlp_cache
+from tests.helpers import rebuilt_rollup_rows, rollup_rows
+
+
+def fake_analysis(text):
+    if 'unreachable' in text:
+        return None
+    return {
+        'sentiment_score': 0.8,
+        'sentiment_magnitude': 1.2,
+        'sentiment_description': 'Positive',
+        'entities': [('coffee', 'CONSUMER_GOOD', 0.7), ('staff', 'PERSON', 0.2)],
+    }
+
+
+@pytest.fixture(autouse=True)
+def fake_nlp(monkeypatch):
+    monkeypatch.setattr(nlp_cache, 'analyze_texts', lambda texts, **kwargs: [fake_analysis(t) for t in texts])
+
+
+def review_payload(business, content, **fields):
+    review = {
+        'source': 'Google', 'content': content, 'rating': 4.0,
+        'retrieved_at': '2025-03-02T10:00:00Z', 'review_date': '2025-02-20T00:00:00',
+        'username': 'someone', 'user_review_count': 3, 'user_profile_url': '',
+        'business_id': business.id,
+    }
+    review.update(fields)
+    return review
+
+
+def test_process_reviews_writes_rows(business):
+    results = llm.process_reviews([review_payload(business, 'Great coffee and staff')])
+
+    review = Review.query.one()
+    assert results[0]['id'] == review.id
+    assert review.senti_score == 0.8
+    assert review.sentiment_magnitude == 1.2
+    assert review.sentiment_description == 'Positive'
+    assert review.topics == 'coffee, staff'
+    assert review.review_date_estimate.date().isoformat() == '2025-02-20'
+
+
+def test_process_reviews_stores_failed_analyses_as_neutral(business):
+    llm.process_reviews([review_payload(business, 'unreachable', review_date=None)])
+
+    review = Review.query.one()
+    assert (review.senti_score, review.sentiment_description, review.topics) == (0.0, 'Neutral', '')
+    # no review date, so it is dated when it was retrieved
+    assert review.review_date_estimate.date().isoformat() == '2025-03-02'
+
+
+def test_process_reviews_syncs_topics_and_daily_stats(business):
+    llm.process_reviews([
+        review_payload(business, 'Great coffee and staff', external_id='a'),
+        review_payload(business, 'unreachable', external_id='b', rating=2.5),
+        review_payload(business, 'Great coffee again', review_date='2025-02-21T00:00:00'),
+    ])
+
+    assert sorted((link.review.content, link.topic, link.salience) for link in ReviewTopic.query) == [
+        ('Great coffee again', 'coffee', 0.7), ('Great coffee again', 'staff', 0.2),
+        ('Great coffee and staff', 'coffee', 0.7), ('Great coffee and staff', 'staff', 0.2),
+    ]
+    assert rollup_rows() == rebuilt_rollup_rows()
+
+
+def test_process_reviews_skips_stored_external_ids(business):
+    first = llm.process_reviews([review_payload(business, 'Great coffee', external_id='a')])
+    again = llm.process_reviews([
+        review_payload(business, 'Great coffee', external_id='a'),
+        review_payload(business, 'Great staff', external_id='b'),
+        review_payload(business, 'Great staff', external_id='b'),
+    ])
+
+    assert len(first) == 1
+    assert [result['external_id'] for result in again] == ['b']
+    assert Review.query.count() == 2
+    assert rollup_rows() == rebuilt_rollup_rows()
+
+
+def test_process_reviews_stores_cached_analyses(business, monkeypatch):
+    llm.process_reviews([review_payload(business, 'Great coffee', external_id='a')])
+
+    def unreachable(texts, **kwargs):
+        raise AssertionError('analyzed a cached text again')
+
+    monkeypatch.setattr(nlp_cache, 'analyze_texts', unreachable)
+    llm.process_reviews([review_payload(business, '  great   COFFEE ', external_id='b')])
+
+    review = Review.query.filter_by(external_id='b').one()
+    assert (review.senti_score, review.topics) == (0.8, 'coffee, staff')
+    assert nlp_cache.NlpCacheEntry.query.one().hits == 1
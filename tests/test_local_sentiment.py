@@ -0,0 +1,61 @@
+import pytest
+
+from backend.services.local_sentiment import analyze_texts_local
+from backend.services.nlp import NEUTRAL_ANALYSIS
+
+
+def analyze(text, **kwargs):
+    return analyze_texts_local([text], **kwargs)[0]
+
+
+@pytest.mark.parametrize('text, description', [
+    ('Amazing pizza and the staff were so friendly!', 'Positive'),
+    ('Terrible service, the food was cold and overpriced.', 'Negative'),
+    ('We went there on a Tuesday.', 'Neutral'),
+    ('The food was not good', 'Negative'),
+    ("The burger wasn't bad at all", 'Positive'),
+])
+def test_sentiment_description(text, description):
+    assert analyze(text)['sentiment_description'] == description
+
+
+def test_scores_stay_in_range():
+    text = 'best best best amazing perfect wonderful excellent delicious ' * 20
+
+    analysis = analyze(text)
+
+    assert 0.99 <= analysis['sentiment_score'] <= 1
+    assert analysis['sentiment_magnitude'] > 0
+
+
+def test_negation_flips_the_score():
+    assert analyze('the coffee was not good')['sentiment_score'] == pytest.approx(
+        -analyze('the coffee was good')['sentiment_score']
+    )
+
+
+def test_mixed_review_has_magnitude_but_a_small_score():
+    analysis = analyze('Great food, terrible service')
+
+    assert abs(analysis['sentiment_score']) < 0.25
+    assert analysis['sentiment_magnitude'] >= 1
+
+
+@pytest.mark.parametrize('text', ['', None])
+def test_empty_texts_are_neutral(text):
+    assert analyze(text) == NEUTRAL_ANALYSIS
+
+
+def test_aspects_are_ranked_by_salience():
+    analysis = analyze('The pizza, the dessert and the coffee were great but the waiter was rude', top_aspects=2)
+
+    assert [name for name, _, _ in analysis['entities']] == ['food', 'service']
+    assert [kind for _, kind, _ in analysis['entities']] == ['ASPECT', 'ASPECT']
+    assert analysis['entities'][0][2] > analysis['entities'][1][2]
+
+
+def test_batch_matches_one_by_one():
+    texts = ['Lovely place, great coffee', 'Rude staff', '', 'Parking was hard to find, slow service']
+
+    assert analyze_texts_local(texts) == [analyze(text) for text in texts]
+    assert analyze_texts_local([]) == []
@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from backend.benchmarks.query_plan import dashboard_queries, query_plan, seed
+from backend.models.database import db, upgrade_schema
+from backend.models.review import Review
+
+
+@pytest.fixture(scope='module')
+def engine(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}")
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        seed(conn, reviews=5000, businesses=20)
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize('name', list(dashboard_queries()))
+def test_dashboard_query_uses_an_index(engine, name):
+    with engine.connect() as conn:
+        plan = query_plan(conn, dashboard_queries()[name])
+
+    assert plan
+    for detail in plan:
+        assert not (detail.startswith('SCAN ') and 'INDEX' not in detail), plan
+        assert 'TEMP B-TREE' not in detail, plan
+
+
+def test_upgrade_schema_adds_review_indexes(app):
+    for index in Review.__table__.indexes:
+        db.session.execute(text(f'DROP INDEX {index.name}'))
+    db.session.commit()
+
+    upgrade_schema()
+
+    names = {index['name'] for index in inspect(db.engine).get_indexes('review')}
+    assert {index.name for index in Review.__table__.indexes} <= names
@@ -0,0 +1,127 @@
+import random
+import threading
+
+import pytest
+
+from backend.services import rate_limit
+from backend.services.rate_limit import AdaptiveRateLimiter
+
+URL = 'https://www.google.com/maps/place/test'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        # a real sleep always lets some time pass
+        self.now += max(seconds, 1e-6)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(rate_limit.time, 'sleep', clock.sleep)
+    random.seed(0)
+    return clock
+
+
+def request_times(limiter, clock, count):
+    times = []
+    for _ in range(count):
+        limiter.acquire(URL)
+        times.append(clock.now)
+    return times
+
+
+def intervals(times):
+    return [round(b - a, 6) for a, b in zip(times, times[1:])]
+
+
+def test_requests_are_spaced_by_the_rate_with_jitter(clock):
+    limiter = AdaptiveRateLimiter(rate=2, burst=1, jitter=0.5, max_rate=2)
+    gaps = intervals(request_times(limiter, clock, 30))
+
+    assert all(0.5 <= gap <= 0.751 for gap in gaps)
+    assert len(set(gaps)) > 10
+
+
+def test_no_jitter_spaces_requests_evenly(clock):
+    limiter = AdaptiveRateLimiter(rate=2, burst=1, jitter=0, max_rate=2)
+
+    assert all(gap == pytest.approx(0.5, abs=1e-5) for gap in intervals(request_times(limiter, clock, 10)))
+
+
+
+def test_success_speeds_up_and_failure_backs_off(clock):
+    limiter = AdaptiveRateLimiter(rate=1, burst=1, jitter=0, max_rate=4)
+    for _ in range(10):
+        limiter.record_success(URL)
+    assert limiter.metrics()['www.google.com']['rate'] == pytest.approx(1 + 10 * rate_limit.RATE_INCREASE)
+
+    limiter.record_failure(URL, 'empty_page')
+    metrics = limiter.metrics()['www.google.com']
+    assert metrics['rate'] == pytest.approx((1 + 10 * rate_limit.RATE_INCREASE) * rate_limit.RATE_DECREASE, abs=1e-3)
+    assert metrics['failures'] == {'empty_page': 1}
+
+    # the next request waits out the cooldown
+    start = clock.now
+    limiter.acquire(URL)
+    assert clock.now - start >= rate_limit.BASE_BACKOFF * 0.8
+    assert limiter.metrics()['www.google.com']['throttled_seconds'] == pytest.approx(clock.now - start, abs=0.1)
+
+
+def test_rate_stays_within_its_bounds(clock):
+    limiter = AdaptiveRateLimiter(rate=1, burst=1, jitter=0, min_rate=0.1, max_rate=1.5)
+    for _ in range(100):
+        limiter.record_success(URL)
+    assert limiter.metrics()['www.google.com']['rate'] == 1.5
+
+    for _ in range(10):
+        limiter.record_failure(URL, 'timeout')
+    assert limiter.metrics()['www.google.com']['rate'] == 0.1
+
+
+def blocked_for(limiter, clock):
+    return limiter.state['www.google.com']['blocked_until'] - clock.now
+
+
+def test_backoff_doubles_until_a_success(clock):
+    limiter = AdaptiveRateLimiter(rate=1, burst=1, jitter=0)
+
+    for failures in range(10):
+        # a shorter pause never cuts a longer one short
+        previous = blocked_for(limiter, clock) if failures else 0
+        limiter.record_failure(URL, 'captcha')
+        expected = min(rate_limit.MAX_BACKOFF, rate_limit.BASE_BACKOFF * 2 ** failures)
+        assert expected * 0.8 <= blocked_for(limiter, clock) <= max(expected * 1.2, previous)
+
+    # a success starts the backoff over
+    clock.now += 10 * rate_limit.MAX_BACKOFF
+    limiter.record_success(URL)
+    limiter.record_failure(URL, 'captcha')
+    assert blocked_for(limiter, clock) <= rate_limit.BASE_BACKOFF * 1.2
+
+
+def test_hosts_are_limited_separately(clock):
+    limiter = AdaptiveRateLimiter(rate=1, burst=1, jitter=0)
+    limiter.acquire(URL)
+    limiter.record_failure(URL, 'empty_page')
+    start = clock.now
+    limiter.acquire('https://maps.example.com/place')
+    assert clock.now == start
+
+
+def test_limiters_sharing_state_share_the_budget(clock):
+    state, lock = {}, threading.Lock()
+    first = AdaptiveRateLimiter(rate=1, burst=1, jitter=0, state=state, lock=lock)
+    second = AdaptiveRateLimiter(rate=1, burst=1, jitter=0, state=state, lock=lock)
+
+    first.acquire(URL)
+    start = clock.now
+    second.acquire(URL)
+    assert clock.now - start == pytest.approx(1, abs=1e-5)
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.services.relative_dates import PHRASES, get_matcher
+from backend.services.scraper import MAX_OFFSET_DAYS, normalize_review_dates, parse_relative_date
+
+RETRIEVED = datetime(2025, 3, 1, 12, 0)
+# how each locale writes "2 <unit> ago"
+TEMPLATES = {
+    'en': '2 {} ago', 'fr': 'il y a 2 {}', 'es': 'hace 2 {}', 'de': 'vor 2 {}',
+    'it': '2 {} fa', 'pt': 'há 2 {}', 'nl': '2 {} geleden',
+}
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('2 years ago', ('year', 2)),
+    ('a year ago', ('year', 1)),
+    ('an hour ago', ('hour', 1)),
+    ('3 weeks ago', ('week', 3)),
+    ('Edited 5 days ago', ('day', 5)),
+    ('il y a 2 ans', ('year', 2)),
+    ('il y a un mois', ('month', 1)),
+    ('il y a une semaine', ('week', 1)),
+    ('hace 3 días', ('day', 3)),
+    ('hace un año', ('year', 1)),
+    ('vor 2 Jahren', ('year', 2)),
+    ('vor einem Monat', ('month', 1)),
+    ('vor 10 Minuten', ('minute', 10)),
+    ("un'ora fa", ('hour', 1)),
+    ('2 settimane fa', ('week', 2)),
+    ('há 4 meses', ('month', 4)),
+    ('há um ano', ('year', 1)),
+    ('3 dagen geleden', ('day', 3)),
+    ('een jaar geleden', ('year', 1)),
+    ('2 minutes ago', ('minute', 2)),
+])
+def test_phrases_are_parsed(text, expected):
+    assert get_matcher(None).match(text) == expected
+
+
+@pytest.mark.parametrize('text', ['just now', "à l'instant", 'hace un momento', 'gerade eben', 'poco fa', 'zojuist'])
+def test_now_phrases(text):
+    assert get_matcher(None).match(text) == ('now', 0)
+
+
+@pytest.mark.parametrize('text', ['', 'yesterday', 'sometime ago', '2 fortnights ago', 'now and then'])
+def test_unknown_phrases(text):
+    assert get_matcher(None).match(text) is None
+
+
+def test_every_unit_of_every_locale_is_understood():
+    assert set(TEMPLATES) == set(PHRASES)
+    for locale, phrases in PHRASES.items():
+        matcher = get_matcher(locale)
+        for unit, words in phrases['units'].items():
+            for word in words:
+                text = TEMPLATES[locale].format(word)
+                assert matcher.match(text) == (unit, 2), (locale, text)
+
+
+def test_locale_restricts_the_phrases():
+    assert get_matcher('fr-CA').match('il y a 2 jours') == ('day', 2)
+    assert get_matcher('fr_FR').match('2 days ago') is None
+    with pytest.raises(ValueError):
+        get_matcher('xx')
+
+
+@pytest.mark.parametrize('text, delta, code', [
+    ('2 years ago', timedelta(days=730), 82),
+    ('a month ago', timedelta(days=30), 71),
+    ('12 weeks ago', timedelta(weeks=12), 69),
+    ('vor 3 Tagen', timedelta(days=3), 53),
+    ('just now', timedelta(0), 1),
+    ('gibberish', timedelta(0), 0),
+    (None, timedelta(0), 0),
+])
+def test_review_date_and_period_code(text, delta, code):
+    assert parse_relative_date(text, RETRIEVED) == (RETRIEVED - delta, code)
+
+
+def test_batch_dates_match_one_by_one():
+    texts = ['2 years ago', 'il y a un mois', '', '3 weeks ago', '2 years ago', 'hace 5 horas', None]
+    retrieved = [RETRIEVED.replace(tzinfo=timezone.utc) + timedelta(minutes=i) for i in range(len(texts))]
+
+    review_dates, estimates, codes = normalize_review_dates(retrieved, texts, seed=0)
+
+    expected = [parse_relative_date(text, date) for text, date in zip(texts, retrieved)]
+    assert review_dates == [date for date, _ in expected]
+    assert codes == [code for _, code in expected]
+    for review_date, estimate, code in zip(review_dates, estimates, codes):
+        assert estimate.tzinfo == timezone.utc
+        assert abs((estimate - review_date).days) <= MAX_OFFSET_DAYS.get(code // 10, 0)
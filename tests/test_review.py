@@ -0,0 +1,87 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from backend.models.review import Review
+from backend.services import review
+
+
+@pytest.fixture(autouse=True)
+def detector(monkeypatch):
+    """A suggestion detector that needs no model artifact, nothing is a suggestion"""
+    detector = SimpleNamespace(predict_batch=lambda texts: np.zeros(len(texts), dtype=bool))
+    monkeypatch.setattr(review, 'get_suggestion_detector', lambda: detector)
+    return detector
+
+
+def scraped(external_id, content='Great pizza'):
+    return {
+        'source': 'Google', 'content': content, 'rating': 5.0, 'external_id': external_id,
+        'retrieval_date': datetime(2025, 3, 1, 12), 'review_date_estimate': datetime(2025, 2, 20, 12),
+    }
+
+
+def stored_ids(business):
+    return sorted(external_id for external_id, in
+                  Review.query.with_entities(Review.external_id).filter_by(business_id=business.id))
+
+
+def test_known_reviews_are_skipped(business):
+    review.process_reviews([scraped('a'), scraped('b')], business.id)
+    known_ids = {'a', 'b'}
+
+    review.process_reviews([scraped('c'), scraped('a'), scraped('c')], business.id, known_ids=known_ids)
+
+    assert stored_ids(business) == ['a', 'b', 'c']
+    assert known_ids == {'a', 'b', 'c'}
+
+
+def test_known_ids_are_looked_up_if_not_given(business):
+    review.process_reviews([scraped('a')], business.id)
+    review.process_reviews([scraped('a'), scraped('b')], business.id)
+
+    assert stored_ids(business) == ['a', 'b']
+
+
+def test_reviews_without_an_id_are_always_added(business):
+    review.process_reviews([scraped(None), scraped(None)], business.id)
+
+    assert Review.query.filter_by(business_id=business.id).count() == 2
+
+
+@pytest.mark.parametrize('incremental', [True, False])
+def test_ingest_passes_the_known_ids_when_incremental(business, monkeypatch, incremental):
+    review.process_reviews([scraped('a')], business.id)
+    calls = []
+
+    def iter_review_batches(url, known_ids=None):
+        calls.append(known_ids)
+        yield [scraped('a'), scraped('b')]
+        yield [scraped('c')]
+
+    monkeypatch.setattr(review, 'iter_review_batches', iter_review_batches)
+    totals = []
+    total = review.ingest_business_reviews(business, incremental=incremental, on_batch=totals.append)
+
+    assert calls == [{'a'} if incremental else None]
+    assert (total, totals) == (3, [2, 3])
+    # a full re-scrape still doesn't store the known reviews again
+    assert stored_ids(business) == ['a', 'b', 'c']
+
+
+def test_suggestions_are_predicted_in_one_batch(business, detector):
+    calls = []
+
+    def predict_batch(texts):
+        calls.append(texts)
+        return np.array(['idea' in text for text in texts])
+
+    detector.predict_batch = predict_batch
+    review.process_reviews([scraped('a', 'Great pizza'), scraped('b', ''), scraped('c', '  An IDEA: open earlier ')],
+                           business.id)
+
+    assert calls == [['great pizza', 'an idea: open earlier']]
+    suggestions = dict(Review.query.with_entities(Review.external_id, Review.is_suggestion))
+    assert suggestions == {'a': False, 'b': False, 'c': True}
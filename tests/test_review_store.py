@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from backend.models.database import db
+from backend.models.review import Review
+from backend.models.review_topic import ReviewTopic
+from backend.services.daily_stats import get_rating_counts
+from backend.services.review_store import store_reviews
+from tests.helpers import rebuilt_rollup_rows, rollup_rows
+
+
+def row(business, external_id, rating=5.0, day=1, sentiment='Positive'):
+    return {
+        'source': 'Google', 'content': f'review {external_id}', 'rating': rating,
+        'review_date_estimate': datetime(2025, 1, day, 12), 'business_id': business.id,
+        'senti_score': 0.5, 'sentiment_magnitude': 1.0, 'sentiment_description': sentiment,
+        'is_suggestion': False, 'external_id': external_id,
+    }
+
+
+def test_store_reviews_returns_ids_in_order(business):
+    ids = store_reviews([row(business, 'a'), row(business, None), row(business, 'b'), row(business, None)])
+    db.session.commit()
+
+    assert [db.session.get(Review, review_id).content for review_id in ids] == [
+        'review a', 'review None', 'review b', 'review None',
+    ]
+
+
+def test_store_reviews_overwrites_rescraped_reviews(business):
+    store_reviews([row(business, 'a'), row(business, 'b')], [[('food', 0.9)], [('service', 0.4)]])
+    db.session.commit()
+
+    # 'a' moves to another day with a new rating and new topics
+    ids = store_reviews([row(business, 'a', rating=1.0, day=3, sentiment='Negative')], [[('price', 0.6)]])
+    db.session.commit()
+
+    assert Review.query.count() == 2
+    review = db.session.get(Review, ids[0])
+    assert (review.external_id, review.rating, review.sentiment_description) == ('a', 1.0, 'Negative')
+    assert [(link.topic, link.salience) for link in ReviewTopic.query.filter_by(review_id=review.id)] == [
+        ('price', 0.6),
+    ]
+    assert get_rating_counts(business.id) == {'1': 1, '2': 0, '3': 0, '4': 0, '5': 1}
+    assert rollup_rows() == rebuilt_rollup_rows()
+
@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from backend.services import suggestion_model
+from backend.services.suggestion_model import SuggestionModel, export_model, get_suggestion_detector
+
+TEXTS = [
+    'you should add vegan options', 'they need to open earlier', 'would be nice to have parking',
+    'consider adding more seats', 'great food and friendly staff', 'the coffee was cold',
+    'lovely place will come back', 'slow service and rude waiter',
+]
+LABELS = [1, 1, 1, 1, 0, 0, 0, 0]
+
+
+@pytest.fixture
+def classifier():
+    vectorizer = TfidfVectorizer(ngram_range=(1, 2))
+    clf = RandomForestClassifier(n_estimators=10, random_state=0).fit(vectorizer.fit_transform(TEXTS), LABELS)
+    return SimpleNamespace(vectorizer=vectorizer, clf=clf)
+
+
+@pytest.fixture
+def model(classifier, tmp_path, monkeypatch):
+    export_model(classifier, tmp_path)
+    # lemmatizing needs spaCy, the artifact is checked on the texts as they are
+    monkeypatch.setattr(SuggestionModel, 'preprocess_batch', lambda self, texts, **kwargs: texts)
+    return SuggestionModel(tmp_path)
+
+
+def test_artifact_predicts_like_the_forest(classifier, model):
+    texts = TEXTS + ['you should fix the cold coffee', 'friendly waiter', '']
+    expected = classifier.clf.predict_proba(classifier.vectorizer.transform(texts))[:, 1]
+
+    np.testing.assert_allclose(model.predict_proba_batch(texts), expected)
+    assert list(model.predict_batch(texts)) == list(expected >= 0.5)
+
+
+def test_artifact_arrays_stay_memory_mapped(model):
+    assert isinstance(model.vectorizer.idf_, np.memmap)
+    assert isinstance(model.threshold, np.memmap)
+
+
+def test_missing_artifact_raises(tmp_path, monkeypatch):
+    monkeypatch.setattr(suggestion_model, '_detector', None)
+    with pytest.raises(FileNotFoundError, match='export_classifier'):
+        get_suggestion_detector(tmp_path / 'missing')
+
+
+def test_batch_predicts_like_one_by_one(model):
+    texts = TEXTS + ['you should fix the cold coffee', '']
+
+    assert list(model.predict_proba_batch(texts)) == [model.predict_proba(text) for text in texts]
+    assert list(model.predict_batch(texts, threshold=0.3)) == [model.predict(text, threshold=0.3) for text in texts]
+    assert model.predict_batch([]).shape == (0,)
+
+
+def test_classifier_batch_predicts_like_one_by_one(monkeypatch):
+    pytest.importorskip('matplotlib')
+    pytest.importorskip('seaborn')
+    from backend.services import SuggestionClassifier_
+
+    # spaCy isn't needed to check the batching, classify the texts as they are
+    monkeypatch.setattr(SuggestionClassifier_, 'lemmatize', str.lower)
+    monkeypatch.setattr(SuggestionClassifier_, 'lemmatize_batch', lambda texts, **kwargs: [t.lower() for t in texts])
+    classifier = SuggestionClassifier_.SuggestionClassifier()
+    classifier.clf.set_params(n_estimators=10)
+    classifier.fit_unsupervised(TEXTS)
+    texts = TEXTS + ['We wish they had parking']
+
+    np.testing.assert_allclose(classifier.predict_proba_batch(texts), [classifier.predict_proba(t) for t in texts])
+    assert list(classifier.predict_batch(texts)) == [classifier.predict(text) for text in texts]